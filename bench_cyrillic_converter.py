@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Cyrillic converter benchmark: eski latin_to_cyrillic (har chaqiruvda
+saralash + ~60 ta ketma-ket str.replace) va yangi Transliterator
+(oldindan tuzilgan longest-match, so'zlar keshi)
+
+Eskisidan farqlar faqat ma'lum tuzatishlarda bo'lishi kerak (butunlay katta
+harfli so'zlar, "yo'l", o‘/g’ apostrof variantlari) - boshqa farq bo'lsa
+skript xato bilan tugaydi.
+
+Ishlatish:
+    python bench_cyrillic_converter.py                 # ichki namunalar
+    python bench_cyrillic_converter.py posts.txt       # o'z postlaringiz ('\n---\n' bilan ajratilgan)
+    python bench_cyrillic_converter.py posts.txt 50    # takrorlashlar soni
+"""
+import re
+import sys
+import time
+from bench_text_cleaner import SAMPLE_POSTS, load_posts
+from utils.cyrillic_converter import (
+    LATIN_TO_CYRILLIC, latin_to_cyrillic, cyrillic_to_latin, _LATIN_CONVERTER, _CYRILLIC_CONVERTER
+)
+
+# Telegram xabari chegarasi - uzun postlar shu uzunlikkacha yig'iladi
+LONG_POST_LENGTH = 4000
+
+# (kirish, kutilgan natija)
+LATIN_CASES = [
+    ("Toshkent shahrida", 'Тошкент шаҳрида'),
+    ("O'zbekiston", 'Ўзбекистон'),
+    ("Oʻzbekiston gʻalaba", 'Ўзбекистон ғалаба'),
+    ("o‘zbek g’alaba", 'ўзбек ғалаба'),
+    ("yo'l yoʻlovchi Yo'l", 'йўл йўловчи Йўл'),
+    ("yangilik yozuv yuk", 'янгилик ёзув юк'),
+    ("SHAHAR CHEMPIONATI O'ZBEKISTON", 'ШАҲАР ЧЕМПИОНАТИ ЎЗБЕКИСТОН'),
+    ("@kunuz 2025-yil", '@кунуз 2025-йил'),
+]
+CYRILLIC_CASES = [
+    ('Ўзбекистон ғалаба', "O'zbekiston g'alaba"),
+    ('Тошкент шаҳрида', 'Toshkent shahrida'),
+    ('Европа поезд объект', "Yevropa poyezd ob'yekt"),
+    ('ЎЗБЕКИСТОН ШАҲАР', "O'ZBEKISTON SHAHAR"),
+    ('янги ёзув юк', 'yangi yozuv yuk'),
+]
+
+# Eskisidan farq qilishi mumkin bo'lgan so'zlar (tuzatilgan xatolar)
+_KNOWN_FIX = re.compile(r"[yY][oO][ʻ'ʼ‘’`]|[oOgG][ʼ‘’`]")
+
+
+def legacy_latin_to_cyrillic(text: str) -> str:
+    """Eski versiya (o'zgarishsiz nusxa)"""
+    if not text:
+        return text
+
+    result = text
+
+    # Avval ikki harfli kombinatsiyalarni almashtirish
+    for latin, cyrillic in sorted(LATIN_TO_CYRILLIC.items(), key=lambda x: len(x[0]), reverse=True):
+        if len(latin) > 1:
+            result = result.replace(latin, cyrillic)
+
+    # Keyin bir harfli almashtirishlar
+    for latin, cyrillic in LATIN_TO_CYRILLIC.items():
+        if len(latin) == 1:
+            result = result.replace(latin, cyrillic)
+
+    return result
+
+
+def long_posts(posts: list) -> list:
+    """Postlarni ~LONG_POST_LENGTH belgili uzun postlarga yig'ish"""
+    result, current = [], ''
+    for post in posts * (LONG_POST_LENGTH // max(1, min(map(len, posts))) + 1):
+        current = f'{current}\n\n{post}' if current else post
+        if len(current) >= LONG_POST_LENGTH:
+            result.append(current[:LONG_POST_LENGTH])
+            current = ''
+        if len(result) >= len(posts):
+            break
+    return result or posts
+
+
+def check() -> int:
+    errors = 0
+    for converter, cases in ((latin_to_cyrillic, LATIN_CASES), (cyrillic_to_latin, CYRILLIC_CASES)):
+        for source, expected in cases:
+            actual = converter(source)
+            if actual != expected:
+                errors += 1
+                print(f"❌ {converter.__name__}({source!r}) = {actual!r}, kutilgan {expected!r}")
+    return errors
+
+
+def compare_with_legacy(posts: list) -> int:
+    """So'z darajasida solishtirish - farqlar faqat _KNOWN_FIX / katta harfli so'zlarda"""
+    errors = 0
+    fixed = 0
+    for index, post in enumerate(posts):
+        for word in post.split(' '):
+            expected = legacy_latin_to_cyrillic(word)
+            actual = latin_to_cyrillic(word)
+            if actual == expected:
+                continue
+            if (word.isupper() and len(word) > 1) or _KNOWN_FIX.search(word):
+                fixed += 1
+                continue
+            errors += 1
+            print(f"❌ Post #{index}: {word!r} - eski {expected!r}, yangi {actual!r}")
+        if latin_to_cyrillic(post) != ' '.join(latin_to_cyrillic(word) for word in post.split(' ')):
+            errors += 1
+            print(f"❌ Post #{index}: butun matn va so'zma-so'z natija farq qiladi")
+    if fixed:
+        print(f"ℹ️ {fixed} ta so'z eskisidan farq qiladi (katta harfli so'zlar, yo'l, apostrof variantlari)")
+    return errors
+
+
+def run(func, posts: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for post in posts:
+            func(post)
+    return time.perf_counter() - start
+
+
+def report(name: str, seconds: float, posts: list, rounds: int):
+    total = len(posts) * rounds
+    megabytes = sum(map(len, posts)) * rounds / 1e6
+    print(f"   {name}: {seconds:.3f} s ({total / seconds:,.0f} post/s, {megabytes / seconds:.1f} M belgi/s)")
+
+
+def main():
+    posts = load_posts(sys.argv[1]) if len(sys.argv) > 1 else SAMPLE_POSTS
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    posts = long_posts(posts)
+
+    print("=" * 60)
+    print(f"CYRILLIC CONVERTER BENCHMARK: {len(posts)} ta post "
+          f"(o'rtacha {sum(map(len, posts)) // len(posts)} belgi) x {rounds}")
+    print("=" * 60)
+
+    # 1. To'g'rilik
+    errors = check() + compare_with_legacy(posts)
+    if errors:
+        print(f"\n❌ {errors} ta xato topildi")
+        return False
+    print("✅ Natijalar to'g'ri")
+
+    # 2. Tezlik: lotin → kirill
+    _LATIN_CONVERTER._cache.clear()
+    start = time.perf_counter()
+    for post in posts:
+        latin_to_cyrillic(post)
+    cold_time = time.perf_counter() - start
+
+    legacy_time = run(legacy_latin_to_cyrillic, posts, rounds)
+    new_time = run(latin_to_cyrillic, posts, rounds)
+
+    print("\nLotin → kirill:")
+    report("Eski        ", legacy_time, posts, rounds)
+    report("Yangi       ", new_time, posts, rounds)
+    report("Yangi (kesh bo'sh, 1 marta)", cold_time, posts, 1)
+    print(f"   Tezlashish: {legacy_time / new_time:.2f}x")
+
+    # 3. Tezlik: kirill → lotin
+    cyrillic_posts = [legacy_latin_to_cyrillic(post) for post in posts]
+    _CYRILLIC_CONVERTER._cache.clear()
+    start = time.perf_counter()
+    for post in cyrillic_posts:
+        cyrillic_to_latin(post)
+    cold_time = time.perf_counter() - start
+    reverse_time = run(cyrillic_to_latin, cyrillic_posts, rounds)
+
+    print("\nKirill → lotin:")
+    report("Yangi       ", reverse_time, cyrillic_posts, rounds)
+    report("Yangi (kesh bo'sh, 1 marta)", cold_time, cyrillic_posts, 1)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
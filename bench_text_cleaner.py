@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Text cleaner benchmark: eski (ketma-ket re.sub) va yangi (kompilyatsiya
+qilingan qoidalar jadvali) clean_text ni solishtirish
+
+Natijalar bir xil bo'lishi shart - farq bo'lsa skript xato bilan tugaydi.
+
+Ishlatish:
+    python bench_text_cleaner.py                 # ichki namunalar
+    python bench_text_cleaner.py posts.txt       # o'z postlaringiz ('\n---\n' bilan ajratilgan)
+    python bench_text_cleaner.py posts.txt 50    # takrorlashlar soni
+"""
+import re
+import sys
+import time
+from processor.text_cleaner import clean_text, clean_many
+
+# Kanallardan olingan postlar (kun.uz, daryo, gazeta.uz, dunyo.uz uslubida)
+SAMPLE_POSTS = [
+    """🏛 Siyosat
+
+Prezident Shavkat Mirziyoyev Oliy Majlis Senatining navbatdagi yalpi majlisida ishtirok etdi. Majlisda 2025-yilgi davlat budjeti parametrlari ko'rib chiqildi.
+
+👉 [Batafsil](https://kun.uz/news/2024/12/10/prezident-senat)
+
+⚡️ @kunuz — Kun.uz rasmiy kanali
+#siyosat""",
+    """💰 Iqtisod
+
+Markaziy bank asosiy stavkani **13,5 foiz** darajasida saqlab qoldi. Inflyatsiya yillik hisobda 9,8 foizni tashkil etdi.
+
+Batafsil — https://kun.uz/12345678
+
+📢 @kunuz""",
+    """⚽ Sport
+
+O'zbekiston terma jamoasi JCh-2026 saralash bosqichida Qatarni 3:2 hisobida mag'lub etdi! ⚽️⚽️⚽️⚽️
+
+📹 VIDEOSHARH TOMOSHA QILING
+Kun.uz surishtiruvi davom etmoqda.
+
+@daryo""",
+    """🌍 Дунё
+
+Россия ва Украина ўртасидаги музокаралар Истанбулда давом этмоқда. Томонлар асирлар алмашинуви бўйича келишувга эришди.
+
+⚡️ Дунё🌐Уз - Тв да кўрсатмайдиган хабарлар канали!""",
+    """🌤 Ob-havo
+
+Ertaga Toshkentda havo harorati +32 darajagacha ko'tariladi, yog'ingarchilik kutilmaydi. 🌞🌞🌞
+
+Manba: @uzgidromet
+https://t.me/kunuz""",
+    """💻 Texnologiya
+
+Toshkentda IT Park rezidentlari soni 2000 tadan oshdi. Eksport hajmi 500 million dollarga yetdi.
+
+||Yashirin matn|| ~~eski narx~~ 5️⃣5️⃣5️⃣
+
+🔗 Manba: gazeta.uz
+Gazeta.uz | @gazetauz""",
+    """🏥 Саломатлик
+
+Соғлиқни сақлаш вазирлиги грипп ва ОРВИга қарши эмлаш кампанияси бошланганини маълум қилди.
+
+Подробнее — https://daryo.uz/k/2024/11/20/
+**Дунё🌐Уз - Тв да кўрсатмайдиган хабарлар канали**!""",
+    """👥 Jamiyat
+
+Kun.uz jurnalistining so'rovi natijasida Chilonzor tumanidagi ko'p qavatli uylarga issiq suv berish qayta tiklandi.
+
+www.kun.uz/uz/news
+Telegram | Instagram | YouTube""",
+    """Samarqandda "Ipak yo'li" turizm markazida xalqaro forum bo'lib o'tdi. Forumda 40 dan ortiq davlat vakillari qatnashdi.
+
+#turizm #samarqand
+👉 @kunuz""",
+    """⚡️⚡️ SHOSHILINCH
+
+Toshkent metropoliteni yangi bekatlari ochildi. Yo'l haqi o'zgarmaydi.
+
+Yangiliklar guruhi | @yangiliklar331
+Tv da ko'rsatmaydigan xabarlar kanali""",
+    """🌤 Об-ҳаво
+
+Эртага республика бўйлаб ёмғир ёғиши кутилмоқда. Ҳаво ҳарорати кечаси +5...+10 даража.
+
+Дунё Уз
+.""",
+    """**Daryo** xabar berishicha, Andijon viloyatida yangi to'qimachilik korxonasi ishga tushirildi. Korxonada 1200 kishi ish bilan ta'minlanadi.
+
+* * *
+Daryo rasmiy kanali
+@daryo""",
+    """Vazirlar Mahkamasi qarori bilan 1-yanvardan boshlab eng kam ish haqi miqdori oshiriladi.
+
+📹 VIDEONI TOMOSHA QILING
+Telegram
+📢 @kunuz — obuna bo'ling""",
+    """🏛 Сиёсат
+
+Ўзбекистон ва Қозоғистон президентлари икки томонлама савдо ҳажмини 10 миллиард долларга етказиш бўйича келишиб олди.
+
+⚡️ **Дунё🌐Уз** - Тв да кўрсатмайдиган хабарлар **канали**!""",
+    """⚽ Спорт
+
+«Пахтакор» Осиё Чемпионлар лигасида навбатдаги ўйинини 2:0 ҳисобида ғалаба билан якунлади.
+
+@kunuz rasmiy kanali
+Manba:""",
+]
+
+
+def legacy_clean_text(text: str) -> str:
+    """
+    Eski versiya (80 ta ketma-ket re.sub) - solishtirish uchun o'zgarishsiz nusxa
+
+    Postni tozalash:
+    - Linklar (kun.uz va boshqalar)
+    - Hashtag
+    - Kanal nomlari
+    - Video-related matnlar
+    - Reklama matnlari
+    - Emoji spam
+    - Ortiqcha formatlar (**, ||, ~~)
+    """
+    if not text:
+        return ""
+    
+    # Markdown linklar ni olib tashlash: [text](url)
+    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
+    
+    # Linklar ni olib tashlash
+    # 1. Kun.uz linki
+    text = re.sub(r'https?://kun\.uz/\d+', '', text)
+    
+    # 2. Boshqa linklar
+    text = re.sub(r'http[s]?://\S+', '', text)
+    text = re.sub(r'www\.\S+', '', text)
+    
+    # Hashtag ni olib tashlash
+    text = re.sub(r'#\w+', '', text)
+    
+    # Kanal nomlarini olib tashlash (oxirida va o'rtada)
+    text = re.sub(r'⚡️.*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'👉.*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'📢\s*@\w+.*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'🔗\s*Manba.*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'Manba:?\s*@\w+\s*\n?', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'Manba:\s*$', '', text, flags=re.MULTILINE | re.IGNORECASE)  # Oxirida "Manba:"
+    text = re.sub(r'@\w+\s*rasmiy\s*kanali.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'rasmiy\s*kanali.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    
+    # "rasmiy kanali" har qanday joyda (oxirida ham)
+    text = re.sub(r'\s+rasmiy\s+kanali\s*', ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'rasmiy\s+kanali', '', text, flags=re.IGNORECASE)
+    
+    # Kanal nomlari (Kun.uz, Daryo, Gazeta.uz) - har qanday joyda
+    text = re.sub(r'Kun\.uz\s*surishtiruvi', 'surishtiruv', text, flags=re.IGNORECASE)
+    text = re.sub(r'Kun\.uz\s*jurnalistining', 'jurnalistning', text, flags=re.IGNORECASE)
+    text = re.sub(r'Kun\.uz\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Daryo\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Gazeta\.uz\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Yangiliklargruhi\s*', '', text, flags=re.IGNORECASE)
+    
+    # @kanal nomlari (oxirida va o'rtada)
+    text = re.sub(r'\s+@kunuz\s*$', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+@gazetauz\s*$', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+@daryo\s*$', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\|\s*@\w+\s*', '', text, flags=re.IGNORECASE)  # | @kanal
+    text = re.sub(r'@\w+\s*\|', '', text, flags=re.IGNORECASE)  # @kanal |
+    text = re.sub(r'\s+@\w+\s*$', '', text, flags=re.MULTILINE)  # Har qanday @kanal oxirida
+    
+    # Telegram so'zi (har qanday joyda)
+    text = re.sub(r'\s+Telegram\s*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\s+Telegram\s+', ' ', text, flags=re.IGNORECASE)
+    
+    # Emoji patterns (oxirida va boshida)
+    text = re.sub(r'[⚡️👉📢🔗❗️]+\s*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^[⚡️👉📢🔗❗️]+\s*', '', text, flags=re.MULTILINE)
+    
+    # Batafsil — linklar (har qanday joyda)
+    text = re.sub(r'Batafsil\s*—.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'Подробнее\s*—.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'Batafsil\s*—', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Подробнее\s*—', '', text, flags=re.IGNORECASE)
+    
+    # Video-related matnlar (agar video bo'lmasa olib tashlash)
+    text = re.sub(r'📹\s*VIDЕOSHARHNI\s*TOMOSHA\s*QILING.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'📹\s*VIDEONI\s*TOMOSHA\s*QILING.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'📹\s*VIDEO\s*SHARH.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'VIDЕOSHARHNI\s*TOMOSHA\s*QILING', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'VIDEONI\s*TOMOSHA\s*QILING', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'VIDEO\s*SHARH', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'📹\s*', '', text)  # Video emoji
+    
+    # YANGI: Reklama va kanal nomlari (KUCHAYTIRILGAN)
+    # "⚡️ Дунё🌐Уз - Тв да кўрсатмайдиган хабарлар канали!" kabi matnlar
+    
+    # 1. ⚡️ bilan boshlanadigan butun qatorni olib tashlash
+    text = re.sub(r'⚡️[^\n]*\n?', '', text, flags=re.MULTILINE)
+    
+    # 2. Kategoriya nomlari (emoji bilan) - KIRILL va LOTIN
+    # Boshida turgan kategoriya nomlarini olib tashlash
+    text = re.sub(r'^🌍\s*Дунё[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🌍\s*Dunyo[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^👥\s*Жамият[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^👥\s*Jamiyat[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^⚽\s*Спорт[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^⚽\s*Sport[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^💰\s*Иқтисод[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^💰\s*Iqtisod[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🏛\s*Сиёсат[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🏛\s*Siyosat[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^💻\s*Технология[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^💻\s*Texnologiya[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🏥\s*Саломатлик[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🏥\s*Salomatlik[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🌤\s*Об-ҳаво[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🌤\s*Ob-havo[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'^🌤\s*OBHAVO[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
+    
+    # 3. Kanal reklama matnlari - KIRILL va LOTIN
+    # "Тв да кўрсатмайдиган хабарлар канали" va boshqalar
+    text = re.sub(r'[^\n]*?Тв\s*да\s*кўрсатмайдиган[^\n]*?канали[^\n]*?\n?', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'[^\n]*?Tv\s*da\s*ko\'?rsatmaydigan[^\n]*?kanali[^\n]*?\n?', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'[^\n]*?хабарлар\s*канали[^\n]*?\n?', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'[^\n]*?xabarlar\s*kanali[^\n]*?\n?', '', text, flags=re.IGNORECASE)
+    
+    # 4. Kanal nomlari (Дунё🌐Уз, Kun.uz va boshqalar)
+    text = re.sub(r'Дунё\s*🌐\s*Уз[^\n]*?\n?', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'Дунё[^\n]*?Уз[^\n]*?\n?', '', text, flags=re.IGNORECASE)
+    
+    # 5. Yolg'iz qolgan belgilar (!, ?, .)
+    text = re.sub(r'^\s*[!?.]+\s*$', '', text, flags=re.MULTILINE)
+    
+    # 6. Eski patternlar (saqlab qolamiz)
+    text = re.sub(r'⚡️\s*\*\*.*?\*\*.*?канали.*?\*\*!?', '', text, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r'⚡️\s*\*\*.*?\*\*.*?канал.*?\*\*!?', '', text, flags=re.IGNORECASE | re.DOTALL)
+    
+    # 7. Umumiy reklama patternlar
+    text = re.sub(r'\*\*.*?канали\*\*!?', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'канали\s*\*\*!?', '', text, flags=re.IGNORECASE)
+    
+    # YANGI: Emoji spam va ortiqcha formatlarni tozalash
+    # Ko'p emoji ketma-ket (3 tadan ko'p)
+    text = re.sub(r'([\U0001F300-\U0001F9FF])\1{2,}', r'\1', text)  # Bir xil emoji 3+ marta
+    
+    # Yulduzcha (**) formatni olib tashlash
+    text = re.sub(r'\*\*\*\*', '', text)  # 4 ta yulduzcha
+    text = re.sub(r'\*\*', '', text)  # 2 ta yulduzcha (bold)
+    
+    # Spoiler (||) formatni olib tashlash
+    text = re.sub(r'\|\|', '', text)
+    
+    # Strikethrough (~~) formatni olib tashlash
+    text = re.sub(r'~~', '', text)
+    
+    # Ortiqcha emoji (raqam emoji spam: 5️⃣5️⃣)
+    text = re.sub(r'([0-9]️⃣)\1+', r'\1', text)  # Bir xil raqam emoji 2+ marta
+    
+    # Ortiqcha bo'sh joy va belgilar
+    text = re.sub(r'\s*\*\s*', ' ', text)  # * belgilar atrofidagi bo'sh joylar
+    text = re.sub(r'\s*\|\s*', ' ', text)  # | belgilar atrofidagi bo'sh joylar
+    
+    # Ko'p bo'sh joylarni bitta qilish
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n', text)  # Ko'p qatorlarni ikki qatorga qisqartirish
+    
+    # Boshida va oxirida bo'sh joylar
+    text = text.strip()
+    
+    # Har bir qatorning boshida va oxirida bo'sh joylar
+    lines = text.split('\n')
+    lines = [line.strip() for line in lines]
+    text = '\n'.join(lines)
+    
+    # OXIRGI: @kanal nomlarini olib tashlash (eng oxirida)
+    text = re.sub(r'\s+@\w+\s*$', '', text, flags=re.MULTILINE)
+    
+    return text
+
+
+def load_posts(path: str) -> list:
+    with open(path, encoding='utf-8') as f:
+        return [post for post in f.read().split('\n---\n') if post.strip()]
+
+
+def run(func, posts: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for post in posts:
+            func(post)
+    return time.perf_counter() - start
+
+
+def main():
+    posts = load_posts(sys.argv[1]) if len(sys.argv) > 1 else SAMPLE_POSTS
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 60)
+    print(f"TEXT CLEANER BENCHMARK: {len(posts)} ta post x {rounds}")
+    print("=" * 60)
+
+    # 1. Natijalar bir xilligi
+    mismatches = 0
+    for index, post in enumerate(posts):
+        expected = legacy_clean_text(post)
+        actual = clean_text(post)
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ Post #{index}: natija farq qiladi")
+            print(f"   eski:  {expected!r}")
+            print(f"   yangi: {actual!r}")
+    if clean_many(posts) != [legacy_clean_text(post) for post in posts]:
+        mismatches += 1
+        print("❌ clean_many natijasi farq qiladi")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} ta farq topildi")
+        return False
+    print(f"✅ Barcha {len(posts)} ta post uchun natijalar bir xil")
+
+    # 2. Tezlik
+    legacy_time = run(legacy_clean_text, posts, rounds)
+    new_time = run(clean_text, posts, rounds)
+    total = len(posts) * rounds
+
+    print(f"\n   Eski:  {legacy_time:.3f} s ({total / legacy_time:,.0f} post/s)")
+    print(f"   Yangi: {new_time:.3f} s ({total / new_time:,.0f} post/s)")
+    print(f"   Tezlashish: {legacy_time / new_time:.2f}x")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -7,7 +7,7 @@ from telegram.ext import ContextTypes
 from sqlalchemy import select
 from db.models import User, Channel, News, UserInterest
 from db.database import async_session
-from config import ADMIN_USERNAME, SUBSCRIPTION_PLANS, CHANNELS_TO_MONITOR
+from config import ADMIN_USERNAME, SUBSCRIPTION_PLANS
 from datetime import datetime
 
 def is_admin(username: str) -> bool:
@@ -38,7 +38,8 @@ async def admin_panel_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         "🔐 **ADMIN PANEL**\n\n"
         "━━━━━━━━━━━━━━━━━━━━\n\n"
         "📊 **Statistika:**\n"
-        "/stats — To'liq statistika\n\n"
+        "/stats — To'liq statistika\n"
+        "/delivery — Yuborish navbati\n\n"
         "📺 **Kanallar:**\n"
         "/channels — Kanallar ro'yxati\n"
         "/add\\_channel — Kanal qo'shish\n"
@@ -106,7 +107,7 @@ async def channels_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def add_channel_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    /add_channel @username - Yangi kanal qo'shish (avtomatik)
+    /add_channel @username - Yangi kanal qo'shish (qayta ishga tushirishsiz)
     """
     username = update.effective_user.username
     
@@ -127,96 +128,30 @@ async def add_channel_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     channel_username = context.args[0].replace('@', '')
     
-    async with async_session() as session:
-        # Kanal mavjudligini tekshirish
-        result = await session.execute(
-            select(Channel).where(Channel.username == channel_username)
-        )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            await update.message.reply_text(
-                f"❌ @{channel_username} allaqachon mavjud!"
-            )
-            return
-        
-        # Yangi kanal qo'shish
-        new_channel = Channel(
-            username=channel_username,
-            is_active=True
-        )
-        session.add(new_channel)
-        await session.commit()
+    listener = context.application.bot_data.get('listener')
+    if not listener:
+        await update.message.reply_text("❌ Listener ishlamayapti.")
+        return
     
-    # config.py ga avtomatik qo'shish
-    try:
-        import re
-        
-        # config.py ni o'qish
-        with open('config.py', 'r', encoding='utf-8') as f:
-            config_content = f.read()
-        
-        # CHANNELS_TO_MONITOR ni topish
-        pattern = r"CHANNELS_TO_MONITOR\s*=\s*\[(.*?)\]"
-        match = re.search(pattern, config_content, re.DOTALL)
-        
-        if match:
-            channels_str = match.group(1)
-            
-            # Yangi kanal qo'shish
-            # Oxirgi verguldan keyin qo'shish
-            new_channel_line = f"\n    '@{channel_username}',"
-            
-            # Agar oxirgi element vergul bilan tugasa
-            if channels_str.strip().endswith(','):
-                new_channels_str = channels_str + new_channel_line + "\n"
-            else:
-                # Oxirgi elementga vergul qo'shish
-                new_channels_str = channels_str.rstrip() + ',' + new_channel_line + "\n"
-            
-            # config.py ni yangilash
-            new_config = config_content.replace(
-                f"CHANNELS_TO_MONITOR = [{channels_str}]",
-                f"CHANNELS_TO_MONITOR = [{new_channels_str}]"
-            )
-            
-            # Faylga yozish
-            with open('config.py', 'w', encoding='utf-8') as f:
-                f.write(new_config)
-            
-            await update.message.reply_text(
-                f"✅ **Kanal qo'shildi!**\n\n"
-                f"@{channel_username}\n\n"
-                f"✅ `config.py` ga avtomatik qo'shildi\n"
-                f"✅ Bot qayta ishga tushirilmoqda...",
-                parse_mode='Markdown'
-            )
-            
-            # Botni qayta ishga tushirish
-            await restart_bot_with_confirmation(update.effective_chat.id)
-            
-        else:
-            await update.message.reply_text(
-                f"✅ **Kanal database'ga qo'shildi!**\n\n"
-                f"@{channel_username}\n\n"
-                f"⚠️ **Qo'lda qo'shing:**\n"
-                f"`config.py` da CHANNELS_TO_MONITOR ga qo'shing",
-                parse_mode='Markdown'
-            )
+    # Channel jadvaliga yozish va kuzatishni darhol boshlash
+    status, channel_username = await listener.add_channel(channel_username)
+    if status == 'not_found':
+        await update.message.reply_text(f"❌ @{channel_username} Telegram'da topilmadi!")
+        return
+    if status == 'exists':
+        await update.message.reply_text(f"⚠️ @{channel_username} allaqachon kuzatilmoqda!")
+        return
     
-    except Exception as e:
-        await update.message.reply_text(
-            f"✅ **Kanal database'ga qo'shildi!**\n\n"
-            f"@{channel_username}\n\n"
-            f"⚠️ **Xato:**\n"
-            f"`config.py` ga avtomatik qo'shib bo'lmadi: {e}\n\n"
-            f"Qo'lda qo'shing: `config.py` da CHANNELS_TO_MONITOR",
-            parse_mode='Markdown'
-        )
+    await update.message.reply_text(
+        f"✅ **Kanal qo'shildi!**\n\n"
+        f"@{channel_username}\n\n"
+        f"📡 Kuzatilmoqda: {len(listener.channels)} ta kanal",
+        parse_mode='Markdown'
+    )
 
 async def remove_channel_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    /remove_channel @username - Kanalni o'chirish (avtomatik)
+    /remove_channel @username - Kanalni o'chirish (qayta ishga tushirishsiz)
     """
     username = update.effective_user.username
     
@@ -235,73 +170,25 @@ async def remove_channel_command(update: Update, context: ContextTypes.DEFAULT_T
     
     channel_username = context.args[0].replace('@', '')
     
-    async with async_session() as session:
-        result = await session.execute(
-            select(Channel).where(Channel.username == channel_username)
-        )
-        channel = result.scalar_one_or_none()
-        
-        if not channel:
-            await update.message.reply_text(
-                f"❌ @{channel_username} topilmadi!"
-            )
-            return
-        
-        # Kanalni o'chirish
-        await session.delete(channel)
-        await session.commit()
+    listener = context.application.bot_data.get('listener')
+    if not listener:
+        await update.message.reply_text("❌ Listener ishlamayapti.")
+        return
     
-    # config.py dan avtomatik o'chirish
-    try:
-        import re
-        
-        # config.py ni o'qish
-        with open('config.py', 'r', encoding='utf-8') as f:
-            config_content = f.read()
-        
-        # Kanalni o'chirish
-        # Har xil formatlarni qo'llab-quvvatlash
-        patterns = [
-            # '@channel_username',  (vergul bilan)
-            rf"\s*'@{re.escape(channel_username)}',\s*(?:#[^\n]*)?\n",
-            rf'\s*"@{re.escape(channel_username)}",\s*(?:#[^\n]*)?\n',
-            # '@channel_username'  (vergulsiz, oxirgi element)
-            rf"\s*'@{re.escape(channel_username)}'\s*(?:#[^\n]*)?\n",
-            rf'\s*"@{re.escape(channel_username)}"\s*(?:#[^\n]*)?\n',
-        ]
-        
-        new_config = config_content
-        for pattern in patterns:
-            new_config = re.sub(pattern, '', new_config)
-        
-        # Agar oxirgi element o'chirilgan bo'lsa, oldingi elementdan vergulni olib tashlash
-        # ,\n] → \n]
-        new_config = re.sub(r',(\s*)\]', r'\1]', new_config)
-        
-        # Faylga yozish
-        with open('config.py', 'w', encoding='utf-8') as f:
-            f.write(new_config)
-        
+    # Kanal o'chirilgan deb belgilanadi (yangiliklari saqlanadi), kuzatish darhol to'xtaydi
+    removed = await listener.remove_channel(channel_username)
+    if not removed:
         await update.message.reply_text(
-            f"✅ **Kanal o'chirildi!**\n\n"
-            f"@{channel_username}\n\n"
-            f"✅ `config.py` dan avtomatik o'chirildi\n"
-            f"✅ Bot qayta ishga tushirilmoqda...",
-            parse_mode='Markdown'
-        )
-        
-        # Botni qayta ishga tushirish
-        await restart_bot_with_confirmation(update.effective_chat.id)
-        
-    except Exception as e:
-        await update.message.reply_text(
-            f"✅ **Kanal database'dan o'chirildi!**\n\n"
-            f"@{channel_username}\n\n"
-            f"⚠️ **Xato:**\n"
-            f"`config.py` dan avtomatik o'chirib bo'lmadi: {e}\n\n"
-            f"Qo'lda o'chiring: `config.py` da CHANNELS_TO_MONITOR",
-            parse_mode='Markdown'
+            f"❌ @{channel_username} topilmadi!"
         )
+        return
+    
+    await update.message.reply_text(
+        f"✅ **Kanal o'chirildi!**\n\n"
+        f"@{channel_username}\n\n"
+        f"📡 Kuzatilmoqda: {len(listener.channels)} ta kanal",
+        parse_mode='Markdown'
+    )
 
 async def plans_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -404,7 +291,9 @@ async def set_price_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         
         # Botni qayta ishga tushirish
-        await restart_bot_with_confirmation(update.effective_chat.id)
+        await restart_bot_with_confirmation(
+            update.effective_chat.id, outbox=context.application.bot_data.get('outbox')
+        )
         
     except Exception as e:
         await update.message.reply_text(
@@ -602,7 +491,9 @@ async def add_plan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             
             # Botni qayta ishga tushirish
-            await restart_bot_with_confirmation(update.effective_chat.id)
+            await restart_bot_with_confirmation(
+                update.effective_chat.id, outbox=context.application.bot_data.get('outbox')
+            )
             
         else:
             await update.message.reply_text(
@@ -698,7 +589,9 @@ async def edit_plan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         
         # Botni qayta ishga tushirish
-        await restart_bot_with_confirmation(update.effective_chat.id)
+        await restart_bot_with_confirmation(
+            update.effective_chat.id, outbox=context.application.bot_data.get('outbox')
+        )
         
     except Exception as e:
         await update.message.reply_text(
@@ -756,7 +649,9 @@ async def remove_plan_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         
         # Botni qayta ishga tushirish
-        await restart_bot_with_confirmation(update.effective_chat.id)
+        await restart_bot_with_confirmation(
+            update.effective_chat.id, outbox=context.application.bot_data.get('outbox')
+        )
         
     except Exception as e:
         await update.message.reply_text(
@@ -965,13 +860,81 @@ async def languages_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await update.message.reply_text(text, parse_mode='Markdown')
 
-async def restart_bot_with_confirmation(chat_id: int, message_text: str = None):
+async def delivery_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /delivery - Yuborish navbati holati (yo'laklar bo'yicha kechikish)
+    """
+    username = update.effective_user.username
+    
+    if not is_admin(username):
+        await update.message.reply_text("❌ Sizda admin huquqi yo'q.")
+        return
+    
+    outbox = context.application.bot_data.get('outbox')
+    if not outbox:
+        await update.message.reply_text("❌ Yuborish navbati ishlamayapti.")
+        return
+    
+    report = await outbox.lane_report()
+    limiter = outbox.limiter_status()
+    
+    text = (
+        "📬 **YUBORISH NAVBATI**\n\n"
+        "━━━━━━━━━━━━━━━━━━━━\n\n"
+    )
+    if limiter:
+        text += (
+            f"⚡ Tezlik: {limiter['rate']:.0f}/{limiter['base_rate']:.0f} xabar/s\n"
+            f"⏳ Flood wait: {limiter['flood_count']} marta\n\n"
+        )
+    else:
+        text += f"⚙️ Yuborish: {outbox.processes} ta alohida jarayonda\n\n"
+    
+    for lane in report:
+        text += (
+            f"**{lane['lane']}**\n"
+            f"   Navbatda: {lane['pending']}\n"
+            f"   Yuborildi: {lane['sent']} (xato: {lane['failed']}, to'xtatildi: {lane['preempted']})\n"
+            f"   Kechikish: o'rtacha {lane['avg']:.1f} s, p95 {lane['p95']:.1f} s, max {lane['max']:.1f} s\n\n"
+        )
+    
+    from services.media import get_cache_report
+    media_cache = await get_cache_report()
+    lookups = media_cache['hits'] + media_cache['misses']
+    hit_rate = media_cache['hits'] / lookups * 100 if lookups else 0
+    text += (
+        f"🖼 Media kesh: {media_cache['hits']} hit / {media_cache['misses']} miss "
+        f"({hit_rate:.0f}%), {media_cache['entries']} ta yozuv\n\n"
+    )
+    
+    dedup = context.application.bot_data.get('dedup')
+    if dedup is not None:
+        text += f"🧬 Takroriy yangiliklar: {dedup.suppressed} ta to'xtatildi, indeksda {len(dedup)} ta\n\n"
+    
+    pipeline = context.application.bot_data.get('pipeline')
+    if pipeline:
+        text += "━━━━━━━━━━━━━━━━━━━━\n\n🏭 **PIPELINE**\n\n"
+        for stage in pipeline.depths():
+            text += (
+                f"**{stage['stage']}**: navbat {stage['queued']}/{stage['capacity']}, "
+                f"ishlamoqda {stage['busy']}/{stage['workers']}\n"
+                f"   O'tdi: {stage['processed']}, tashlandi: {stage['dropped']}, xato: {stage['failed']}, qayta: {stage['retried']}\n"
+            )
+        text += "\n"
+    
+    text += "━━━━━━━━━━━━━━━━━━━━"
+    
+    await update.message.reply_text(text, parse_mode='Markdown')
+
+async def restart_bot_with_confirmation(chat_id: int, message_text: str = None, outbox=None):
     """
     Botni qayta ishga tushirish va tasdiqlash xabari yuborish
     
     Args:
         chat_id: Xabar yuboriladigan chat ID
         message_text: Qo'shimcha xabar matni (agar kerak bo'lsa)
+        outbox: bot_data['outbox'] - execv dan oldin to'xtatiladi (aks holda
+            eski delivery jarayonlari yangilari bilan birga ishlab qoladi)
     """
     import os
     import sys
@@ -982,6 +945,9 @@ async def restart_bot_with_confirmation(chat_id: int, message_text: str = None):
     # 2 soniya kutish (xabar yuborilishi uchun)
     await asyncio.sleep(2)
     
+    if outbox is not None:
+        await outbox.stop()
+    
     # Botni qayta ishga tushirish
     os.execv(sys.executable, ['python'] + sys.argv)
 
@@ -1058,7 +1024,9 @@ async def add_language_command(update: Update, context: ContextTypes.DEFAULT_TYP
             )
             
             # Botni qayta ishga tushirish
-            await restart_bot_with_confirmation(update.effective_chat.id)
+            await restart_bot_with_confirmation(
+                update.effective_chat.id, outbox=context.application.bot_data.get('outbox')
+            )
             
         else:
             await update.message.reply_text(
@@ -1140,7 +1108,9 @@ async def remove_language_command(update: Update, context: ContextTypes.DEFAULT_
         )
         
         # Botni qayta ishga tushirish
-        await restart_bot_with_confirmation(update.effective_chat.id)
+        await restart_bot_with_confirmation(
+            update.effective_chat.id, outbox=context.application.bot_data.get('outbox')
+        )
         
     except Exception as e:
         await update.message.reply_text(
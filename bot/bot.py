@@ -1,9 +1,15 @@
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters
-from config import BOT_TOKEN
+from telegram import Update
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, TypeHandler, filters
+from config import BOT_TOKEN, DELIVERY_GLOBAL_RATE, DELIVERY_PER_CHAT_INTERVAL
 from bot.handlers import start_command, interest_callback, interests_command, status_command
+from services.dispatcher import RateLimiter
+from services.retry import is_transient_error, is_unreachable_error, retry_after_seconds
+
+# Xabarning keyingi qismlari uchun joyida qayta urinishlar soni
+IN_PLACE_RETRIES = 3
 
 class NewsBot:
-    def __init__(self):
+    def __init__(self, global_rate: float = DELIVERY_GLOBAL_RATE):
         # Timeout ni oshirish (internet sekin bo'lsa)
         self.app = (
             Application.builder()
@@ -13,6 +19,11 @@ class NewsBot:
             .write_timeout(30.0)
             .build()
         )
+        # Telegram flood limitlari uchun (global + har bir chat)
+        self.rate_limiter = RateLimiter(
+            rate=global_rate,
+            per_chat_interval=DELIVERY_PER_CHAT_INTERVAL
+        )
         self._setup_handlers()
     
     def _setup_handlers(self):
@@ -22,18 +33,23 @@ class NewsBot:
             interest_callback, help_command, stats_command, 
             latest_command, search_command,
             keywords_command, breaking_command, activate_command,
-            handle_keyboard_buttons, start_trial_callback
+            handle_keyboard_buttons, start_trial_callback,
+            track_user_reachability
         )
         from bot.admin_handlers import (
             admin_panel_command, channels_command, add_channel_command,
             remove_channel_command, plans_command, set_price_command,
             users_command, add_plan_command, edit_plan_command, remove_plan_command,
             delete_user_command, delete_user_callback,
-            languages_command, add_language_command, remove_language_command
+            languages_command, add_language_command, remove_language_command,
+            delivery_command
         )
         from bot.language_handler import language_command, language_callback
         from bot.payment_handlers import show_plans, buy_plan_callback, check_payment_callback
         
+        # Har bir update (boshqa handlerlardan oldin): bloklash / qaytish kuzatuvi
+        self.app.add_handler(TypeHandler(Update, track_user_reachability), group=-1)
+        
         # Oddiy buyruqlar
         self.app.add_handler(CommandHandler("start", start_command))
         self.app.add_handler(CommandHandler("interests", interests_command))
@@ -63,6 +79,7 @@ class NewsBot:
         self.app.add_handler(CommandHandler("languages", languages_command))
         self.app.add_handler(CommandHandler("add_language", add_language_command))
         self.app.add_handler(CommandHandler("remove_language", remove_language_command))
+        self.app.add_handler(CommandHandler("delivery", delivery_command))
         
         # Callback va message handlers
         self.app.add_handler(CallbackQueryHandler(language_callback, pattern="^(set_lang_|first_lang_)"))
@@ -78,20 +95,29 @@ class NewsBot:
             handle_keyboard_buttons
         ))
     
-    async def send_news_to_user(self, telegram_id: int, news_text: str, category: str, channel: str, media=None, forward_info=None):
-        """Userga yangilik yuborish (media bilan yoki forward qilib, to'liq formatda, ko'p tillilik bilan)"""
-        # User tilini olish
-        from db.database import async_session
-        from db.models import User
-        from sqlalchemy import select
+    async def render_news(self, news_text: str, category: str, languages) -> dict:
+        """
+        Yangilikni har bir til uchun BIR MARTA tarjima qilish va formatlash
         
-        async with async_session() as session:
-            result = await session.execute(
-                select(User).where(User.telegram_id == telegram_id)
-            )
-            user = result.scalar_one_or_none()
-            user_lang = user.language if user else 'uz'
+        Fan-out oldidan chaqiriladi - tarjima soni O(userlar) emas, O(tillar)
+        Manba til bir marta aniqlanadi: o'zbek lotin/kirill tillariga tarjima
+        tarmoqsiz (transliteratsiya)
+        
+        Returns:
+            {lang: {'lang', 'category_name', 'caption', 'parts'}}
+        """
+        import asyncio
+        from services.translator import source_language
         
+        languages = list(dict.fromkeys(languages))  # Takrorlarsiz, tartib saqlanadi
+        source_lang = source_language(news_text)
+        rendered = await asyncio.gather(*(
+            self._render_for_language(news_text, category, lang, source_lang) for lang in languages
+        ))
+        return dict(zip(languages, rendered))
+    
+    async def _render_for_language(self, news_text: str, category: str, user_lang: str, source_lang: str = 'auto') -> dict:
+        """Bitta til uchun caption va bo'laklarni tayyorlash"""
         # Kategoriya nomini tarjima qilish
         from utils.translations import get_category_name
         category_name = get_category_name(category, user_lang)
@@ -99,8 +125,8 @@ class NewsBot:
         # Yangilik matnini tarjima qilish
         from services.translator import translate_text
         try:
-            print(f"   🔄 Tarjima qilinmoqda: {user_lang} tiliga...")
-            translated_news = await translate_text(news_text, user_lang)
+            print(f"   🔄 Tarjima qilinmoqda: {source_lang} -> {user_lang}...")
+            translated_news = await translate_text(news_text, user_lang, source_lang)
             print(f"   ✅ Tarjima tugadi: {len(translated_news)} belgi")
         except Exception as e:
             print(f"⚠️ Yangilik tarjimasi xatosi: {e}")
@@ -119,7 +145,7 @@ class NewsBot:
             footer = "📰 Other categories /interests"
         
         # PRODUCTION-SAFE: Build message with proper HTML escaping
-        from utils.telegram_formatter import build_news_message
+        from utils.telegram_formatter import build_news_message, split_message, format_italic
         caption = build_news_message(
             category_name=category_name,
             news_content=translated_news,
@@ -127,6 +153,39 @@ class NewsBot:
             escape_content=True  # CRITICAL: Escape external content
         )
         
+        # Telegram message limiti: 4096 belgi (text only) - bo'laklar oldindan tayyorlanadi
+        parts = split_message(caption, max_length=4096)
+        parts = [parts[0]] + [
+            f"{format_italic('(davomi)', escape=False)}\n\n{part}" for part in parts[1:]
+        ]
+        
+        return {
+            'lang': user_lang,
+            'category_name': category_name,
+            'caption': caption,
+            'parts': parts
+        }
+    
+    async def send_rendered_news(self, telegram_id: int, rendered: dict, media=None, forward_info=None):
+        """
+        Oldindan tayyorlangan (render_news) yangilikni userga yuborish
+        
+        Birinchi API chaqiruvidagi vaqtinchalik xatolar (RetryAfter, TimedOut,
+        NetworkError) yuqoriga uzatiladi - outbox keyinroq qayta yuboradi.
+        Bot bloklangan / chat topilmadi xatolari ham uzatiladi - outbox
+        userni reachable=False deb belgilaydi.
+        Keyingi qismlar (xabar allaqachon yuborilgan) shu yerda qayta urinadi,
+        aks holda qayta yuborishda user birinchi qismni ikki marta oladi.
+        
+        Returns:
+            Yuborilgan xabar (None - yuborilmadi)
+        """
+        from telegram.error import Forbidden, BadRequest
+        from utils.telegram_formatter import send_safe_message
+        
+        category_name = rendered['category_name']
+        caption = rendered['caption']
+        
         # Telegram caption limiti: 1024 belgi (media bilan)
         # Telegram message limiti: 4096 belgi (text only)
         
@@ -134,139 +193,161 @@ class NewsBot:
         try:
             # Agar forward_info bo'lsa - katta video, to'g'ridan-to'g'ri forward qilish
             if forward_info:
-                # Avval caption yuborish (kategoriya bilan)
-                from utils.telegram_formatter import send_safe_message
-                await send_safe_message(
+                # Avval videoni forward qilish - xato bo'lsa outbox qayta yuboradi
+                # (hali hech narsa yuborilmagan, kategoriya ikki marta bormaydi)
+                sent_message = await self._call_api(
+                    telegram_id, self.app.bot.forward_message,
+                    chat_id=telegram_id,
+                    from_chat_id=forward_info['channel'],
+                    message_id=forward_info['message_id']
+                )
+                
+                print(f"   ✅ Video forward qilindi: {telegram_id}")
+                
+                # Keyin kategoriya (video allaqachon yuborilgan - shu yerda qayta urinadi)
+                await self._call_api(
+                    telegram_id, send_safe_message,
+                    retry_in_place=True,
                     bot=self.app.bot,
                     chat_id=telegram_id,
                     text=category_name,
                     parse_mode="HTML"
                 )
                 
-                # Keyin videoni forward qilish
-                sent_message = await self.app.bot.forward_message(
+            # Album - bitta send_media_group (bitta bildirishnoma)
+            elif media and media['type'] == 'album':
+                from telegram import InputMediaPhoto, InputMediaVideo
+                
+                # Caption birinchi mediaga (1024 belgi limiti)
+                fits = len(caption) <= 1024
+                group = []
+                for i, item in enumerate(media['items']):
+                    input_media = InputMediaPhoto if item['type'] == 'photo' else InputMediaVideo
+                    if i == 0 and fits:
+                        group.append(input_media(item['file_id'], caption=caption, parse_mode="HTML"))
+                    else:
+                        group.append(input_media(item['file_id']))
+                
+                messages = await self._call_api(
+                    telegram_id, self.app.bot.send_media_group,
                     chat_id=telegram_id,
-                    from_chat_id=forward_info['channel'],
-                    message_id=forward_info['message_id']
+                    media=group
                 )
+                sent_message = messages[0] if messages else None
                 
-                print(f"   ✅ Video forward qilindi: {telegram_id}")
+                if not fits:
+                    # To'liq text alohida yuborish (SAFE)
+                    await self._send_long_message(telegram_id, rendered['parts'], first_sent=True)
                 
             # Agar media bo'lsa - photo/video bilan yuborish
             elif media:
                 # Media file_id yoki file object bo'lishi mumkin
                 media_source = media.get('file_id') or media.get('file')
+                send_media = self.app.bot.send_photo if media['type'] == 'photo' else self.app.bot.send_video
+                media_arg = 'photo' if media['type'] == 'photo' else 'video'
                 
                 # Caption limiti: 1024 belgi
                 if len(caption) <= 1024:
-                    if media['type'] == 'photo':
-                        sent_message = await self.app.bot.send_photo(
-                            chat_id=telegram_id,
-                            photo=media_source,
-                            caption=caption,
-                            parse_mode="HTML"  # SAFE: Using HTML
-                        )
-                    elif media['type'] == 'video':
-                        sent_message = await self.app.bot.send_video(
-                            chat_id=telegram_id,
-                            video=media_source,
-                            caption=caption,
-                            parse_mode="HTML"  # SAFE: Using HTML
-                        )
+                    sent_message = await self._call_api(
+                        telegram_id, send_media,
+                        chat_id=telegram_id,
+                        caption=caption,
+                        parse_mode="HTML",  # SAFE: Using HTML
+                        **{media_arg: media_source}
+                    )
                 else:
                     # Caption juda uzun - media va text alohida yuborish
-                    if media['type'] == 'photo':
-                        sent_message = await self.app.bot.send_photo(
-                            chat_id=telegram_id,
-                            photo=media_source
-                        )
-                    elif media['type'] == 'video':
-                        sent_message = await self.app.bot.send_video(
-                            chat_id=telegram_id,
-                            video=media_source
-                        )
+                    sent_message = await self._call_api(
+                        telegram_id, send_media,
+                        chat_id=telegram_id,
+                        **{media_arg: media_source}
+                    )
                     
                     # To'liq text alohida yuborish (SAFE)
-                    await self._send_long_message(telegram_id, caption)
+                    await self._send_long_message(telegram_id, rendered['parts'], first_sent=True)
             else:
-                # Faqat text - uzun bo'lsa bo'laklarga ajratish (SAFE)
-                await self._send_long_message(telegram_id, caption)
+                # Faqat text - uzun bo'lsa bo'laklarga ajratilgan (SAFE)
+                sent_message = await self._send_long_message(telegram_id, rendered['parts'])
                 
         except Exception as e:
-            import telegram
-            if isinstance(e, telegram.error.Forbidden):
+            if sent_message is None and (is_transient_error(e) or is_unreachable_error(e)):
+                raise  # Outbox hal qiladi (qayta yuborish yoki userni chiqarib tashlash)
+            if isinstance(e, Forbidden):
                 print(f"❌ User {telegram_id} botni block qilgan")
-            elif isinstance(e, telegram.error.BadRequest):
+            elif isinstance(e, BadRequest):
                 print(f"❌ Noto'g'ri so'rov ({telegram_id}): {e}")
             else:
                 print(f"❌ Xatolik ({telegram_id}): {e}")
         
-        return sent_message  # Yuborilgan xabarni qaytarish
+        return sent_message  # Yuborilgan xabarni qaytarish (None - yuborilmadi)
     
-    async def _send_long_message(self, telegram_id: int, text: str):
+    async def _send_long_message(self, telegram_id: int, parts: list, first_sent: bool = False):
         """
-        Uzun xabarni bo'laklarga ajratib yuborish (4096 belgi limiti)
+        Bo'laklarga ajratilgan xabarni ketma-ket yuborish (4096 belgi limiti)
         PRODUCTION-SAFE: Uses HTML with automatic fallback
+        
+        Args:
+            first_sent: Bu userga shu yangilikdan nimadir allaqachon yuborilgan
+        
+        Returns:
+            Birinchi yuborilgan xabar (None - yuborilmadi)
         """
         from utils.telegram_formatter import send_safe_message
         
-        MAX_LENGTH = 4096
+        # Spam oldini olish: rate_limiter har bir chat uchun pauza qiladi
+        first_message = None
+        for i, part in enumerate(parts):
+            try:
+                message = await self._call_api(
+                    telegram_id, send_safe_message,
+                    retry_in_place=first_sent or i > 0,
+                    bot=self.app.bot,
+                    chat_id=telegram_id,
+                    text=part,
+                    parse_mode="HTML",  # SAFE: Using HTML
+                    fallback_to_plain=True  # CRITICAL: Auto-fallback
+                )
+            except Exception as e:
+                if i == 0 and not first_sent:
+                    raise
+                # Xabar boshi allaqachon yuborilgan - qayta yuborib bo'lmaydi
+                print(f"❌ Xabar qismi yuborilmadi ({telegram_id}, {i + 1}/{len(parts)}): {e}")
+                break
+            if i == 0:
+                first_message = message
+        
+        return first_message
+    
+    async def _call_api(self, telegram_id: int, method, retry_in_place: bool = False, **kwargs):
+        """
+        Bot API chaqiruvi (rate limit + flood control bilan)
         
-        if len(text) <= MAX_LENGTH:
-            # Qisqa xabar - bir martada yuborish (SAFE)
-            await send_safe_message(
-                bot=self.app.bot,
-                chat_id=telegram_id,
-                text=text,
-                parse_mode="HTML",  # SAFE: Using HTML
-                fallback_to_plain=True  # CRITICAL: Auto-fallback
-            )
-        else:
-            # Uzun xabar - bo'laklarga ajratish
-            parts = []
-            current_part = ""
-            
-            # Paragraflar bo'yicha ajratish
-            paragraphs = text.split('\n')
-            
-            for para in paragraphs:
-                if len(current_part) + len(para) + 1 <= MAX_LENGTH:
-                    current_part += para + '\n'
-                else:
-                    if current_part:
-                        parts.append(current_part.strip())
-                    current_part = para + '\n'
-            
-            if current_part:
-                parts.append(current_part.strip())
-            
-            # Har bir qismni yuborish (SAFE)
-            for i, part in enumerate(parts):
-                if i == 0:
-                    # Birinchi qism
-                    await send_safe_message(
-                        bot=self.app.bot,
-                        chat_id=telegram_id,
-                        text=part,
-                        parse_mode="HTML",
-                        fallback_to_plain=True
-                    )
+        RetryAfter bo'lsa - global tezlik kamaytiriladi (rate_limiter.on_flood).
+        retry_in_place=True bo'lsa vaqtinchalik xatolarda shu yerda qayta urinadi,
+        aks holda xato yuqoriga uzatiladi.
+        """
+        import asyncio
+        from telegram.error import RetryAfter
+        
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(telegram_id)
+            try:
+                return await method(**kwargs)
+            except Exception as e:
+                if isinstance(e, RetryAfter):
+                    delay = retry_after_seconds(e)
+                    self.rate_limiter.on_flood(delay)
+                    print(f"⏳ Flood control: {delay} s kutiladi ({telegram_id})")
+                elif is_transient_error(e):
+                    delay = min(2 ** attempt, 30)
                 else:
-                    # Davomi
-                    from utils.telegram_formatter import format_italic
-                    continuation_text = f"{format_italic('(davomi)', escape=False)}\n\n{part}"
-                    
-                    await send_safe_message(
-                        bot=self.app.bot,
-                        chat_id=telegram_id,
-                        text=continuation_text,
-                        parse_mode="HTML",
-                        fallback_to_plain=True
-                    )
+                    raise
                 
-                # Spam oldini olish uchun kichik pauza
-                import asyncio
-                await asyncio.sleep(0.5)
+                attempt += 1
+                if not retry_in_place or attempt > IN_PLACE_RETRIES:
+                    raise
+                await asyncio.sleep(delay)
     
     async def start(self):
         """Botni ishga tushirish"""
@@ -1,4 +1,5 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+from telegram.constants import ChatType
 from telegram.ext import ContextTypes
 from sqlalchemy import select
 from db.models import User, UserInterest
@@ -33,6 +34,33 @@ def get_main_keyboard(is_admin=False, lang='uz'):
         input_field_placeholder="Buyruqni tanlang..."
     )
 
+async def track_user_reachability(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Har bir update da: user botga murojaat qilsa - yana yangiliklar oladi,
+    botni bloklasa (my_chat_member: kicked) - fan-out dan chiqariladi
+    
+    Faqat shaxsiy chat; DB ga faqat holat o'zgarganda yoziladi.
+    """
+    from services.user_matcher import mark_reachable, mark_unreachable, is_reachable
+    
+    user = update.effective_user
+    chat = update.effective_chat
+    if not user or not chat or chat.type != ChatType.PRIVATE:
+        return
+    
+    member_update = update.my_chat_member
+    kicked = bool(member_update and member_update.new_chat_member.status == 'kicked')
+    
+    async with async_session() as session:
+        # Holat DB dan o'qiladi: outbox shard jarayonlari ham reachable ni o'zgartiradi
+        reachable = await is_reachable(session, user.id)
+        if reachable is None or reachable != kicked:
+            return
+        if kicked:
+            await mark_unreachable(session, [user.id])
+        else:
+            await mark_reachable(session, user.id)
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     /start - Botni boshlash (til tanlash bilan)
@@ -23,38 +23,29 @@ CHANNELS_TO_MONITOR = [
     '@yangiliklar331',
 ]
 
-# Kategoriyalar va kalit so'zlar (kengaytirilgan + kirill)
+# Kategoriyalar va kalit so'zlar (kengaytirilgan)
+# Kalit so'zlar bitta yozuvda yoziladi: qidiruvdan oldin matn ham, kalit
+# so'zlar ham normalize_uz orqali lotinga keltiriladi - kirill postlar
+# (ўқувчи, ҳаво ...) lotin kalit so'zlarga mos keladi
 CATEGORIES = {
     'siyosat': [
-        # Lotin
         'prezident', 'parlament', 'saylov', 'hukumat', 'vazir', 'qonun', 'davlat', 
         'hokimiyat', 'senat', 'oliy majlis', 'deputat', 'farmon', 'qaror', 'lavozim',
-        'ishdan olindi', 'tayinlandi', 'vazirlik', 'hokimlik',
-        # Kirill
-        'президент', 'парламент', 'сайлов', 'ҳукумат', 'вазир', 'қонун', 'давлат',
-        'ҳокимият', 'сенат', 'олий мажлис', 'депутат', 'фармон', 'қарор', 'лавозим',
-        'ишдан олинди', 'тайинланди', 'вазирлик', 'ҳокимлик'
+        'ishdan olindi', 'tayinlandi', 'vazirlik', 'hokimlik'
     ],
     'iqtisod': [
-        # Lotin
         'dollar', 'narx', 'bozor', 'bank', 'investitsiya', 'biznes', 'iqtisodiyot', 
         'savdo', 'valyuta', 'kurs', 'pul', 'moliya', 'soliq', 'byudjet',
         'ish haqi', 'ish haq', 'maosh', 'daromad', 'o\'sish', 'kamayish',
-        'real', 'nominal', 'foiz', 'statistika', 'iqtisod',
-        # Kirill
-        'доллар', 'нарх', 'бозор', 'банк', 'инвестиция', 'бизнес', 'иқтисодиёт',
-        'савдо', 'валюта', 'курс', 'пул', 'молия', 'солиқ', 'бюджет',
-        'иш ҳақи', 'иш ҳақ', 'маош', 'даромад', 'ўсиш', 'камайиш',
-        'реал', 'номинал', 'фоиз', 'статистика', 'иқтисод'
+        'real', 'nominal', 'foiz', 'statistika', 'iqtisod'
     ],
     'jamiyat': [
-        # Lotin
         'ta\'lim', 'madaniyat', 'aholi', 'ijtimoiy', 'jamiyat', 'xalq', 
         'maktab', 'universitet', 'o\'quvchi', 'talaba', 'o\'qituvchi',
         'imtihon', 'test', 'grant', 'stipendiya', 'ta\'lim tizimi',
-        'maktab', 'bog\'cha', 'kollej', 'litsey', 'akademiya',
-        'festival', 'konsert', 'teatr', 'kino', 'san\'at', 'rasm',
-        'musiqa', 'she\'r', 'adabiyat', 'kitob', 'kutubxona',
+        'bog\'cha', 'kollej', 'litsey', 'akademiya',
+        'festival', 'konsert', 'kontsert', 'teatr', 'kino', 'san\'at', 'rasm',
+        'musiqa', 'she\'r', 'adabiyat', 'adabiyot', 'kitob', 'kutubxona',
         # Transport va ekologiya
         'transport', 'avtomobil', 'mashina', 'yo\'l', 'yo\'lovchi', 'haydovchi',
         'avtobus', 'metro', 'tramvay', 'taksi', 'yuk', 'yuk mashinasi',
@@ -66,74 +57,40 @@ CATEGORIES = {
         # Dayjest va umumiy
         'dayjest', 'hafta', 'haftalik', 'xulosa', 'sharh', 'tahlil',
         'ko\'rib chiqish', 'umumiy', 'turli', 'har xil', 'aralash',
-        'ortda qolayotgan', 'o\'tgan hafta', 'o\'tgan kun',
-        # Kirill
-        'таълим', 'маданият', 'аҳоли', 'ижтимоий', 'жамият', 'халқ',
-        'мактаб', 'университет', 'ўқувчи', 'талаба', 'ўқитувчи',
-        'имтиҳон', 'тест', 'грант', 'стипендия', 'таълим тизими',
-        'боғча', 'коллеж', 'лицей', 'академия',
-        'фестивал', 'концерт', 'театр', 'кино', 'санъат', 'расм',
-        'мусиқа', 'шеър', 'адабиёт', 'китоб', 'кутубхона',
-        # Transport va ekologiya (kirill)
-        'транспорт', 'автомобил', 'машина', 'йўл', 'йўловчи', 'ҳайдовчи',
-        'автобус', 'метро', 'трамвай', 'такси', 'юк', 'юк машинаси',
-        'автотранспорт', 'йўл-транспорт', 'ҳодиса', 'бахтсиз ҳодиса',
-        'экология', 'атроф-муҳит', 'табиат', 'ифлос', 'тоза', 'ҳаво',
-        'экостикер', 'стикер', 'рақам', 'давлат рақами', 'техник кўрик',
-        'гувоҳнома', 'ҳайдовчилик гувоҳномаси', 'права', 'жарима',
-        'йўл қоидалари', 'йўл белгиси', 'светофор', 'пиёда',
-        # Dayjest va umumiy (kirill)
-        'дайжест', 'ҳафта', 'ҳафталик', 'хулоса', 'шарҳ', 'таҳлил'
+        'ortda qolayotgan', 'o\'tgan hafta', 'o\'tgan kun'
     ],
     'sport': [
-        # Lotin
         'futbol', 'o\'yin', 'jamoa', 'chempion', 'liga', 'kubok', 'o\'yinchi',
         'murabbiy', 'stadion', 'gol', 'tennis', 'boks', 'kurash', 'basketbol',
         'voleybol', 'olimpiada', 'medal', 'sport', 'turnir', 'match', 'g\'alaba',
         'mag\'lubiyat', 'durang', 'final', 'yarim final', 'pley-off', 'transfer',
         'kontrak', 'jazo', 'sariq kartochka', 'qizil kartochka', 'penalti',
-        # Kirill
-        'футбол', 'ўйин', 'жамоа', 'чемпион', 'лига', 'кубок', 'ўйинчи',
-        'мураббий', 'стадион', 'гол', 'теннис', 'бокс', 'кураш', 'баскетбол',
-        'волейбол', 'олимпиада', 'медал', 'спорт', 'турнир', 'матч', 'ғалаба',
-        'мағлубият', 'дуранг', 'финал', 'ярим финал', 'плей-офф', 'трансфер',
-        'контракт', 'жазо', 'сариқ карточка', 'қизил карточка', 'пеналти',
         # Inglizcha
-        'football', 'soccer', 'basketball', 'tennis', 'boxing', 'match', 'goal',
+        'football', 'soccer', 'basketball', 'boxing', 'goal',
         'champion', 'league', 'cup', 'player', 'coach', 'stadium', 'win', 'lose'
     ],
     'texnologiya': [
         'apple', 'google', 'iphone', 'dastur', 'AI', 'sun\'iy intellekt', 
-        'texnologiya', 'internet', 'telefon', 'kompyuter', 'android',
-        'дастур', 'сунъий интеллект', 'технология', 'интернет', 'телефон', 'компьютер'
+        'texnologiya', 'internet', 'telefon', 'kompyuter', 'android'
     ],
     'dunyo': [
         'xalqaro', 'mamlakatlar', 'urush', 'tinchlik', 'jahon', 'dunyo', 
-        'aqsh', 'rossiya', 'xitoy', 'yevropa',
-        'халқаро', 'мамлакатлар', 'уруш', 'тинчлик', 'жаҳон', 'дунё',
-        'aqsh', 'россия', 'хитой', 'европа'
+        'aqsh', 'rossiya', 'xitoy', 'yevropa'
     ],
     'salomatlik': [
         'kasallik', 'shifokor', 'bemor', 'shifoxona', 'salomatlik', 'tibbiyot', 
-        'dori', 'homila', 'tuxum', 'ovqat', 'parhez', 'vitamin',
-        'касаллик', 'шифокор', 'бемор', 'шифохона', 'саломатлик', 'тиббиёт',
-        'дори', 'ҳомила', 'тухум', 'овқат', 'парҳез', 'витамин'
+        'dori', 'homila', 'tuxum', 'ovqat', 'parhez', 'vitamin'
     ],
     'obhavo': [
-        # Lotin
         'ob-havo', 'obhavo', 'havo', 'harorat', 'yomg\'ir', 'qor', 'shamol',
         'bulut', 'quyosh', 'sovuq', 'issiq', 'nam', 'prognoz', 'iqlim',
-        'daraja', 'gradus', 'celsius', 'tuman', 'yog\'in', 'chang', 'bo\'ron',
-        # Kirill
-        'об-ҳаво', 'обҳаво', 'ҳаво', 'ҳарорат', 'ёмғир', 'қор', 'шамол',
-        'булут', 'қуёш', 'совуқ', 'иссиқ', 'нам', 'прогноз', 'иқлим',
-        'даража', 'градус', 'цельсий', 'туман', 'ёғин', 'чанг', 'бўрон',
+        'daraja', 'gradus', 'celsius', 'tselsiy', 'tuman', 'yog\'in', 'chang', 'bo\'ron',
         # Inglizcha
         'weather', 'temperature', 'rain', 'snow', 'wind', 'forecast',
-        'celsius', 'degree', 'cloud', 'sun', 'cold', 'hot', 'humidity',
+        'degree', 'cloud', 'sun', 'cold', 'hot', 'humidity',
         # Ruscha
-        'погода', 'температура', 'дождь', 'снег', 'ветер', 'прогноз',
-        'градус', 'облако', 'солнце', 'холод', 'жара'
+        'погода', 'температура', 'дождь', 'снег', 'ветер',
+        'облако', 'солнце', 'холод', 'жара'
     ]
 }
 
@@ -161,4 +118,69 @@ SUBSCRIPTION_PLANS = {
         'duration_days': 30,
         'emoji': '⭐',
         'category_limit': None  # Cheksiz
-    },}
\ No newline at end of file
+    },}
+
+# Yangiliklarni yuborish (fan-out) sozlamalari
+DELIVERY_CONCURRENCY = 20  # Bir vaqtda nechta userga yuboriladi
+DELIVERY_GLOBAL_RATE = 30  # Telegram limiti: ~30 xabar/soniya
+DELIVERY_PER_CHAT_INTERVAL = 1.0  # Bitta chatga xabarlar orasidagi minimal vaqt (soniya)
+# Yuborish uchun alohida jarayonlar soni (0 - asosiy jarayonda yuboriladi).
+# Har bir jarayon telegram_id % N shardini yuboradi, global limit N ga bo'linadi
+DELIVERY_WORKER_PROCESSES = 0
+
+# Restart dan keyin har bir kanaldan olinadigan o'tkazib yuborilgan postlar (maksimum)
+BACKFILL_MAX_MESSAGES = 300
+
+# Album (bir nechta rasm/video bitta postda) xabarlari shuncha soniya ichida yig'iladi
+ALBUM_WINDOW = 1.5
+
+# Qayta ishlash pipeline'i: ingest -> classify -> persist -> media -> render -> deliver
+PIPELINE_QUEUE_SIZE = 100  # Har bir bosqich navbati hajmi (to'lsa oldingi bosqich kutadi)
+PIPELINE_WORKERS = {
+    'classify': 2,
+    'persist': 1,  # Bitta - duplicate tekshiruvi poyga holatisiz
+    'media': 3,  # Bir vaqtda yuklanadigan media
+    'render': 2,  # Userlarni topish + tarjima
+    'deliver': 1,
+}
+PIPELINE_MAX_RETRIES = 3  # Bosqich xato bersa - shuncha marta qayta urinish, keyin tashlab yuboriladi
+PIPELINE_RETRY_DELAY = 5  # Birinchi qayta urinishgacha (sekund), keyingilari 2 baravar
+
+# Media yuklab olish (kanal -> Bot API file_id)
+MEDIA_MEMORY_MAX_BYTES = 5 * 1024 * 1024  # Bundan kichiklari xotirada (BytesIO)
+MEDIA_DOWNLOAD_MAX_BYTES = 50 * 1024 * 1024  # Bot API upload limiti - kattaroqlari forward qilinadi
+MEDIA_TEMP_DIR = os.getenv('MEDIA_TEMP_DIR') or None  # Vaqtinchalik fayllar (None - tizim papkasi)
+MEDIA_UPLOAD_TIMEOUT = 300  # Katta fayl yuklash uchun write timeout (soniya)
+# file_id olish uchun yopiq kanal (bot admin bo'lishi kerak), masalan -1001234567890.
+# Sozlanmasa - admin ga yuborilib o'chiriladi
+MEDIA_STORAGE_CHAT_ID = int(os.getenv('MEDIA_STORAGE_CHAT_ID')) if os.getenv('MEDIA_STORAGE_CHAT_ID') else None
+MEDIA_UPLOAD_CONCURRENCY = 2  # Bir vaqtda yuklanadigan media
+MEDIA_HARVEST_WAIT = 20.0  # Pipeline file_id ni shuncha kutadi, keyin forward qiladi (soniya)
+
+# Yuborish navbati (outbox)
+OUTBOX_BATCH_SIZE = 100  # Bir martada navbatdan olinadigan yozuvlar
+OUTBOX_POLL_INTERVAL = 2.0  # Navbat bo'sh bo'lsa tekshirish oralig'i (soniya)
+OUTBOX_RETENTION_DAYS = 7  # Tugagan yozuvlar necha kun saqlanadi
+OUTBOX_MAX_ATTEMPTS = 5  # Tarmoq xatolarida maksimal urinishlar
+OUTBOX_RETRY_BASE_DELAY = 5  # Birinchi qayta urinishgacha (soniya), keyin 2x
+OUTBOX_RETRY_MAX_DELAY = 600  # Maksimal kutish (soniya)
+
+# Shoshilinch (breaking) yangilik belgilari - bunday postlar navbatda birinchi yuboriladi
+BREAKING_KEYWORDS = [
+    'shoshilinch', 'tezkor xabar', 'srochno', 'breaking',
+    'шошилинч', 'тезкор хабар', 'срочно', 'молния',
+    '🚨',
+]
+
+# Bir xil yangilikni (turli kanallardan) qayta yubormaslik - MinHash LSH
+DEDUP_WINDOW_HOURS = 48  # Shuncha soatlik yangiliklar bilan solishtiriladi
+DEDUP_THRESHOLD = 0.6  # Taxminiy o'xshashlik (Jaccard) shundan yuqori bo'lsa - duplicate
+DEDUP_NUM_PERM = 64  # MinHash signatura uzunligi
+DEDUP_BANDS = 16  # LSH bandlari (har birida DEDUP_NUM_PERM / DEDUP_BANDS qiymat)
+
+# Lokal kategoriya modeli (train_local_model.py bilan o'qitiladi, tarmoqsiz)
+LOCAL_MODEL_PATH = os.getenv('LOCAL_MODEL_PATH', 'news_classifier.model')  # Fayl yo'q bo'lsa - faqat kalit so'zlar
+LOCAL_MODEL_BUCKETS = 1 << 18  # Hash kataklari soni (so'z va bigramlar)
+LOCAL_MODEL_MIN_CONFIDENCE = 0.6  # Bundan past ishonchda - kalit so'zlar hal qiladi
+# Birinchi ikki kategoriya birga shuncha ishonchli bo'lsa - ikkisidan birini kalit so'z ballari tanlaydi
+LOCAL_MODEL_PAIR_CONFIDENCE = 0.8
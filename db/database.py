@@ -1,9 +1,18 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from db.models import Base
 from config import DATABASE_URL
 
 engine = create_async_engine(DATABASE_URL, echo=False)
+
+if engine.url.get_backend_name() == 'sqlite':
+    @event.listens_for(engine.sync_engine, 'connect')
+    def _enable_wal(dbapi_connection, connection_record):
+        """SQLite WAL rejimi - delivery worker jarayonlari bir vaqtda o'qiydi/yozadi"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def init_db():
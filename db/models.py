@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -18,6 +18,10 @@ class User(Base):
     subscription_plan = Column(String, nullable=True)  # 'basic' | 'premium' | None
     subscription_end = Column(DateTime, nullable=True)
     
+    # Bot bloklangan / akkaunt o'chirilgan bo'lsa - yangiliklar yuborilmaydi
+    reachable = Column(Boolean, default=True, nullable=False)
+    unreachable_since = Column(DateTime, nullable=True)
+    
     interests = relationship('UserInterest', back_populates='user', cascade='all, delete-orphan')
 
 class UserInterest(Base):
@@ -36,6 +40,7 @@ class Channel(Base):
     username = Column(String, unique=True, nullable=False)
     title = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    last_seen_message_id = Column(Integer, nullable=True)  # Qayerdan davom ettirish (restart dan keyin)
 
 class News(Base):
     __tablename__ = 'news'
@@ -49,10 +54,55 @@ class News(Base):
     sent_count = Column(Integer, default=0)
     
     # Media fields
-    media_type = Column(String, nullable=True)  # 'photo' | 'video' | None
+    media_type = Column(String, nullable=True)  # 'photo' | 'video' | 'album' | None
     media_file_id = Column(String, nullable=True)  # Telegram file_id (kichik media uchun)
+    media_group = Column(Text, nullable=True)  # Album: JSON [{'type', 'file_id'}, ...]
     channel_username = Column(String, nullable=True)  # Forward uchun kanal username
     channel_message_id = Column(Integer, nullable=True)  # Forward uchun message ID
+    
+    # Takroriy yangiliklar (processor/dedup.py)
+    minhash = Column(LargeBinary, nullable=True)  # MinHash signatura (DEDUP_NUM_PERM x 8 bayt)
+    duplicate_of = Column(Integer, ForeignKey('news.id'), nullable=True)  # Asl yangilik (qayta yuborilmaydi)
+
+
+class Delivery(Base):
+    """Yuborish navbati (outbox) - restart bo'lsa ham davom etadi"""
+    __tablename__ = 'deliveries'
+    
+    id = Column(Integer, primary_key=True)
+    news_id = Column(Integer, ForeignKey('news.id'), nullable=False)
+    telegram_id = Column(Integer, nullable=False)
+    lang = Column(String, default='uz', nullable=False)  # uz, uz_cyrl, ru, en
+    priority = Column(Integer, default=1, nullable=False)  # 0 - breaking, 1 - normal, 2 - backfill
+    
+    # Navbat holati
+    status = Column(String, default='pending')  # 'pending' | 'sending' | 'done' | 'failed' | 'unknown'
+    attempt = Column(Integer, default=0)  # Urinishlar soni
+    next_at = Column(DateTime, default=datetime.utcnow)  # Qachondan yuborish mumkin
+    
+    # Vaqt
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint('news_id', 'telegram_id', name='uq_deliveries_news_user'),
+        Index('ix_deliveries_status_next_at', 'status', 'next_at'),
+        Index('ix_deliveries_status_priority', 'status', 'priority', 'id'),
+    )
+
+
+class MediaCache(Base):
+    """Kanal media si (Telethon id) -> Bot API file_id - qayta yuklamaslik uchun"""
+    __tablename__ = 'media_cache'
+    
+    id = Column(Integer, primary_key=True)
+    media_key = Column(String, unique=True, nullable=False)  # 'photo:<id>:<access_hash>' | 'document:<id>:<access_hash>'
+    media_type = Column(String, nullable=False)  # 'photo' | 'video'
+    file_id = Column(String, nullable=False)
+    size = Column(Integer, nullable=True)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
 
 
 class Payment(Base):
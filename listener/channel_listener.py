@@ -1,204 +1,460 @@
 from telethon import TelegramClient, events
-from config import API_ID, API_HASH, PHONE, CHANNELS_TO_MONITOR
-from processor.text_cleaner import clean_text
-from processor.classifier import classify_news
+from sqlalchemy import select, update, or_, func
+from config import API_ID, API_HASH, PHONE, CHANNELS_TO_MONITOR, BACKFILL_MAX_MESSAGES, ALBUM_WINDOW
+from db.database import async_session
+from db.models import Channel
+from processor.post import process_posts
 import asyncio
+import traceback
+
+
+def extract_post(message):
+    """
+    Telegram message dan matn va media olish
+
+    Returns:
+        (raw_text, media) yoki (None, None) - matn yo'q / juda qisqa
+    """
+    # Oddiy text post yoki video/photo caption
+    raw_text = message.text or message.message
+
+    # Agar text yo'q bo'lsa - o'tkazib yuborish
+    if not raw_text or len(raw_text.strip()) < 10:
+        return None, None
+
+    # Media olish (photo/video) - Telegram message object ni uzatish
+    media = None
+    if message.photo:
+        media = {
+            'type': 'photo',
+            'message': message  # To'liq message object
+        }
+    elif message.video:
+        media = {
+            'type': 'video',
+            'message': message  # To'liq message object
+        }
+    return raw_text, media
+
+
+def extract_album(messages):
+    """
+    Album xabarlarini (bir xil grouped_id) bitta postga birlashtirish
+
+    Returns:
+        {'message_id', 'last_message_id', 'raw_text', 'media'} yoki None
+        media: {'type': 'album', 'items': [{'type', 'message'}, ...]} (bitta bo'lsa - oddiy media)
+    """
+    messages = sorted(messages, key=lambda message: message.id)
+
+    # Caption odatda birinchi xabarda, lekin har qandayida bo'lishi mumkin
+    raw_text = next((message.text or message.message for message in messages if message.text or message.message), None)
+    if not raw_text or len(raw_text.strip()) < 10:
+        return None
+
+    items = [
+        {'type': 'photo' if message.photo else 'video', 'message': message}
+        for message in messages if message.photo or message.video
+    ]
+    if len(items) > 1:
+        media = {'type': 'album', 'items': items}
+    else:
+        media = items[0] if items else None
+
+    return {
+        'message_id': messages[0].id,
+        'last_message_id': messages[-1].id,  # Kursor uchun - album qayta olinmasligi uchun
+        'raw_text': raw_text,
+        'media': media,
+    }
+
+
+def group_posts(messages) -> list:
+    """
+    Xabarlarni postlarga aylantirish - albumlar birlashtiriladi, tartib saqlanadi
+
+    Returns:
+        [{'message_id', 'raw_text', 'media', ('last_message_id')}, ...]
+    """
+    groups = []
+    albums = {}
+    for message in messages:
+        if message.grouped_id:
+            if message.grouped_id not in albums:
+                albums[message.grouped_id] = []
+                groups.append(albums[message.grouped_id])
+            albums[message.grouped_id].append(message)
+        else:
+            groups.append(message)
+
+    posts = []
+    for group in groups:
+        if isinstance(group, list):
+            post = extract_album(group)
+        else:
+            raw_text, media = extract_post(group)
+            post = {'message_id': group.id, 'raw_text': raw_text, 'media': media} if raw_text else None
+        if post:
+            posts.append(post)
+    return posts
+
+
+async def advance_cursor(session, channel_id: int, message_id: int):
+    """Kanal kursorini oldinga surish (faqat kattaroq message_id bo'lsa)"""
+    await session.execute(
+        update(Channel)
+        .where(Channel.id == channel_id)
+        .where(or_(Channel.last_seen_message_id.is_(None), Channel.last_seen_message_id < message_id))
+        .values(last_seen_message_id=message_id)
+    )
+
 
 class ChannelListener:
     def __init__(self, news_callback):
         """
         news_callback: yangilik kelganda chaqiriladigan funksiya
+        (channel_username, message_id, raw_text, media, post=None,
+         backfill=False, last_message_id=None)
         """
         self.client = TelegramClient('news_session', API_ID, API_HASH)
         self.news_callback = news_callback
-    
+        self.channels = []  # Faol kanallar (username, @ siz) - Channel jadvalidan
+        self._event = None
+        self._albums = {}  # grouped_id -> {'channel_username', 'messages', 'last_at', 'task'}
+
     async def start(self):
         """Listener ni ishga tushirish"""
         await self.client.start(phone=PHONE)
         print("✅ Channel listener ishga tushdi")
-        
-        # Bot ishga tushganda oxirgi 24 soatdagi yangiliklar ni olish
+
+        # Kanallarni kuzatish - backfill dan OLDIN, oradagi postlar yo'qolmasligi uchun
+        # (ikki marta kelgani pipeline'da duplicate sifatida tashlanadi)
+        await self.reload_channels()
+
+        # Bot o'chiq bo'lgan paytdagi postlarni olish
         await self._fetch_recent_messages()
-        
-        # Kanallarni kuzatish
-        @self.client.on(events.NewMessage(chats=CHANNELS_TO_MONITOR))
-        async def handler(event):
-            # Text yoki caption olish
-            raw_text = None
-            
-            # Oddiy text post
-            if event.message.text:
-                raw_text = event.message.text
-            # Video/photo caption
-            elif event.message.message:
-                raw_text = event.message.message
-            
-            # Agar text yo'q bo'lsa - o'tkazib yuborish
-            if not raw_text or len(raw_text.strip()) < 10:
-                return
-            
+
+        await self.client.run_until_disconnected()
+
+    async def _handle_message(self, event):
+        if event.message.grouped_id:
+            # Album - qolgan xabarlarini kutib, bitta post sifatida yuborish
             channel = await event.get_chat()
-            
-            # Media olish (photo/video) - Telegram message object ni uzatish
-            media = None
-            if event.message.photo:
-                media = {
-                    'type': 'photo',
-                    'message': event.message  # To'liq message object
-                }
-            elif event.message.video:
-                media = {
-                    'type': 'video',
-                    'message': event.message  # To'liq message object
-                }
-            
-            # Tozalash va klassifikatsiya
-            cleaned = clean_text(raw_text)
-            category = classify_news(cleaned, channel.username)
-            
-            # Debug log
-            print(f"\n📨 Yangi xabar: @{channel.username}")
-            print(f"   Text: {raw_text[:100]}...")
-            media_status = media['type'] if media else "Yo'q"
-            print(f"   Media: {media_status}")
-            print(f"   Kategoriya: {category}")
-            
-            # Callback ga yuborish
-            await self.news_callback(
-                channel_username=channel.username,
-                message_id=event.message.id,
-                text=cleaned,
-                category=category,
-                raw_text=raw_text,
-                media=media
+            self._collect_album(channel.username, event.message)
+            return
+
+        raw_text, media = extract_post(event.message)
+        if not raw_text:
+            return
+
+        channel = await event.get_chat()
+
+        # Pipeline navbatiga qo'yish - tozalash, klassifikatsiya va yuborish
+        # alohida bosqichlarda (handler darhol qaytadi)
+        await self.news_callback(
+            channel_username=channel.username,
+            message_id=event.message.id,
+            raw_text=raw_text,
+            media=media
+        )
+
+    def _collect_album(self, channel_username: str, message):
+        """Album xabarini bufferga qo'shish (ALBUM_WINDOW ichida yangi xabar kelmasa - yuboriladi)"""
+        loop = asyncio.get_running_loop()
+        album = self._albums.get(message.grouped_id)
+        if album is None:
+            album = self._albums[message.grouped_id] = {
+                'channel_username': channel_username,
+                'messages': [],
+            }
+            album['task'] = asyncio.create_task(self._flush_album(message.grouped_id))
+        album['messages'].append(message)
+        album['last_at'] = loop.time()
+
+    async def _flush_album(self, grouped_id):
+        """Album yig'ilgach pipeline'ga yuborish (alohida task - xatolar shu yerda ushlanadi)"""
+        loop = asyncio.get_running_loop()
+        album = None
+        try:
+            while True:
+                delay = self._albums[grouped_id]['last_at'] + ALBUM_WINDOW - loop.time()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+            album = self._albums.pop(grouped_id)
+            post = extract_album(album['messages'])
+            if not post:
+                print(f"⚠️ Album: @{album['channel_username']} ({len(album['messages'])} ta xabar) - "
+                      f"matn yo'q yoki juda qisqa, o'tkazib yuborildi")
+                return
+            print(f"🖼 Album: @{album['channel_username']} ({len(album['messages'])} ta xabar)")
+            await self.news_callback(channel_username=album['channel_username'], **post)
+        except Exception as e:
+            if album is None:
+                album = self._albums.pop(grouped_id, None) or {'channel_username': '?'}
+            print(f"❌ Album @{album['channel_username']} (grouped_id={grouped_id}) yuborilmadi: {e}")
+            traceback.print_exc()
+
+    async def reload_channels(self) -> list:
+        """
+        Faol kanallarni Channel jadvalidan o'qib, NewMessage filtrini yangilash
+
+        Qayta ishga tushirishsiz - admin /add_channel, /remove_channel dan keyin chaqiriladi.
+        CHANNELS_TO_MONITOR dagi yangi kanallar jadvalga qo'shiladi.
+        """
+        self.channels = await self._load_active_channels()
+
+        if self._event is not None:
+            self.client.remove_event_handler(self._handle_message, self._event)
+        self._event = events.NewMessage(chats=self.channels)
+        self.client.add_event_handler(self._handle_message, self._event)
+
+        print(f"📡 Kuzatilayotgan kanallar: {', '.join('@' + username for username in self.channels)}")
+        return self.channels
+
+    async def _load_active_channels(self) -> list:
+        async with async_session() as session:
+            result = await session.execute(select(Channel.username, Channel.is_active))
+            known = dict(result.all())
+
+            # config dagi kanallar (boshlang'ich ro'yxat) - jadvalda yo'qlarini qo'shish.
+            # O'chirilganlari (is_active=False) qayta yoqilmaydi
+            missing = [
+                channel_username.lstrip('@') for channel_username in CHANNELS_TO_MONITOR
+                if channel_username.lstrip('@') not in known
+            ]
+            for username in missing:
+                session.add(Channel(username=username, is_active=True))
+                known[username] = True
+            if missing:
+                await session.commit()
+
+        return [username for username, is_active in known.items() if is_active]
+
+    async def add_channel(self, channel_username: str) -> tuple:
+        """
+        Kanalni kuzatishga qo'shish (yoki qayta yoqish)
+
+        Username Telegram'dagi ko'rinishida saqlanadi (@KunUz emas - kunuz
+        bo'lsa ham) - pipeline kanal yozuvini shu nom bilan topadi.
+
+        Returns:
+            (natija, username) - natija: 'added' | 'exists' (allaqachon faol) |
+            'not_found' (Telegram'da topilmadi)
+        """
+        # Avval kanal mavjudligini tekshirish: noto'g'ri username NewMessage(chats=...)
+        # filtriga tushsa, barcha kanallar uchun eventlar ishlamay qoladi
+        try:
+            entity = await self.client.get_entity(channel_username)
+        except Exception as e:
+            print(f"❌ @{channel_username} topilmadi: {e}")
+            return 'not_found', channel_username
+        channel_username = getattr(entity, 'username', None) or channel_username
+
+        async with async_session() as session:
+            result = await session.execute(
+                select(Channel).where(func.lower(Channel.username) == channel_username.lower())
             )
-        
-        print(f"📡 Kuzatilayotgan kanallar: {', '.join(CHANNELS_TO_MONITOR)}")
-        await self.client.run_until_disconnected()
-    
+            channel = result.scalars().first()
+            if channel and channel.is_active:
+                return 'exists', channel.username
+            if channel:
+                channel.is_active = True
+                channel.username = channel_username
+            else:
+                session.add(Channel(username=channel_username, is_active=True))
+            await session.commit()
+
+        await self.reload_channels()
+
+        # Kursor: keyingi restartda faqat shu paytdan keyingi postlar olinadi
+        try:
+            messages = await self.client.get_messages(channel_username, limit=1)
+            if messages:
+                await self._init_cursor(channel_username, messages[0].id)
+        except Exception as e:
+            print(f"⚠️ @{channel_username} kursorini o'rnatib bo'lmadi: {e}")
+        return 'added', channel_username
+
+    async def remove_channel(self, channel_username: str) -> bool:
+        """
+        Kanalni kuzatishdan olib tashlash (yozuv va yangiliklari saqlanadi)
+
+        Returns:
+            False - kanal topilmadi yoki allaqachon o'chirilgan
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                update(Channel)
+                .where(func.lower(Channel.username) == channel_username.lower())
+                .where(Channel.is_active.is_(True))
+                .values(is_active=False)
+            )
+            await session.commit()
+        if not result.rowcount:
+            return False
+
+        await self.reload_channels()
+        return True
+
     async def _fetch_recent_messages(self):
-        """Bot ishga tushganda barcha kategoriyalar uchun eng oxirgi yangiliklar ni olish"""
-        from datetime import datetime, timedelta, timezone
+        """
+        Bot ishga tushganda o'tkazib yuborilgan postlarni olish
+
+        - Kursori bor kanal: last_seen_message_id dan keyingi BARCHA postlar
+          (BACKFILL_MAX_MESSAGES gacha) pipeline orqali
+        - Kursori yo'q kanal (birinchi ishga tushish): har bir kategoriyadan
+          eng oxirgi 1 ta yangilik
+        Kanallar parallel o'qiladi.
+        """
         from config import CATEGORIES
-        
-        print("\n🔄 Barcha kategoriyalar uchun eng oxirgi yangiliklar yuklanmoqda...")
-        print("   ℹ️ Har bir kategoriyadan eng oxirgi 1 ta yangilik yuklanadi")
-        print(f"   📋 Kategoriyalar: {', '.join(CATEGORIES.keys())}")
-        
-        # Har bir kategoriya uchun eng oxirgi yangilikni saqlash
-        latest_by_category = {}
-        
-        # Barcha kategoriyalarni boshlang'ich qiymat bilan to'ldirish
-        for category in CATEGORIES.keys():
-            latest_by_category[category] = None
-        
-        for channel_username in CHANNELS_TO_MONITOR:
-            try:
-                # Kanalni olish
-                channel = await self.client.get_entity(channel_username)
-                
-                # Oxirgi 100 ta xabarni olish (barcha kategoriyalar uchun)
-                print(f"\n   🔍 @{channel_username}: oxirgi 100 ta post tekshirilmoqda...")
-                messages = await self.client.get_messages(channel, limit=100)
-                
-                processed_count = 0
-                
-                for message in messages:
-                    # Text olish
-                    raw_text = None
-                    if message.text:
-                        raw_text = message.text
-                    elif message.message:
-                        raw_text = message.message
-                    
-                    if not raw_text or len(raw_text.strip()) < 10:
-                        continue
-                    
-                    # Media olish - Telegram message object ni uzatish
-                    media = None
-                    if message.photo:
-                        media = {
-                            'type': 'photo',
-                            'message': message  # To'liq message object
-                        }
-                    elif message.video:
-                        media = {
-                            'type': 'video',
-                            'message': message  # To'liq message object
-                        }
-                    
-                    # Tozalash va klassifikatsiya
-                    cleaned = clean_text(raw_text)
-                    category = classify_news(cleaned, channel.username)
-                    
-                    # Agar kategoriya topilmasa - o'tkazib yuborish
-                    if not category or category == 'other':
-                        continue
-                    
-                    processed_count += 1
-                    
-                    # Har bir kategoriyadan eng oxirgi yangilikni saqlash
-                    # YANGI MANTIQ: Har doim eng oxirgi yangilikni olish (media bor yoki yo'q)
-                    # Agar kategoriya hali bo'sh bo'lsa - qo'shish
-                    if latest_by_category[category] is None:
-                        latest_by_category[category] = {
-                            'channel_username': channel.username,
-                            'message_id': message.id,
-                            'text': cleaned,
-                            'category': category,
-                            'raw_text': raw_text,
-                            'media': media,
-                            'date': message.date
-                        }
-                        media_status = f"({media['type']})" if media else "(media yo'q)"
-                        print(f"      ✅ {category}: yangilik topildi {media_status}")
-                    # Agar kategoriya bor lekin media yo'q bo'lsa - media bilan yangilikni qo'yish
-                    elif latest_by_category[category]['media'] is None and media is not None:
-                        latest_by_category[category] = {
-                            'channel_username': channel.username,
-                            'message_id': message.id,
-                            'text': cleaned,
-                            'category': category,
-                            'raw_text': raw_text,
-                            'media': media,
-                            'date': message.date
-                        }
-                        print(f"      🎥 {category}: media bilan yangilik topildi ({media['type']})")
-                
-                print(f"      📊 Jami {processed_count} ta yangilik qayta ishlandi")
-                
-            except Exception as e:
-                print(f"   ❌ @{channel_username}: {e}")
-        
-        # Endi har bir kategoriyadan eng oxirgi 1 tasini yuborish
+
+        cursors = await self._get_cursors()
+
+        print("\n🔄 O'tkazib yuborilgan yangiliklar yuklanmoqda...")
+        channels = list(self.channels)
+        results = await asyncio.gather(*(
+            self._fetch_channel(channel_username, cursors.get(channel_username))
+            for channel_username in channels
+        ))
+
+        # Kursorli kanallar: oradagi postlar (eskidan yangiga)
+        total_gap = 0
+        for channel_username, (mode, posts) in zip(channels, results):
+            if mode != 'gap':
+                continue
+            for post in posts:
+                await self.news_callback(**post, backfill=True)
+            total_gap += len(posts)
+        if total_gap:
+            print(f"   📥 Jami {total_gap} ta o'tkazib yuborilgan post pipeline'ga qo'shildi")
+
+        # Kursorsiz kanallar: har bir kategoriyadan eng oxirgi yangilik
+        latest_by_category = {category: None for category in CATEGORIES.keys()}
+        has_initial = False
+
+        for channel_username, (mode, posts) in zip(channels, results):
+            if mode != 'initial':
+                continue
+            has_initial = True
+            for post in posts:
+                category = post['post'].category
+                if category not in latest_by_category:
+                    # Noma'lum kategoriya (AI boshqa nom qaytargan) - o'tkazib yuborish
+                    continue
+                # Har doim eng oxirgi yangilikni olish (media bor yoki yo'q)
+                if latest_by_category.get(category) is None:
+                    latest_by_category[category] = post
+                    media_status = f"({post['media']['type']})" if post['media'] else "(media yo'q)"
+                    print(f"      ✅ {category}: yangilik topildi {media_status}")
+                # Agar kategoriya bor lekin media yo'q bo'lsa - media bilan yangilikni qo'yish
+                elif latest_by_category[category]['media'] is None and post['media'] is not None:
+                    latest_by_category[category] = post
+                    print(f"      🎥 {category}: media bilan yangilik topildi ({post['media']['type']})")
+
+        if not has_initial:
+            return
+
         print(f"\n   📊 NATIJA:")
         total_processed = 0
-        
+
         for category in CATEGORIES.keys():
             news_data = latest_by_category.get(category)
-            
+
             if news_data:
                 print(f"      ✅ {category}: yangilik yuborilmoqda...")
-                
-                # Callback ga yuborish
                 await self.news_callback(
-                    channel_username=news_data['channel_username'],
-                    message_id=news_data['message_id'],
-                    text=news_data['text'],
-                    category=news_data['category'],
-                    raw_text=news_data['raw_text'],
-                    media=news_data['media']
+                    **news_data,
+                    backfill=True  # Eng past prioritet - yangi postlardan keyin
                 )
-                
                 total_processed += 1
-                
-                # Spam oldini olish uchun pauza
-                await asyncio.sleep(0.5)
             else:
                 print(f"      ⚠️ {category}: yangilik topilmadi")
-        
+
         print(f"\n✅ Jami {total_processed}/{len(CATEGORIES)} ta kategoriya uchun yangilik yuklandi\n")
-    
+
+    async def _get_cursors(self) -> dict:
+        """username -> last_seen_message_id"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(Channel.username, Channel.last_seen_message_id)
+                .where(Channel.last_seen_message_id.isnot(None))
+            )
+            return dict(result.all())
+
+    async def _fetch_channel(self, channel_username: str, cursor):
+        """
+        Bitta kanal postlarini olish
+
+        Returns:
+            ('gap', [post, ...]) - kursordan keyingilar, eskidan yangiga
+            ('initial', [post, ...]) - oxirgi 100 ta (kategoriyasi bor), yangidan eskiga
+            ('error', [])
+        """
+        try:
+            channel = await self.client.get_entity(channel_username)
+
+            if cursor is not None:
+                # Telethon min_id bilan sahifalab (100 tadan) oladi
+                messages = [
+                    message async for message in self.client.iter_messages(
+                        channel, min_id=cursor, limit=BACKFILL_MAX_MESSAGES
+                    )
+                ]
+                if len(messages) >= BACKFILL_MAX_MESSAGES:
+                    print(f"   ⚠️ @{channel.username}: {BACKFILL_MAX_MESSAGES} tadan ko'p post o'tkazib yuborilgan, eng yangilari olinadi")
+
+                posts = group_posts(reversed(messages))
+                for post in posts:
+                    post['channel_username'] = channel.username
+                print(f"   🔍 @{channel.username}: #{cursor} dan keyin {len(messages)} ta post ({len(posts)} ta matnli)")
+                return 'gap', posts
+
+            # Birinchi ishga tushish - oxirgi 100 ta post
+            print(f"   🔍 @{channel_username}: oxirgi 100 ta post tekshirilmoqda...")
+            messages = await self.client.get_messages(channel, limit=100)
+
+            posts = []
+            grouped = group_posts(messages)
+            # Tozalash va klassifikatsiya - butun paket bir martada
+            # (pipeline natijani qayta hisoblamaydi)
+            processed = process_posts([post['raw_text'] for post in grouped], channel.username)
+            for post, processed_post in zip(grouped, processed):
+                # Agar kategoriya topilmasa - o'tkazib yuborish
+                if not processed_post.category or processed_post.category == 'other':
+                    continue
+
+                posts.append({
+                    **post,
+                    'channel_username': channel.username,
+                    'post': processed_post,
+                })
+
+            print(f"      📊 @{channel.username}: {len(posts)} ta yangilik qayta ishlandi")
+
+            # Kursorni eng oxirgi postga qo'yish - keyingi safar faqat yangilari
+            if messages:
+                await self._init_cursor(channel.username, messages[0].id)
+            return 'initial', posts
+
+        except Exception as e:
+            print(f"   ❌ @{channel_username}: {e}")
+            return 'error', []
+
+    async def _init_cursor(self, channel_username: str, message_id: int):
+        async with async_session() as session:
+            result = await session.execute(
+                select(Channel).where(Channel.username == channel_username)
+            )
+            channel = result.scalar_one_or_none()
+            if not channel:
+                channel = Channel(username=channel_username)
+                session.add(channel)
+                await session.flush()
+            await advance_cursor(session, channel.id, message_id)
+            await session.commit()
+
     async def stop(self):
         """Listener ni to'xtatish"""
         try:
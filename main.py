@@ -1,14 +1,22 @@
 import asyncio
+import json
 import logging
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, update, func
 from db.database import init_db, async_session
-from db.models import News, Channel
+from db.models import News, Channel, Delivery
 from bot.bot import NewsBot
-from listener.channel_listener import ChannelListener
-from services.user_matcher import get_matching_users
-from processor.text_cleaner import extract_preview, clean_text
-from processor.language_detector import is_uzbek
+from listener.channel_listener import ChannelListener, advance_cursor
+from services.user_matcher import get_matching_users, get_active_recipients
+from processor.post import process_post
+from processor.dedup import DedupIndex, minhash
+from services.dispatcher import NewsDispatcher
+from services.outbox import OutboxWorker, enqueue_deliveries, PRIORITY_BREAKING, PRIORITY_NORMAL, PRIORITY_BACKFILL, LANE_NAMES
+from services.pipeline import NewsPipeline, Stage
+from services.media import MediaHarvester
+from services.delivery_workers import ShardedDelivery
+from config import DELIVERY_CONCURRENCY, DELIVERY_WORKER_PROCESSES, PIPELINE_WORKERS, PIPELINE_QUEUE_SIZE
+from config import PIPELINE_MAX_RETRIES, PIPELINE_RETRY_DELAY
 
 # Logging sozlash
 logging.basicConfig(
@@ -24,29 +32,127 @@ logger = logging.getLogger(__name__)
 # Global bot instance
 bot = None
 
-async def on_new_news(channel_username, message_id, text, category, raw_text, media=None):
+# Fan-out dispatcher (parallel yuborish)
+dispatcher = NewsDispatcher(concurrency=DELIVERY_CONCURRENCY)
+
+# Yuborish navbati (outbox) worker
+outbox = None
+
+# Media -> file_id (kesh + saqlash chati)
+harvester = None
+
+# Qayta ishlash pipeline'i (ingest -> classify -> persist -> media -> render -> deliver)
+pipeline = None
+
+# Turli kanallardagi bir xil yangiliklar indeksi (MinHash LSH)
+dedup_index = None
+
+# Kanal kursori: pipeline'dagi (hali yakunlanmagan) postlar va yakunlanganlarning
+# eng kattasi - kursor yakunlanmagan postdan oldinga o'tmaydi
+_in_flight = {}  # channel_username -> {message_id, ...}
+_handled_max = {}  # channel_username -> last_message_id
+
+async def mark_handled(item):
+    """
+    Post yakunlandi (navbatga qo'yildi yoki ataylab tashlandi) - kanal kursorini surish
+
+    Kursor faqat shu kanalning barcha oldingi postlari ham yakunlangan bo'lsa
+    suriladi: restart bo'lsa, navbatlarda qolgan postlar qayta olinadi.
+    Xato bergan post on_pipeline_error da qayta uriniladi, urinishlar tugasa yakunlanadi.
+    """
+    channel_username = item['channel_username']
+    in_flight = _in_flight.get(channel_username, set())
+    in_flight.discard(item['message_id'])
+    handled = max(_handled_max.get(channel_username, 0), item['last_message_id'])
+    _handled_max[channel_username] = handled
+    if in_flight:
+        handled = min(handled, min(in_flight) - 1)
+    
+    async with async_session() as session:
+        channel_id = item.get('channel_id') or await session.scalar(
+            select(Channel.id).where(Channel.username == channel_username)
+        )
+        if channel_id is None:
+            return
+        await advance_cursor(session, channel_id, handled)
+        await session.commit()
+
+async def on_pipeline_error(stage_name, item, error):
     """
-    Yangilik kelganda ishlaydigan callback
-    media: {'type': 'photo'/'video', 'file': file_object}
+    Bosqich xato berdi: PIPELINE_MAX_RETRIES marta qayta urinish, keyin post
+    yakunlangan hisoblanadi - aks holda kursor shu post oldida qolib ketadi
+
+    Returns:
+        Qayta urinishgacha sekund yoki None (tashlab yuborildi)
+    """
+    attempts = item.get('attempts', 0) + 1
+    item['attempts'] = attempts
+    post_name = f"@{item['channel_username']}/{item['message_id']}"
+    if attempts <= PIPELINE_MAX_RETRIES:
+        delay = PIPELINE_RETRY_DELAY * 2 ** (attempts - 1)
+        print(f"   🔁 {post_name} [{stage_name}]: {delay} s dan keyin qayta ({attempts}/{PIPELINE_MAX_RETRIES})")
+        return delay
+    print(f"   ❌ {post_name} [{stage_name}]: {PIPELINE_MAX_RETRIES} ta urinishdan keyin tashlab yuborildi")
+    await mark_handled(item)
+    return None
+
+async def on_new_news(channel_username, message_id, raw_text, media=None, post=None, backfill=False,
+                      last_message_id=None):
     """
-    print(f"\nðŸ“° Yangi post: @{channel_username}")
+    Listener callback - postni pipeline navbatiga qo'yish (darhol qaytadi)
+    media: {'type': 'photo'/'video', 'message': telethon message}
+           yoki {'type': 'album', 'items': [{'type', 'message'}, ...]}
+    post: oldindan qayta ishlangan ProcessedPost (backfill) - qayta hisoblanmaydi
+    backfill: ishga tushgandagi eski yangilik (eng past prioritet)
+    last_message_id: album oxirgi xabari (kursor uchun)
+    """
+    _in_flight.setdefault(channel_username, set()).add(message_id)
+    await pipeline.submit({
+        'channel_username': channel_username,
+        'message_id': message_id,
+        'raw_text': raw_text,
+        'media': media,
+        'post': post,
+        'backfill': backfill,
+        'last_message_id': last_message_id or message_id,
+    })
+
+async def stage_classify(item):
+    """Tozalash, klassifikatsiya, til va kategoriya tekshiruvi"""
+    post = item['post']
+    if post is None:
+        # Bir marta: tozalash, til, kategoriya - keyingi bosqichlar shuni ishlatadi
+        post = item['post'] = process_post(item['raw_text'], item['channel_username'])
+    category = post.category
+    media = item['media']
+    
+    print(f"\n📰 Yangi post: @{item['channel_username']}")
     print(f"   Kategoriya: {category}")
-    print(f"   Text preview: {extract_preview(text, 100)}")
+    print(f"   Text preview: {post.preview}")
     media_status = f"✅ {media['type']}" if media else "❌ Yo'q"
     print(f"   Media: {media_status}")
     
     # Til tekshiruvi - faqat o'zbek tilida
-    if not is_uzbek(raw_text):
+    if not post.is_uzbek:
         print(f"   ⚠️ O'zbek tilida emas, o'tkazib yuborildi")
-        return
+        await mark_handled(item)
+        return None
     
     # Kategoriya tekshiruvi - agar kategoriya topilmasa o'tkazib yuborish
     if not category or category == 'other':
         print(f"   ⚠️ Kategoriya aniqlanmadi, o'tkazib yuborildi")
-        return
+        await mark_handled(item)
+        return None
+    
+    return item
+
+async def stage_persist(item):
+    """Duplicate tekshirish va yangilikni saqlash (media file_id keyingi bosqichda)"""
+    channel_username = item['channel_username']
+    message_id = item['message_id']
+    media = item['media']
+    post = item['post']
     
-    # Database'ga saqlash
-    from db.models import News, Channel, User
     async with async_session() as session:
         # Kanal olish yoki yaratish
         result = await session.execute(
@@ -59,16 +165,8 @@ async def on_new_news(channel_username, message_id, text, category, raw_text, me
             session.add(channel)
             await session.commit()
             await session.refresh(channel)
+        item['channel_id'] = channel.id
         
-        # Duplicate tekshirish (oxirgi 12 soat)
-        from datetime import timedelta
-        recent_time = datetime.utcnow() - timedelta(hours=12)
-        
-        # Kanal nomlarini va ortiqcha matnlarni olib tashlash
-        cleaned_text = clean_text(raw_text)
-        
-        # Birinchi 100 belgini tekshirish (cleaned_text dan)
-        text_preview = cleaned_text[:100]
         result = await session.execute(
             select(News).where(
                 News.channel_id == channel.id,
@@ -78,227 +176,188 @@ async def on_new_news(channel_username, message_id, text, category, raw_text, me
         duplicate = result.scalar_one_or_none()
         
         if duplicate:
-            print(f"   âš ï¸ Duplicate yangilik (oxirgi 12 soatda mavjud), o'tkazib yuborildi")
-            return
-        
-        # Media file_id ni olish (agar bo'lsa)
-        # YANGI YECHIM: Har doim media ni download qilish va file_id olish (eski yangiliklar uchun ham)
-        media_type = None
-        media_file_id = None
-        
-        if media and bot:
-            media_type = media['type']
-            
-            # Photo uchun - file_id olish
-            if media_type == 'photo':
-                try:
-                    # Media ni download qilish
-                    from io import BytesIO
-                    media_bytes = BytesIO()
-                    await media['message'].download_media(media_bytes)
-                    media_bytes.seek(0)
-                    
-                    print(f"   📥 Photo download qilindi: {len(media_bytes.getvalue())} bytes")
-                    logger.info(f"Photo download qilindi: {len(media_bytes.getvalue())} bytes")
-                    
-                    # Admin ga yuborish va file_id olish
-                    from config import ADMIN_USERNAME
-                    result_admin = await session.execute(
-                        select(User).where(User.username == ADMIN_USERNAME)
-                    )
-                    admin_user = result_admin.scalar_one_or_none()
-                    
-                    if admin_user:
-                        try:
-                            print(f"   📤 Admin ga yuborilmoqda (silent)...")
-                            sent = await bot.app.bot.send_photo(
-                                chat_id=admin_user.telegram_id,
-                                photo=media_bytes,
-                                caption="🔧 [TEXNIK] File ID olish uchun",
-                                disable_notification=True  # Silent yuborish
-                            )
-                            if sent.photo:
-                                media_file_id = sent.photo[-1].file_id
-                                print(f"   ✅ Photo file_id olindi: {media_file_id[:30]}...")
-                                
-                                # Admin ga yuborilgan rasmni o'chirish (tozalash)
-                                try:
-                                    await bot.app.bot.delete_message(
-                                        chat_id=admin_user.telegram_id,
-                                        message_id=sent.message_id
-                                    )
-                                    print(f"   🗑️ Admin rasmni o'chirildi")
-                                except:
-                                    pass
-                            else:
-                                print(f"   ❌ sent.photo bo'sh!")
-                        except Exception as e:
-                            print(f"   ❌ Admin ga yuborishda xato: {e}")
-                            import traceback
-                            traceback.print_exc()
-                    else:
-                        print(f"   ❌ Admin user topilmadi (username: {ADMIN_USERNAME})")
-                            
-                except Exception as e:
-                    print(f"   ❌ Media download xato: {e}")
-                    import traceback
-                    traceback.print_exc()
-            elif media_type == 'video':
-                # Video yuklab olish va file_id olish (BARCHA videolar)
-                try:
-                    from io import BytesIO
-                    
-                    print(f"   📥 Video yuklab olinmoqda...")
-                    
-                    # Video yuklab olish (hajmidan qat'iy nazar)
-                    media_bytes = BytesIO()
-                    await media['message'].download_media(media_bytes)
-                    media_bytes.seek(0)
-                    
-                    video_size = len(media_bytes.getvalue())
-                    print(f"   📥 Video download qilindi: {video_size / (1024*1024):.2f} MB")
-                    logger.info(f"Video download qilindi: {video_size} bytes")
-                    
-                    # Admin ga yuborish va file_id olish
-                    from config import ADMIN_USERNAME
-                    result_admin = await session.execute(
-                        select(User).where(User.username == ADMIN_USERNAME)
-                    )
-                    admin_user = result_admin.scalar_one_or_none()
-                    
-                    if admin_user:
-                        try:
-                            print(f"   📤 Admin ga yuborilmoqda (silent)...")
-                            sent = await bot.app.bot.send_video(
-                                chat_id=admin_user.telegram_id,
-                                video=media_bytes,
-                                caption="🔧 [TEXNIK] File ID olish uchun",
-                                disable_notification=True  # Silent yuborish
-                            )
-                            if sent.video:
-                                media_file_id = sent.video.file_id
-                                print(f"   ✅ Video file_id olindi: {media_file_id[:30]}...")
-                                
-                                # Admin ga yuborilgan videoni o'chirish (tozalash)
-                                try:
-                                    await bot.app.bot.delete_message(
-                                        chat_id=admin_user.telegram_id,
-                                        message_id=sent.message_id
-                                    )
-                                    print(f"   🗑️ Admin videoni o'chirildi")
-                                except:
-                                    pass
-                            else:
-                                print(f"   ❌ sent.video bo'sh!")
-                        except Exception as e:
-                            print(f"   ❌ Admin ga yuborishda xato: {e}")
-                            import traceback
-                            traceback.print_exc()
-                    else:
-                        print(f"   ❌ Admin user topilmadi (username: {ADMIN_USERNAME})")
-                            
-                except Exception as e:
-                    print(f"   ❌ Video download xato: {e}")
-                    import traceback
-                    traceback.print_exc()
-        
-        # Yangilikni saqlash (tozalangan matn va media bilan)
-        # AVVAL: Agar media bo'lsa va file_id olindi bo'lsa - o'sha kategoriyaning eski media'larini o'chirish
-        if media_file_id and media_type:
-            # O'sha kategoriyaning eski media'larini topish (video yoki photo)
-            result_old = await session.execute(
-                select(News)
-                .where(News.category == category)
-                .where(News.media_type == media_type)
-                .where(News.media_file_id.isnot(None))
-                .order_by(News.created_at.desc())
+            queued = await session.scalar(
+                select(func.count()).select_from(Delivery).where(Delivery.news_id == duplicate.id)
             )
-            old_media = result_old.scalars().all()
-            
-            if old_media:
-                print(f"   🗑️ {category} kategoriyasida {len(old_media)} ta eski {media_type} topildi, o'chirilmoqda...")
-                for old_item in old_media:
-                    await session.delete(old_item)
-                await session.commit()
-                print(f"   ✅ Eski {media_type}lar o'chirildi")
+            if not queued and duplicate.duplicate_of is None:
+                # Saqlangan, lekin navbatga qo'yilmasdan jarayon to'xtagan - davom ettirish
+                print(f"   🔄 Saqlangan, lekin yuborilmagan yangilik - davom ettiriladi")
+                item['news_id'] = duplicate.id
+                return item
+            print(f"   ⚠️ Duplicate yangilik, o'tkazib yuborildi")
+            await mark_handled(item)
+            return None
+        
+        # Boshqa kanalda allaqachon chiqqan yangilik (biroz boshqa matn bilan)
+        signature = minhash(post.text)
+        original = dedup_index.find(signature) if dedup_index is not None else None
         
-        # KEYIN: Yangi yangilikni saqlash
         news = News(
             channel_id=channel.id,
             message_id=message_id,
-            text=cleaned_text,  # Tozalangan matn (kanal nomsiz)
-            category=category,
-            media_type=media_type,
-            media_file_id=media_file_id,
+            text=post.text,  # Tozalangan matn (kanal nomsiz)
+            category=post.category,
+            media_type=media['type'] if media else None,
             channel_username=channel_username,  # Forward uchun
-            channel_message_id=message_id  # Forward uchun
+            channel_message_id=message_id,  # Forward uchun
+            minhash=signature,
+            duplicate_of=original[0] if original else None
         )
         session.add(news)
         await session.commit()
-        print(f"   ðŸ’¾ Database'ga saqlandi")
+        item['news_id'] = news.id
+    
+    if original:
+        # Saqlanadi (asl yangilikka bog'langan), lekin userlarga qayta yuborilmaydi
+        dedup_index.suppressed += 1
+        print(f"   🧬 Takroriy yangilik (#{original[0]} bilan {original[1]:.0%} o'xshash) - qayta yuborilmaydi")
+        await mark_handled(item)
+        return None
+    if dedup_index is not None:
+        dedup_index.add(news.id, signature, news.created_at)
+    
+    print(f"   💾 Database'ga saqlandi")
+    return item
+
+async def stage_media(item):
+    """Media ni yuklab olish va file_id olish"""
+    media = item['media']
+    item['media_file_id'] = None
+    if not media or not harvester:
+        return item
+    
+    media_type = media['type']
+    if media_type == 'album':
+        return await _harvest_album(item)
+    
+    # Hajmga qarab: xotirada, vaqtinchalik faylda yoki umuman yuklanmaydi (forward)
+    media_file_id = await harvester.acquire(media)
+    if not media_file_id:
+        return item
+    item['media_file_id'] = media_file_id
+    
+    category = item['post'].category
+    async with async_session() as session:
+        # AVVAL: o'sha kategoriyaning eski media'larini bo'shatish (video yoki photo)
+        # News yozuvlari o'chirilmaydi - qayta olingan postlar (kanal, message_id)
+        # bo'yicha duplicate deb topiladi va userlarga ikkinchi marta yuborilmaydi
+        result_old = await session.execute(
+            select(News.id)
+            .where(News.category == category)
+            .where(News.media_type == media_type)
+            .where(News.media_file_id.isnot(None))
+            .where(News.id != item['news_id'])
+            .where(News.id.notin_(
+                # Hali yuborilayotgan yangiliklarni o'zgartirmaslik
+                select(Delivery.news_id).where(Delivery.status.in_(['pending', 'sending']))
+            ))
+        )
+        old_media = result_old.scalars().all()
         
-        # Mos userlarni topish (settings bilan)
-        is_breaking = False  # TODO: AI dan olish kerak
+        if old_media:
+            print(f"   🗑️ {category} kategoriyasida {len(old_media)} ta eski {media_type} topildi, bo'shatilmoqda...")
+            await session.execute(
+                update(News).where(News.id.in_(old_media)).values(media_file_id=None)
+            )
+            print(f"   ✅ Eski {media_type}lar bo'shatildi")
         
+        # KEYIN: yangi yangilikka file_id yozish
+        await session.execute(
+            update(News).where(News.id == item['news_id']).values(media_file_id=media_file_id)
+        )
+        await session.commit()
+    
+    return item
+
+async def _harvest_album(item):
+    """Album media larini parallel yuklash - bitta send_media_group uchun"""
+    items = item['media']['items']
+    file_ids = await asyncio.gather(*(harvester.acquire(media) for media in items))
+    group = [
+        {'type': media['type'], 'file_id': file_id}
+        for media, file_id in zip(items, file_ids) if file_id
+    ]
+    if not group:
+        # Hech biri olinmadi - birinchi xabar forward qilinadi
+        return item
+    if len(group) < len(items):
+        print(f"   ⚠️ Album: {len(items)} tadan {len(group)} ta media olindi")
+    
+    item['media_file_id'] = group[0]['file_id']
+    async with async_session() as session:
+        await session.execute(
+            update(News).where(News.id == item['news_id']).values(media_group=json.dumps(group))
+        )
+        await session.commit()
+    print(f"   🖼 Album: {len(group)} ta media tayyor")
+    return item
+
+async def stage_render(item):
+    """Mos userlarni topish va yangilikni ularning tillarida tayyorlash"""
+    post = item['post']
+    category = post.category
+    
+    is_breaking = post.is_breaking
+    if item['backfill']:
+        priority = PRIORITY_BACKFILL
+    elif is_breaking:
+        priority = PRIORITY_BREAKING
+        print(f"   🚨 Shoshilinch yangilik - birinchi navbatda yuboriladi")
+    else:
+        priority = PRIORITY_NORMAL
+    
+    async with async_session() as session:
         # Agar kategoriya "umumiy" bo'lsa - barcha aktiv userlarga yuborish
         if category == 'umumiy':
-            from db.models import User
-            result = await session.execute(
-                select(User).where(
-                    (User.trial_end > datetime.utcnow()) | (User.subscription_end > datetime.utcnow())
-                )
-            )
-            users = result.scalars().all()
-            matching_users = [user.telegram_id for user in users]
-            print(f"   ðŸ“¢ Umumiy yangilik - barcha aktiv userlarga yuboriladi ({len(matching_users)} user)")
+            matching_users = await get_active_recipients(session)
+            print(f"   📢 Umumiy yangilik - barcha aktiv userlarga yuboriladi ({len(matching_users)} user)")
         else:
-            matching_users = await get_matching_users(session, category, text, is_breaking)
-            print(f"   ðŸ‘¥ {category} kategoriyasi uchun {len(matching_users)} user topildi")
-        
-        if not matching_users:
-            print(f"   â„¹ï¸ Bu kategoriyaga qiziqadigan user yo'q")
-            # Umumiy kategoriya bo'lsa ham yuborish
-            if category == 'umumiy':
-                print(f"   âš ï¸ Hech qanday aktiv user yo'q!")
-            return
-        
-        print(f"   âœ‰ï¸ {len(matching_users)} ta userga yuborilmoqda...")
-        
-        # Har bir userga yuborish (tozalangan formatda, media bilan)
-        # Agar media_file_id bo'lsa - file_id orqali yuborish
-        # Agar media_file_id yo'q lekin media_type bor - forward qilish (katta videolar uchun)
-        media_for_bot = None
-        forward_info = None
-        
-        if media_file_id:
-            # Kichik media - file_id orqali yuborish
-            media_for_bot = {
-                'type': media_type,
-                'file_id': media_file_id
-            }
-        elif media_type:
-            # Katta media (file_id yo'q) - forward qilish
-            forward_info = {
-                'channel': channel_username,
-                'message_id': message_id
-            }
-            print(f"   📹 Video juda katta, forward orqali yuboriladi")
-        
-        for user_id in matching_users:
-            await bot.send_news_to_user(
-                telegram_id=user_id,
-                news_text=cleaned_text,  # Tozalangan matn (kanal nomsiz)
-                category=category,
-                channel=channel_username,
-                media=media_for_bot,  # Media (photo/video) file_id bilan
-                forward_info=forward_info  # Forward ma'lumotlari (katta videolar uchun)
-            )
-        
-        # Yuborilgan userlar sonini yangilash
-        news.sent_count = len(matching_users)
-        await session.commit()
-        
-        print(f"   âœ… Yuborildi!")
+            matching_users = await get_matching_users(session, category, post.text, is_breaking)
+            print(f"   👥 {category} kategoriyasi uchun {len(matching_users)} user topildi")
+    
+    if not matching_users:
+        print(f"   ℹ️ Bu kategoriyaga qiziqadigan user yo'q")
+        if category == 'umumiy':
+            print(f"   ⚠️ Hech qanday aktiv user yo'q!")
+        await mark_handled(item)
+        return None
+    
+    item['priority'] = priority
+    item['recipients'] = matching_users
+    
+    # Tarjima va formatlash (har bir til uchun bir marta) - outbox keshiga
+    await outbox.prime(item['news_id'], {user.language for user in matching_users})
+    return item
+
+async def stage_deliver(item):
+    """Yuborish navbatiga qo'shish (restart bo'lsa ham yuborish davom etadi)"""
+    priority = item['priority']
+    
+    # Media: file_id orqali yoki forward (katta videolar) - News yozuvidan olinadi
+    async with async_session() as session:
+        queued = await enqueue_deliveries(session, item['news_id'], item['recipients'], priority=priority)
+    # Delivery yozuvlari saqlandi - restart dan keyin shu postdan keyingilari olinadi
+    await mark_handled(item)
+    print(f"   ✉️ {queued} ta userga yuborish navbatga qo'shildi ({LANE_NAMES[priority]})")
+    if item['media'] and not item['media_file_id']:
+        print(f"   📹 Media file_id olinmadi, forward orqali yuboriladi")
+    
+    # Fan-out fonda ishlaydi - keyingi postlarni qabul qilish to'xtab qolmaydi
+    outbox.notify(priority)
+    return item
+
+def build_pipeline():
+    """Bosqichlarni config dagi workerlar soni bilan ulash"""
+    return NewsPipeline([
+        Stage(name, handler, PIPELINE_WORKERS.get(name, 1), PIPELINE_QUEUE_SIZE)
+        for name, handler in (
+            ('classify', stage_classify),
+            ('persist', stage_persist),
+            ('media', stage_media),
+            ('render', stage_render),
+            ('deliver', stage_deliver),
+        )
+    ], on_error=on_pipeline_error)
 
 async def setup_menu():
     """Bot menu ni o'rnatish"""
@@ -313,7 +372,7 @@ async def setup_menu():
 
 async def main():
     """Asosiy funksiya"""
-    global bot
+    global bot, outbox, pipeline, harvester, dedup_index
     
     print("🚀 News Bot ishga tushmoqda...")
     
@@ -327,14 +386,38 @@ async def main():
     # Menu o'rnatish
     await setup_menu()
     
+    # Yuborish navbati worker (oldingi ishga tushirishdan qolganlarini ham yuboradi)
+    if DELIVERY_WORKER_PROCESSES > 0:
+        # Alohida jarayonlarda - listener va polling yuborishni kutmaydi
+        outbox = ShardedDelivery(DELIVERY_WORKER_PROCESSES)
+    else:
+        outbox = OutboxWorker(bot, dispatcher)
+    bot.app.bot_data['outbox'] = outbox  # Admin /delivery uchun
+    
+    # Media saqlash chati bir marta aniqlanadi
+    harvester = MediaHarvester(bot)
+    await harvester.start()
+    
+    # Takroriy yangiliklar indeksi - oxirgi DEDUP_WINDOW_HOURS soat database'dan
+    dedup_index = DedupIndex()
+    await dedup_index.load()
+    bot.app.bot_data['dedup'] = dedup_index  # Admin /delivery uchun
+    
+    # Qayta ishlash bosqichlari (listener faqat navbatga qo'yadi)
+    pipeline = build_pipeline()
+    bot.app.bot_data['pipeline'] = pipeline
+    
     # Listener yaratish
     listener = ChannelListener(news_callback=on_new_news)
+    bot.app.bot_data['listener'] = listener  # Admin /add_channel, /remove_channel uchun
     
     # Ikkalasini parallel ishga tushirish
     try:
         await asyncio.gather(
             bot.start(),
-            listener.start()
+            listener.start(),
+            pipeline.run(),
+            outbox.run()
         )
     except (KeyboardInterrupt, asyncio.CancelledError):
         print("\nâ¹ï¸ To'xtatilmoqda...")
@@ -0,0 +1,34 @@
+"""
+Database migration: Add last_seen_message_id column to channels table
+"""
+import asyncio
+from sqlalchemy import text
+from db.database import async_session
+
+async def migrate():
+    """Add last_seen_message_id column to channels table"""
+    async with async_session() as session:
+        try:
+            # Check if column exists
+            result = await session.execute(
+                text("PRAGMA table_info(channels)")
+            )
+            columns = result.fetchall()
+            column_names = [col[1] for col in columns]
+            
+            if 'last_seen_message_id' not in column_names:
+                print("Adding last_seen_message_id column...")
+                await session.execute(
+                    text("ALTER TABLE channels ADD COLUMN last_seen_message_id INTEGER")
+                )
+                await session.commit()
+                print("✅ last_seen_message_id column added successfully!")
+            else:
+                print("✅ last_seen_message_id column already exists")
+                
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            await session.rollback()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,37 @@
+"""
+Database migration: Add priority column to deliveries table
+"""
+import asyncio
+from sqlalchemy import text
+from db.database import async_session
+
+async def migrate():
+    """Add priority column to deliveries table"""
+    async with async_session() as session:
+        try:
+            # Check if column exists
+            result = await session.execute(
+                text("PRAGMA table_info(deliveries)")
+            )
+            columns = result.fetchall()
+            column_names = [col[1] for col in columns]
+            
+            if 'priority' not in column_names:
+                print("Adding priority column...")
+                await session.execute(
+                    text("ALTER TABLE deliveries ADD COLUMN priority INTEGER DEFAULT 1 NOT NULL")
+                )
+                await session.execute(
+                    text("CREATE INDEX IF NOT EXISTS ix_deliveries_status_priority ON deliveries (status, priority, id)")
+                )
+                await session.commit()
+                print("✅ Priority column added successfully!")
+            else:
+                print("✅ Priority column already exists")
+                
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            await session.rollback()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,44 @@
+"""
+Database migration: Add minhash and duplicate_of columns to news table
+"""
+import asyncio
+from sqlalchemy import text
+from db.database import async_session
+
+async def migrate():
+    """Add minhash and duplicate_of columns to news table"""
+    async with async_session() as session:
+        try:
+            # Check if columns exist
+            result = await session.execute(
+                text("PRAGMA table_info(news)")
+            )
+            columns = result.fetchall()
+            column_names = [col[1] for col in columns]
+            
+            if 'minhash' not in column_names:
+                print("Adding minhash column...")
+                await session.execute(
+                    text("ALTER TABLE news ADD COLUMN minhash BLOB")
+                )
+                print("✅ minhash column added successfully!")
+            else:
+                print("✅ minhash column already exists")
+            
+            if 'duplicate_of' not in column_names:
+                print("Adding duplicate_of column...")
+                await session.execute(
+                    text("ALTER TABLE news ADD COLUMN duplicate_of INTEGER REFERENCES news(id)")
+                )
+                print("✅ duplicate_of column added successfully!")
+            else:
+                print("✅ duplicate_of column already exists")
+            
+            await session.commit()
+                
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            await session.rollback()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
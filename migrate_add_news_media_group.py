@@ -0,0 +1,34 @@
+"""
+Database migration: Add media_group column to news table
+"""
+import asyncio
+from sqlalchemy import text
+from db.database import async_session
+
+async def migrate():
+    """Add media_group column to news table"""
+    async with async_session() as session:
+        try:
+            # Check if column exists
+            result = await session.execute(
+                text("PRAGMA table_info(news)")
+            )
+            columns = result.fetchall()
+            column_names = [col[1] for col in columns]
+            
+            if 'media_group' not in column_names:
+                print("Adding media_group column...")
+                await session.execute(
+                    text("ALTER TABLE news ADD COLUMN media_group TEXT")
+                )
+                await session.commit()
+                print("✅ media_group column added successfully!")
+            else:
+                print("✅ media_group column already exists")
+                
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            await session.rollback()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
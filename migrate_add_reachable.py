@@ -0,0 +1,44 @@
+"""
+Database migration: Add reachable / unreachable_since columns to users table
+"""
+import asyncio
+from sqlalchemy import text
+from db.database import async_session
+
+async def migrate():
+    """Add reachable and unreachable_since columns to users table"""
+    async with async_session() as session:
+        try:
+            # Check if columns exist
+            result = await session.execute(
+                text("PRAGMA table_info(users)")
+            )
+            columns = result.fetchall()
+            column_names = [col[1] for col in columns]
+            
+            if 'reachable' not in column_names:
+                print("Adding reachable column...")
+                await session.execute(
+                    text("ALTER TABLE users ADD COLUMN reachable BOOLEAN DEFAULT 1 NOT NULL")
+                )
+                print("✅ reachable column added successfully!")
+            else:
+                print("✅ reachable column already exists")
+            
+            if 'unreachable_since' not in column_names:
+                print("Adding unreachable_since column...")
+                await session.execute(
+                    text("ALTER TABLE users ADD COLUMN unreachable_since DATETIME")
+                )
+                print("✅ unreachable_since column added successfully!")
+            else:
+                print("✅ unreachable_since column already exists")
+            
+            await session.commit()
+                
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            await session.rollback()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
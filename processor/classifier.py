@@ -1,4 +1,180 @@
-from config import CATEGORIES
+from config import CATEGORIES, BREAKING_KEYWORDS, LOCAL_MODEL_MIN_CONFIDENCE, LOCAL_MODEL_PAIR_CONFIDENCE
+from processor.keyword_matcher import KeywordAutomaton
+from processor.local_model import get_model
+from utils.cyrillic_converter import normalize_uz
+
+# Qisqa so'zlar (2-3 harf) faqat to'liq so'z sifatida hisoblanadi
+SHORT_KEYWORD_LENGTH = 3
+
+
+def _normalized(words) -> list:
+    """normalize_uz shakli, takrorlarsiz (tartib saqlanadi)"""
+    return list(dict.fromkeys(normalize_uz(word) for word in words))
+
+
+# Lotinga o'girilganda o'zbekcha so'zlar ichida uchraydigan ruscha so'zlar
+# (жара → jarayon, рост → rostdan, деньги → dengiz) - faqat to'liq so'z
+WHOLE_WORD_KEYWORDS = set(_normalized(['жара', 'рост', 'деньги']))
+
+# Iqtisod/jamiyat indikatorlari
+ECONOMY_INDICATORS = _normalized([
+    'ish haqi', 'ish haq', 'maosh', 'daromad', 'pul', 'dollar', 'so\'m', 'narx',
+    'o\'sish', 'kamayish', 'foiz', 'statistika', 'real', 'nominal',
+    'зарплата', 'доход', 'деньги', 'рост', 'снижение', 'процент'
+])
+
+# Ob-havo aniq indikatorlari
+WEATHER_INDICATORS = _normalized([
+    'ob-havo', 'obhavo', 'harorat', 'gradus', 'yomg\'ir', 'qor', 'shamol',
+    'prognoz', 'iqlim', 'sovuq', 'issiq', 'bulut', 'quyosh',
+    'погода', 'температура', 'дождь', 'снег', 'ветер',
+    'weather', 'temperature', 'rain', 'snow', 'forecast'
+])
+
+# "havo", "nam", "qor" - faqat ob-havo kontekstida hisoblanadi
+SHORT_WEATHER_KEYWORDS = ['havo', 'nam', 'qor']
+HAVO_KEYWORDS = ['havo']
+SHORT_WEATHER_CONTEXT = ['ob-havo', 'obhavo', 'prognoz', 'harorat', 'gradus']
+HAVO_CONTEXT = ['ob-havo', 'obhavo', 'prognoz', 'harorat']
+
+_automaton = None
+_automaton_signature = None
+_breaking_automaton = None
+_breaking_signature = None
+_category_keywords = []  # [(category, [kalit so'zlar normalize_uz shaklida]), ...]
+_keyword_weights = {}  # kalit so'z -> [har bir kategoriyadagi soni] (classify_batch)
+
+# Teng ball bo'lsa - prioritet tartibi (muhimdan kam muhimga)
+PRIORITY_ORDER = [
+    'siyosat',      # Eng muhim
+    'iqtisod',      # Iqtisodiy yangiliklar
+    'jamiyat',      # Ijtimoiy yangiliklar (transport, ekologiya)
+    'dunyo',        # Xalqaro
+    'salomatlik',   # Salomatlik
+    'texnologiya',  # Texnologiya
+    'sport',        # Sport
+    'obhavo'        # Ob-havo (eng oxirgi prioritet)
+]
+
+
+def get_keyword_automaton() -> KeywordAutomaton:
+    """
+    CATEGORIES kalit so'zlari + indikatorlar avtomati
+
+    CATEGORIES o'zgarsa (kalit so'z qo'shilsa/o'chirilsa) avtomat qayta quriladi.
+    Kalit so'zlar normalize_uz shakliga keltiriladi va har bir kategoriyada
+    takrorlari olib tashlanadi (lotin va kirill yozuvi bitta so'z).
+    """
+    global _automaton, _automaton_signature, _category_keywords, _keyword_weights
+    signature = tuple((category, tuple(keywords)) for category, keywords in CATEGORIES.items())
+    if _automaton is None or signature != _automaton_signature:
+        _category_keywords = [
+            (category, _normalized(category_keywords))
+            for category, category_keywords in signature
+        ]
+        keywords = [keyword for _, category_keywords in _category_keywords for keyword in category_keywords]
+        _keyword_weights = {keyword: [0] * len(_category_keywords) for keyword in keywords}
+        for index, (_, category_keywords) in enumerate(_category_keywords):
+            for keyword in category_keywords:
+                _keyword_weights[keyword][index] += 1
+        _automaton = KeywordAutomaton(
+            keywords + ECONOMY_INDICATORS + WEATHER_INDICATORS + SHORT_WEATHER_CONTEXT + HAVO_CONTEXT,
+            whole_words=[
+                keyword for keyword in keywords if len(keyword) <= SHORT_KEYWORD_LENGTH
+            ] + sorted(WHOLE_WORD_KEYWORDS)
+        )
+        _automaton_signature = signature
+    return _automaton
+
+
+def _is_found(word: str, present: set, whole: set) -> bool:
+    """Indikator matnda bormi (WHOLE_WORD_KEYWORDS - faqat to'liq so'z)"""
+    return word in whole if word in WHOLE_WORD_KEYWORDS else word in present
+
+
+def _is_matched(keyword: str, present: set, whole: set, short_context: bool, havo_context: bool) -> bool:
+    if len(keyword) <= SHORT_KEYWORD_LENGTH or keyword in WHOLE_WORD_KEYWORDS:
+        # To'liq so'z sifatida (word boundary)
+        if keyword not in whole:
+            return False
+        return short_context if keyword in SHORT_WEATHER_KEYWORDS else True
+    if keyword in HAVO_KEYWORDS:
+        # "havo" - ob-havo konteksti bo'lsa hisoblanadi (avvalgidek)
+        return havo_context
+    # Oddiy keyword matching
+    return keyword in present
+
+
+def _matched_keywords(present: set, whole: set) -> set:
+    """Ball beradigan (takrorlanmas) kalit so'zlar"""
+    short_context = any(word in present for word in SHORT_WEATHER_CONTEXT)
+    havo_context = any(word in present for word in HAVO_CONTEXT)
+    # Matnda uchramagan so'zlardan faqat "havo" hisoblanishi mumkin
+    candidates = (present | set(HAVO_KEYWORDS)) & _keyword_weights.keys()
+    return {
+        keyword for keyword in candidates
+        if _is_matched(keyword, present, whole, short_context, havo_context)
+    }
+
+
+def score_categories(present: set, whole: set, verbose: bool = True) -> dict:
+    """
+    Kategoriya ballari (get_keyword_automaton().scan natijasidan)
+
+    Har bir kalit so'z CATEGORIES dagi har bir yozuvi uchun 1 ball beradi.
+
+    Returns:
+        {category: score} - faqat score > 0 bo'lganlar
+    """
+    matched = _matched_keywords(present, whole)
+
+    scores = {}
+    for category, keywords in _category_keywords:
+        score = 0
+        matched_keywords = []
+        
+        for keyword_lower in keywords:
+            if keyword_lower in matched:
+                score += 1
+                matched_keywords.append(keyword_lower)
+        
+        if score > 0:
+            scores[category] = score
+            if verbose:
+                print(f"   📊 {category}: {score} ball ({', '.join(matched_keywords[:3])}...)")
+    return scores
+
+
+def get_breaking_automaton() -> KeywordAutomaton:
+    """
+    BREAKING_KEYWORDS avtomati - so'zlar faqat to'liq so'z sifatida
+    ('молния' - 'молниеносно' emas, 'breaking' - 'breakingbad' emas),
+    emoji ('🚨') esa matnning istalgan joyida
+    """
+    global _breaking_automaton, _breaking_signature
+    signature = tuple(BREAKING_KEYWORDS)
+    if _breaking_automaton is None or signature != _breaking_signature:
+        keywords = [keyword.lower() for keyword in signature]
+        _breaking_automaton = KeywordAutomaton(
+            keywords,
+            whole_words=[keyword for keyword in keywords if keyword[0].isalnum()]
+        )
+        _breaking_signature = signature
+    return _breaking_automaton
+
+
+def detect_breaking(text: str) -> bool:
+    """
+    Shoshilinch (breaking) yangilikni aniqlash - kalit so'zlar bo'yicha
+    Asl matnda tekshiriladi (clean_text emoji va belgilarni olib tashlaydi)
+    """
+    if not text:
+        return False
+    present, whole = get_breaking_automaton().scan(text.lower())
+    return any(
+        keyword in whole if keyword[0].isalnum() else keyword in present
+        for keyword in present
+    )
 
 def classify_news(text: str, channel: str = None) -> str:
     """
@@ -8,91 +184,91 @@ def classify_news(text: str, channel: str = None) -> str:
     3. Prioritet va kontekst tahlili
     Agar kategoriya topilmasa - None qaytaradi
     """
+    category, _ = analyze_news(text, channel)
+    return category
+
+
+def analyze_news(text: str, channel: str = None, verbose: bool = True) -> tuple:
+    """
+    Kategoriya va kalit so'z ballari (classify_news + ballar)
+
+    Returns:
+        (category yoki None, {category: score})
+    """
     if not text or len(text.strip()) < 10:
-        return None  # Juda qisqa matn
+        return None, {}  # Juda qisqa matn
+    
+    # Bitta o'tishda barcha kalit so'zlar va indikatorlar (lotin/kirill bir xil)
+    present, whole = get_keyword_automaton().scan(normalize_uz(text))
     
     # AI analyzer ni sinab ko'rish
     try:
         from processor.ai_analyzer import analyze_with_ai
         ai_result = analyze_with_ai(text, channel or 'unknown')
         if ai_result and ai_result.get('category'):
-            print(f"   🤖 AI kategoriya: {ai_result['category']}")
-            return ai_result['category']
+            if verbose:
+                print(f"   🤖 AI kategoriya: {ai_result['category']}")
+            return ai_result['category'], score_categories(present, whole, verbose=False)
     except Exception as e:
         print(f"   ⚠️ AI analyzer ishlamadi: {e}")
     
-    # Keyword-based fallback (YAXSHILANGAN)
-    text_lower = text.lower()
+    scores = score_categories(present, whole, verbose)
     
-    # YANGI: Aniq kontekst tekshirish
-    # Iqtisod/jamiyat indikatorlari
-    economy_indicators = [
-        'ish haqi', 'ish haq', 'maosh', 'daromad', 'pul', 'dollar', 'so\'m', 'narx',
-        'o\'sish', 'kamayish', 'foiz', 'statistika', 'real', 'nominal',
-        'зарплата', 'доход', 'деньги', 'рост', 'снижение', 'процент'
-    ]
+    # Lokal model (o'qitilgan bo'lsa) - ishonchli bo'lsa shu hal qiladi
+    category = _model_category(text, scores, verbose)
+    if category:
+        return category, scores
     
-    # Ob-havo aniq indikatorlari
-    weather_indicators = [
-        'ob-havo', 'obhavo', 'harorat', 'gradus', 'yomg\'ir', 'qor', 'shamol',
-        'prognoz', 'iqlim', 'sovuq', 'issiq', 'bulut', 'quyosh',
-        'погода', 'температура', 'дождь', 'снег', 'ветер', 'прогноз',
-        'weather', 'temperature', 'rain', 'snow', 'forecast'
-    ]
+    # Keyword-based fallback (YAXSHILANGAN)
+    return _classify_keywords(text, present, whole, scores, verbose), scores
+
+
+def _model_category(text: str, scores: dict, verbose: bool = True):
+    """
+    Lokal model natijasi (processor/local_model.py)
+
+    - eng yuqori ehtimollik >= LOCAL_MODEL_MIN_CONFIDENCE: model kategoriyasi
+    - birinchi ikkitasi birga >= LOCAL_MODEL_PAIR_CONFIDENCE: ikkisidan
+      kalit so'z ballari ko'prog'i (teng bo'lsa - modelning birinchisi)
+    - aks holda None (kalit so'z qoidalari hal qiladi)
+    """
+    model = get_model()
+    if model is None:
+        return None
+    ranking = model.predict(text)
+    if not ranking:
+        return None
     
+    category, confidence = ranking[0]
+    if confidence < LOCAL_MODEL_MIN_CONFIDENCE:
+        if len(ranking) < 2 or confidence + ranking[1][1] < LOCAL_MODEL_PAIR_CONFIDENCE:
+            return None
+        second = ranking[1][0]
+        if scores.get(second, 0) > scores.get(category, 0):
+            category, confidence = second, ranking[1][1]
+    
+    if verbose:
+        print(f"   🧠 Lokal model: {category} ({confidence:.0%})")
+    return category
+
+
+def _classify_keywords(text: str, present: set, whole: set, scores: dict, verbose: bool = True) -> str:
+    """Keyword natijasidan kategoriya (scores - score_categories natijasi)"""
+    # YANGI: Aniq kontekst tekshirish
     # Agar iqtisod indikatorlari ko'p bo'lsa - iqtisod/jamiyat
-    economy_count = sum(1 for indicator in economy_indicators if indicator in text_lower)
-    weather_count = sum(1 for indicator in weather_indicators if indicator in text_lower)
+    economy_count = sum(1 for indicator in ECONOMY_INDICATORS if _is_found(indicator, present, whole))
+    weather_count = sum(1 for indicator in WEATHER_INDICATORS if _is_found(indicator, present, whole))
     
     if economy_count >= 2 and weather_count == 0:
-        print(f"   💰 Iqtisod indikatorlari topildi: {economy_count}")
+        if verbose:
+            print(f"   💰 Iqtisod indikatorlari topildi: {economy_count}")
         return 'iqtisod'
     
     if weather_count >= 2 and economy_count == 0:
-        print(f"   🌤 Ob-havo indikatorlari topildi: {weather_count}")
+        if verbose:
+            print(f"   🌤 Ob-havo indikatorlari topildi: {weather_count}")
         return 'obhavo'
     
-    # Har bir kategoriya uchun ball hisoblash (YAXSHILANGAN)
-    scores = {}
-    for category, keywords in CATEGORIES.items():
-        score = 0
-        matched_keywords = []
-        
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            
-            # YANGI: Qisqa so'zlarni (2-3 harf) faqat to'liq so'z sifatida tekshirish
-            if len(keyword_lower) <= 3:
-                # To'liq so'z sifatida tekshirish (word boundary)
-                import re
-                pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-                if re.search(pattern, text_lower):
-                    # MAXSUS: "havo" so'zini faqat ob-havo kontekstida hisoblash
-                    if keyword_lower in ['havo', 'ҳаво', 'nam', 'нам', 'qor', 'қор']:
-                        # Faqat ob-havo kontekstida hisoblash
-                        if any(w in text_lower for w in ['ob-havo', 'обҳаво', 'prognoz', 'прогноз', 'harorat', 'ҳарорат', 'gradus', 'градус']):
-                            score += 1
-                            matched_keywords.append(keyword_lower)
-                    else:
-                        score += 1
-                        matched_keywords.append(keyword_lower)
-            else:
-                # YANGI: "havo" so'zini faqat ob-havo kontekstida hisoblash
-                if keyword_lower == 'havo' or keyword_lower == 'ҳаво':
-                    # Faqat ob-havo kontekstida hisoblash
-                    if any(w in text_lower for w in ['ob-havo', 'обҳаво', 'prognoz', 'прогноз', 'harorat', 'ҳарорат']):
-                        score += 1
-                        matched_keywords.append(keyword_lower)
-                else:
-                    # Oddiy keyword matching
-                    if keyword_lower in text_lower:
-                        score += 1
-                        matched_keywords.append(keyword_lower)
-        
-        if score > 0:
-            scores[category] = score
-            print(f"   📊 {category}: {score} ball ({', '.join(matched_keywords[:3])}...)")
-    
     # Eng ko'p ball olgan kategoriya
     if scores:
         # Agar bir nechta kategoriya bir xil ball olsa - prioritet tartibida tanlash
@@ -103,24 +279,13 @@ def classify_news(text: str, channel: str = None) -> str:
         if 'obhavo' in candidates and len(candidates) > 1:
             # Agar boshqa kategoriyalar ham bor bo'lsa - ob-havoni olib tashlash
             candidates = [c for c in candidates if c != 'obhavo']
-            print(f"   ⚖️ Ob-havo boshqa kategoriyalar bilan aralashgan - olib tashlandi")
-        
-        # Prioritet tartibi (muhimdan kam muhimga)
-        priority_order = [
-            'siyosat',      # Eng muhim
-            'iqtisod',      # Iqtisodiy yangiliklar
-            'jamiyat',      # Ijtimoiy yangiliklar (transport, ekologiya)
-            'dunyo',        # Xalqaro
-            'salomatlik',   # Salomatlik
-            'texnologiya',  # Texnologiya
-            'sport',        # Sport
-            'obhavo'        # Ob-havo (eng oxirgi prioritet)
-        ]
+            if verbose:
+                print(f"   ⚖️ Ob-havo boshqa kategoriyalar bilan aralashgan - olib tashlandi")
         
         # Prioritet bo'yicha birinchi topilgan kategoriyani qaytarish
-        for priority_cat in priority_order:
+        for priority_cat in PRIORITY_ORDER:
             if priority_cat in candidates:
-                if len(candidates) > 1:
+                if len(candidates) > 1 and verbose:
                     print(f"   ⚖️ Bir nechta kategoriya ({candidates}) - prioritet: {priority_cat}")
                 return priority_cat
         
@@ -130,14 +295,97 @@ def classify_news(text: str, channel: str = None) -> str:
     # Agar hech qanday keyword topilmasa - matn tahlili
     # Raqamlar ko'p bo'lsa - ehtimol iqtisod
     if sum(c.isdigit() for c in text) > len(text) * 0.1:
-        print(f"   🔢 Ko'p raqamlar - ehtimol iqtisod")
+        if verbose:
+            print(f"   🔢 Ko'p raqamlar - ehtimol iqtisod")
         return 'iqtisod'
     
     # Uzun matn (> 500 belgi) - ehtimol muhim yangilik
     if len(text) > 500:
-        print(f"   📝 Uzun matn - jamiyat kategoriyasi")
+        if verbose:
+            print(f"   📝 Uzun matn - jamiyat kategoriyasi")
         return 'jamiyat'
     
     # Hech qanday kategoriya topilmasa - None
-    print(f"   ❌ Kategoriya topilmadi")
+    if verbose:
+        print(f"   ❌ Kategoriya topilmadi")
     return None
+
+
+def _load_numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+def classify_batch(texts: list, channel: str = None) -> list:
+    """
+    Ko'p postni birdaniga kategoriyaga ajratish (backfill, qayta klassifikatsiya)
+
+    Natija classify_news bilan bir xil (prioritet va ob-havo qoidalari ham).
+
+    Returns:
+        Kategoriyalar (yoki None) - texts tartibida
+    """
+    return [category for category, _ in analyze_batch(texts, channel)]
+
+
+def analyze_batch(texts: list, channel: str = None) -> list:
+    """
+    analyze_news ning paket versiyasi
+
+    Har bir matn bir marta avtomatdan o'tadi, natijalar siyrak (sparse)
+    hujjat x kalit so'z matritsasiga yig'iladi va barcha kategoriya ballari
+    bitta amal bilan hisoblanadi (numpy bo'lsa - numpy, bo'lmasa oddiy Python).
+
+    AI analyzer sozlangan bo'lsa (OPENAI_API_KEY) - har bir post alohida
+    analyze_news orqali.
+
+    Returns:
+        [(category yoki None, {category: score}), ...] - texts tartibida
+    """
+    from config import OPENAI_API_KEY
+    if OPENAI_API_KEY:
+        return [analyze_news(text, channel, verbose=False) for text in texts]
+
+    automaton = get_keyword_automaton()
+    categories = [category for category, _ in _category_keywords]
+    columns = {keyword: index for index, keyword in enumerate(_keyword_weights)}
+
+    results = [(None, {})] * len(texts)
+    scans = {}  # hujjat indeksi -> (present, whole)
+    rows, cols = [], []
+    for doc, text in enumerate(texts):
+        if not text or len(text.strip()) < 10:
+            continue  # Juda qisqa matn
+        present, whole = automaton.scan(normalize_uz(text))
+        scans[doc] = (present, whole)
+        for keyword in _matched_keywords(present, whole):
+            rows.append(doc)
+            cols.append(columns[keyword])
+
+    weights = list(_keyword_weights.values())
+    numpy = _load_numpy()
+    if numpy is not None and rows:
+        matrix = numpy.zeros((len(texts), len(categories)), dtype=numpy.int32)
+        numpy.add.at(matrix, numpy.asarray(rows), numpy.asarray(weights, dtype=numpy.int32)[cols])
+        score_rows = matrix.tolist()
+    else:
+        score_rows = [[0] * len(categories) for _ in texts]
+        for doc, col in zip(rows, cols):
+            row = score_rows[doc]
+            for index, weight in enumerate(weights[col]):
+                row[index] += weight
+
+    for doc, (present, whole) in scans.items():
+        scores = {
+            category: score
+            for category, score in zip(categories, score_rows[doc])
+            if score > 0
+        }
+        category = _model_category(texts[doc], scores, verbose=False)
+        if not category:
+            category = _classify_keywords(texts[doc], present, whole, scores, verbose=False)
+        results[doc] = (category, scores)
+    return results
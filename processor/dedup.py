@@ -0,0 +1,184 @@
+"""
+Takroriy yangiliklarni aniqlash (MinHash LSH)
+
+Bir xil yangilik bir nechta kanalda (@kunuz, @yangiliklar331 ...) biroz
+boshqacha matn bilan chiqadi. Har bir yangilik uchun tozalangan matnning
+so'z shingle'laridan MinHash signatura hisoblanadi va LSH indeksiga
+(bandlar bo'yicha hash jadvallar) qo'shiladi. Yangi post faqat o'zi bilan
+kamida bitta bandi mos kelgan yangiliklar bilan solishtiriladi - oxirgi
+DEDUP_WINDOW_HOURS soatdagi barcha yangiliklar bilan emas.
+
+Hashlar blake2b - Python hash() dan farqli, jarayonlar va restartlar
+orasida bir xil, shuning uchun signaturalar database'da saqlanadi
+(News.minhash) va indeks ishga tushganda qayta tiklanadi.
+"""
+import re
+import struct
+import hashlib
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import select
+from db.database import async_session
+from db.models import News
+from config import DEDUP_WINDOW_HOURS, DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS
+
+# Shingle - ketma-ket shuncha so'z
+SHINGLE_SIZE = 3
+
+# Universal hash: (a * x + b) mod p, p - Mersenne tub soni (2^61 - 1)
+_PRIME = (1 << 61) - 1
+
+_WORD = re.compile(r"[^\W_]+(?:['ʻʼ‘’][^\W_]+)*")
+
+
+def _stable_hash(value: str, salt: bytes = b'') -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode('utf-8'), digest_size=8, salt=salt).digest(), 'little'
+    )
+
+
+def _permutations(count: int) -> list:
+    """Doimiy (a, b) juftliklari - seed blake2b dan, restartda o'zgarmaydi"""
+    result = []
+    for index in range(count):
+        a = _stable_hash(f'a{index}', b'minhash') % (_PRIME - 1) + 1
+        b = _stable_hash(f'b{index}', b'minhash') % _PRIME
+        result.append((a, b))
+    return result
+
+
+_PERMUTATIONS = _permutations(DEDUP_NUM_PERM)
+
+
+def shingles(text: str) -> set:
+    """Tozalangan matnning so'z shingle'lari (kichik harflarda)"""
+    words = _WORD.findall((text or '').lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> Optional[bytes]:
+    """
+    MinHash signatura (DEDUP_NUM_PERM ta 64-bit qiymat, bayt ko'rinishida)
+
+    Returns:
+        Signatura yoki None (matnda so'z yo'q)
+    """
+    hashes = [_stable_hash(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    values = [
+        min((a * value + b) % _PRIME for value in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+    return struct.pack(f'<{len(values)}Q', *values)
+
+
+def _unpack(signature: bytes) -> tuple:
+    return struct.unpack(f'<{len(signature) // 8}Q', signature)
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Ikki signatura bo'yicha taxminiy Jaccard o'xshashligi"""
+    a, b = _unpack(first), _unpack(second)
+    if len(a) != len(b) or not a:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class DedupIndex:
+    """
+    Oxirgi DEDUP_WINDOW_HOURS soatdagi yangiliklar LSH indeksi (xotirada)
+
+    Signatura DEDUP_BANDS ta bandga bo'linadi - ikki matn kamida bitta
+    bandi to'liq mos kelsa nomzod bo'ladi, keyin signatura bo'yicha
+    o'xshashlik DEDUP_THRESHOLD bilan tekshiriladi.
+    """
+
+    def __init__(
+        self,
+        window_hours: float = DEDUP_WINDOW_HOURS,
+        threshold: float = DEDUP_THRESHOLD,
+        bands: int = DEDUP_BANDS
+    ):
+        self.window = timedelta(hours=window_hours)
+        self.threshold = threshold
+        self.bands = bands
+        self._buckets = [{} for _ in range(bands)]  # band -> {band hash: set(news_id)}
+        self._signatures = {}  # news_id -> signatura
+        self._order = deque()  # (created_at, news_id) - eskilarini chiqarish uchun
+        self.suppressed = 0
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature: bytes) -> list:
+        size = len(signature) // self.bands
+        return [signature[i * size:(i + 1) * size] for i in range(self.bands)]
+
+    async def load(self):
+        """Ishga tushganda - oxirgi yangiliklar signaturalarini database'dan o'qish"""
+        since = datetime.utcnow() - self.window
+        async with async_session() as session:
+            result = await session.execute(
+                select(News.id, News.minhash, News.created_at)
+                .where(News.created_at >= since)
+                .where(News.minhash.isnot(None))
+                .where(News.duplicate_of.is_(None))
+                .order_by(News.created_at)
+            )
+            for row in result.all():
+                self.add(row.id, row.minhash, row.created_at)
+        print(f"✅ Dedup indeksi: oxirgi {self.window.total_seconds() / 3600:.0f} soatdan {len(self)} ta yangilik")
+
+    def add(self, news_id: int, signature: Optional[bytes], created_at: datetime = None):
+        if not signature or news_id in self._signatures:
+            return
+        self._signatures[news_id] = signature
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, set()).add(news_id)
+        self._order.append((created_at or datetime.utcnow(), news_id))
+        self._expire()
+
+    def remove(self, news_id: int):
+        signature = self._signatures.pop(news_id, None)
+        if signature is None:
+            return
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            ids = bucket.get(key)
+            if ids is not None:
+                ids.discard(news_id)
+                if not ids:
+                    del bucket[key]
+
+    def _expire(self):
+        cutoff = datetime.utcnow() - self.window
+        while self._order and self._order[0][0] < cutoff:
+            _, news_id = self._order.popleft()
+            self.remove(news_id)
+
+    def find(self, signature: Optional[bytes]) -> Optional[Tuple[int, float]]:
+        """
+        Eng o'xshash yangilikni topish
+
+        Returns:
+            (news_id, o'xshashlik) yoki None (duplicate emas)
+        """
+        if not signature:
+            return None
+        self._expire()
+
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            ids = bucket.get(key)
+            if ids:
+                candidates |= ids
+
+        best = None
+        for news_id in candidates:
+            score = similarity(signature, self._signatures[news_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (news_id, score)
+        return best
@@ -0,0 +1,108 @@
+"""
+Ko'p kalit so'zli qidiruv (Aho-Corasick avtomati)
+
+Barcha kalit so'zlar bitta avtomatga yig'iladi va matn bir marta o'qiladi -
+har bir kalit so'z uchun alohida qidiruv (yoki regex) kerak emas.
+
+Qisqa so'zlar (masalan 'pul', 'ai') faqat to'liq so'z sifatida hisoblanadi:
+re dagi r'\\b' + so'z + r'\\b' bilan bir xil chegara qoidasi (harf/raqam/_).
+"""
+from typing import Iterable, Set, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    # re dagi \w (Unicode) bilan bir xil
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick avtomati
+
+    Args:
+        patterns: qidiriladigan so'zlar (kichik harflarda, takrorlar olib tashlanadi)
+        whole_words: shulardan qaysilari uchun so'z chegarasi ham tekshiriladi
+    """
+
+    def __init__(self, patterns: Iterable[str], whole_words: Iterable[str] = ()):
+        self.patterns = list(dict.fromkeys(pattern for pattern in patterns if pattern))
+        whole_words = set(whole_words)
+
+        # Trie: har bir holat - {belgi: keyingi holat}
+        goto = [{}]
+        outputs = [()]
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] += ((pattern, len(pattern), pattern in whole_words),)
+
+        # Fail linklar (BFS) va chiqishlarni fail zanjiri bo'yicha yig'ish
+        fail = [0] * len(goto)
+        order = list(goto[0].values())
+        for state in order:
+            for ch, next_state in goto[state].items():
+                order.append(next_state)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                candidate = goto[fallback].get(ch, 0)
+                fail[next_state] = candidate if candidate != next_state else 0
+                outputs[next_state] += outputs[fail[next_state]]
+
+        # Fail o'tishlarini oldindan jadvalga yoyish (ildizdan tashqari) -
+        # qidiruvda har bir belgi uchun bitta-ikkita dict lookup
+        delta = [dict(transitions) for transitions in goto]
+        for state in order:
+            inherited = delta[fail[state]] if fail[state] else {}
+            for ch, next_state in inherited.items():
+                delta[state].setdefault(ch, next_state)
+
+        self._root = goto[0]
+        self._delta = delta
+        self._outputs = outputs
+
+    def scan(self, text: str) -> Tuple[Set[str], Set[str]]:
+        """
+        Matnni bir marta o'qib chiqish
+
+        Returns:
+            (present, whole) - matnda uchragan so'zlar va ulardan to'liq
+            so'z sifatida (chegaralari bilan) uchraganlari
+        """
+        present = set()
+        whole = set()
+        root = self._root
+        delta = self._delta
+        outputs = self._outputs
+        length = len(text)
+        state = 0
+
+        for index, ch in enumerate(text):
+            next_state = delta[state].get(ch)
+            if next_state is None:
+                next_state = root.get(ch, 0)
+            state = next_state
+            if not outputs[state]:
+                continue
+
+            for pattern, size, whole_word in outputs[state]:
+                present.add(pattern)
+                if not whole_word or pattern in whole:
+                    continue
+                start = index - size + 1
+                before = text[start - 1] if start > 0 else ''
+                after = text[index + 1] if index + 1 < length else ''
+                if (
+                    (before != '' and _is_word_char(before)) != _is_word_char(pattern[0])
+                    and (after != '' and _is_word_char(after)) != _is_word_char(pattern[-1])
+                ):
+                    whole.add(pattern)
+
+        return present, whole
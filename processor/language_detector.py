@@ -1,82 +1,122 @@
 """
 Til aniqlash moduli
+
+Matn bir marta o'qiladi: har bir belgi oldindan tuzilgan jadval orqali
+sinfga aylantiriladi (kirill / o'zbek kirill / lotin) va sinflar sanaladi.
+Marker so'zlar so'z (token) darajasida tekshiriladi - 'the' endi 'other'
+ichida topilmaydi. Qaror aniq bo'lishi bilan qolgan tekshiruvlar
+o'tkazib yuboriladi.
 """
 import re
+from typing import Tuple
 
-def detect_language(text: str) -> str:
+# Belgi sinflari
+_CYRILLIC = 'c'   # а-я, ё
+_UZBEK = 'u'      # ў, қ, ғ, ҳ (o'zbek kirill)
+_LATIN = 'l'      # a-z
+
+# Kod nuqtasi -> sinf (str.translate uchun). Boshqa belgilar o'zgarmaydi -
+# sinf harflari ('c', 'u', 'l') lotin harfi sifatida 'l' ga aylanadi,
+# shuning uchun sanashda aralashmaydi.
+_CLASS_TABLE = {}
+for _ch in 'абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ':
+    _CLASS_TABLE[ord(_ch)] = _CYRILLIC
+for _ch in 'ўЎқҚғҒҳҲ':
+    _CLASS_TABLE[ord(_ch)] = _UZBEK
+for _ch in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ':
+    _CLASS_TABLE[ord(_ch)] = _LATIN
+del _ch
+
+# So'zlar (apostrofli o'zbek so'zlari bitta token: o'zbekiston, g'alaba)
+_TOKEN = re.compile(r"[^\W\d_]+(?:['ʻʼ‘’][^\W\d_]+)*")
+
+# Rus tilida ko'p uchraydigan so'zlar
+RUSSIAN_WORDS = frozenset([
+    'который', 'которая', 'которые', 'является', 'были', 'было',
+    'этого', 'этом', 'этой', 'также', 'более', 'может',
+    'после', 'году', 'года', 'лет', 'человек', 'людей',
+    'власти', 'властей', 'стран', 'страны', 'заявил', 'отметил', 'подчеркнул'
+])
+
+# Rus so'z o'zaklari (российский, российская, сообщил, сообщает ...)
+RUSSIAN_STEMS = ('российск', 'сообщ')
+
+# O'zbek tilida ko'p uchraydigan so'zlar
+UZBEK_WORDS = frozenset([
+    'ва', 'билан', 'учун', 'бўлиб', 'қилди', 'қилиш',
+    'бўйича', 'ҳақида', 'ҳам', 'эса', 'лекин', 'аммо',
+    'шунингдек', 'ўзбекистон', 'ташкент', 'вилоят'
+])
+
+# Ingliz tilida ko'p uchraydigan so'zlar
+ENGLISH_WORDS = frozenset(['the', 'and', 'for', 'with', 'that', 'this', 'from', 'have', 'been'])
+
+
+def detect_language_script(text: str) -> Tuple[str, str]:
     """
-    Matnning tilini aniqlash
-    
+    Matnning tili va yozuvi
+
     Returns:
-        'uzbek' - O'zbek tili (lotin yoki kirill)
-        'russian' - Rus tili
-        'english' - Ingliz tili
-        'unknown' - Noma'lum
+        (til, yozuv)
+        til: 'uzbek' (lotin yoki kirill), 'russian', 'english', 'unknown'
+        yozuv: 'cyrillic' - kirill harflar ko'p, aks holda 'latin'
     """
-    if not text or len(text.strip()) < 10:
-        return 'unknown'
-    
-    # Kirill harflar soni
-    cyrillic_count = len(re.findall(r'[а-яА-ЯёЁ]', text))
-    
-    # Lotin harflar soni
-    latin_count = len(re.findall(r'[a-zA-Z]', text))
-    
-    # O'zbek kirill harflari
-    uzbek_cyrillic = len(re.findall(r'[ўҚқҒғҲҳ]', text))
-    
-    # Rus tilida ko'p uchraydigan so'zlar
-    russian_words = [
-        'который', 'которая', 'которые', 'является', 'были', 'было',
-        'этого', 'этом', 'этой', 'также', 'более', 'может',
-        'после', 'году', 'года', 'лет', 'человек', 'людей',
-        'власти', 'властей', 'стран', 'страны', 'российск',
-        'сообщ', 'заявил', 'отметил', 'подчеркнул'
-    ]
-    
-    # O'zbek tilida ko'p uchraydigan so'zlar
-    uzbek_words = [
-        'ва', 'билан', 'учун', 'бўлиб', 'қилди', 'қилиш',
-        'бўйича', 'ҳақида', 'ҳам', 'эса', 'лекин', 'аммо',
-        'шунингдек', 'ўзбекистон', 'ташкент', 'вилоят'
-    ]
-    
-    text_lower = text.lower()
-    
-    # Rus so'zlari soni
-    russian_word_count = sum(1 for word in russian_words if word in text_lower)
-    
-    # O'zbek so'zlari soni
-    uzbek_word_count = sum(1 for word in uzbek_words if word in text_lower)
-    
-    # Agar o'zbek kirill harflari bo'lsa - o'zbek
+    if not text:
+        return 'unknown', 'latin'
+
+    classes = text.translate(_CLASS_TABLE)
+    uzbek_cyrillic = classes.count(_UZBEK)
+    cyrillic_count = classes.count(_CYRILLIC)
+    latin_count = classes.count(_LATIN)
+    script = 'cyrillic' if cyrillic_count + uzbek_cyrillic > latin_count else 'latin'
+
+    if len(text.strip()) < 10:
+        return 'unknown', script
+
+    # Agar o'zbek kirill harflari bo'lsa - o'zbek (so'zlarni tekshirish shart emas)
     if uzbek_cyrillic > 0:
-        return 'uzbek'
-    
+        return 'uzbek', script
+
+    tokens = set(_TOKEN.findall(text.lower()))
+
     # Agar o'zbek so'zlari ko'p bo'lsa - o'zbek
-    if uzbek_word_count >= 2:
-        return 'uzbek'
-    
+    if len(tokens & UZBEK_WORDS) >= 2:
+        return 'uzbek', script
+
     # Agar rus so'zlari ko'p bo'lsa va kirill harflar ko'p - rus
-    if russian_word_count >= 2 and cyrillic_count > latin_count:
-        return 'russian'
-    
+    if cyrillic_count > latin_count:
+        russian_word_count = len(tokens & RUSSIAN_WORDS)
+        if russian_word_count < 2:
+            russian_word_count += sum(
+                1 for stem in RUSSIAN_STEMS if any(token.startswith(stem) for token in tokens)
+            )
+        if russian_word_count >= 2:
+            return 'russian', script
+
     # Agar kirill harflar ko'p lekin rus so'zlari kam - o'zbek (kirill)
     if cyrillic_count > latin_count * 2:
-        return 'uzbek'
-    
+        return 'uzbek', script
+
     # Agar lotin harflar ko'p - ingliz yoki o'zbek (lotin)
     if latin_count > cyrillic_count:
-        # Ingliz tilida ko'p uchraydigan so'zlar
-        english_words = ['the', 'and', 'for', 'with', 'that', 'this', 'from', 'have', 'been']
-        english_count = sum(1 for word in english_words if word in text_lower)
-        
-        if english_count >= 2:
-            return 'english'
-        else:
-            return 'uzbek'  # O'zbek lotin
-    
-    return 'unknown'
+        if len(tokens & ENGLISH_WORDS) >= 2:
+            return 'english', script
+        return 'uzbek', script  # O'zbek lotin
+
+    return 'unknown', script
+
+
+def detect_language(text: str) -> str:
+    """
+    Matnning tilini aniqlash
+
+    Returns:
+        'uzbek' - O'zbek tili (lotin yoki kirill)
+        'russian' - Rus tili
+        'english' - Ingliz tili
+        'unknown' - Noma'lum
+    """
+    return detect_language_script(text)[0]
 
 
 def is_uzbek(text: str) -> bool:
@@ -0,0 +1,166 @@
+"""
+Lokal kategoriya modeli (multinomial naive Bayes, hashed n-gram)
+
+Tarmoqsiz, AI analyzer ga muqobil: database'dagi News.text / News.category
+bo'yicha o'qitiladi (train_local_model.py), kichik faylga saqlanadi
+(LOCAL_MODEL_PATH) va bir marta yuklanadi. Fayl bo'lmasa - classify_news
+avvalgidek faqat kalit so'zlar bilan ishlaydi.
+
+Belgilar (features): so'zlar va so'z juftliklari (bigram), crc32 bilan
+LOCAL_MODEL_BUCKETS ta katakka hash qilinadi - lug'at saqlanmaydi.
+Faylda faqat o'qitishda uchragan kataklar saqlanadi (zlib bilan siqilgan).
+"""
+import os
+import re
+import json
+import math
+import zlib
+import struct
+from array import array
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+from config import LOCAL_MODEL_PATH, LOCAL_MODEL_BUCKETS
+
+_MAGIC = b'NBM1'
+
+_WORD = re.compile(r"[^\W\d_]+(?:['ʻʼ‘’][^\W\d_]+)*")
+
+_model = None
+_model_loaded = False
+
+
+def features(text: str, buckets: int = LOCAL_MODEL_BUCKETS) -> List[int]:
+    """So'z va bigram hashlari (takrorlar bilan - multinomial model uchun)"""
+    words = _WORD.findall((text or '').lower())
+    grams = words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+    return [zlib.crc32(gram.encode('utf-8')) % buckets for gram in grams]
+
+
+class NaiveBayesModel:
+    """
+    Multinomial naive Bayes
+
+    table: katak -> har bir kategoriya uchun log P(katak | kategoriya)
+    defaults: o'qitishda uchramagan katak uchun log ehtimollik (smoothing)
+    """
+
+    def __init__(self, classes: list, priors: list, defaults: list, table: dict, buckets: int):
+        self.classes = classes
+        self.priors = priors
+        self.defaults = defaults
+        self.table = table
+        self.buckets = buckets
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]], buckets: int = LOCAL_MODEL_BUCKETS,
+              alpha: float = 0.1) -> 'NaiveBayesModel':
+        """
+        Args:
+            samples: [(text, category), ...]
+            alpha: Laplace smoothing
+        """
+        docs = Counter()
+        counts = {}  # category -> Counter(katak -> soni)
+        for text, category in samples:
+            docs[category] += 1
+            counts.setdefault(category, Counter()).update(features(text, buckets))
+
+        classes = sorted(docs)
+        total_docs = sum(docs.values())
+        vocabulary = set()
+        for counter in counts.values():
+            vocabulary.update(counter)
+        size = len(vocabulary) or 1
+
+        priors = [math.log(docs[category] / total_docs) for category in classes]
+        denominators = [sum(counts[category].values()) + alpha * size for category in classes]
+        defaults = [math.log(alpha / denominator) for denominator in denominators]
+        table = {
+            bucket: tuple(
+                math.log((counts[category][bucket] + alpha) / denominator)
+                for category, denominator in zip(classes, denominators)
+            )
+            for bucket in vocabulary
+        }
+        return cls(classes, priors, defaults, table, buckets)
+
+    def predict(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Returns:
+            [(category, ehtimollik), ...] - kamayish tartibida (bo'sh matn - [])
+        """
+        grams = features(text, self.buckets)
+        if not grams:
+            return []
+
+        table = self.table
+        defaults = self.defaults
+        rows = [table.get(bucket, defaults) for bucket in grams]
+        scores = [prior + sum(column) for prior, column in zip(self.priors, zip(*rows))]
+
+        # log -> ehtimollik (softmax)
+        top = max(scores)
+        weights = [math.exp(score - top) for score in scores]
+        total = sum(weights)
+        return sorted(
+            ((category, weight / total) for category, weight in zip(self.classes, weights)),
+            key=lambda pair: pair[1],
+            reverse=True
+        )
+
+    def save(self, path: str):
+        """Siqilgan fayl: sarlavha (JSON) + kataklar (uint32) + log ehtimolliklar (float32)"""
+        keys = sorted(self.table)
+        values = array('f')
+        for key in keys:
+            values.extend(self.table[key])
+        header = json.dumps({
+            'classes': self.classes,
+            'priors': self.priors,
+            'defaults': self.defaults,
+            'buckets': self.buckets,
+            'size': len(keys),
+        }).encode('utf-8')
+        payload = struct.pack('<I', len(header)) + header + array('I', keys).tobytes() + values.tobytes()
+        with open(path, 'wb') as f:
+            f.write(_MAGIC + zlib.compress(payload, 9))
+
+    @classmethod
+    def load(cls, path: str) -> 'NaiveBayesModel':
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"{path}: model fayli emas")
+        payload = zlib.decompress(data[len(_MAGIC):])
+
+        (header_size,) = struct.unpack_from('<I', payload)
+        offset = 4 + header_size
+        header = json.loads(payload[4:offset].decode('utf-8'))
+        size = header['size']
+        classes = header['classes']
+
+        keys = array('I')
+        keys.frombytes(payload[offset:offset + size * 4])
+        values = array('f')
+        values.frombytes(payload[offset + size * 4:])
+
+        width = len(classes)
+        table = {
+            key: tuple(values[index * width:(index + 1) * width])
+            for index, key in enumerate(keys)
+        }
+        return cls(classes, header['priors'], header['defaults'], table, header['buckets'])
+
+
+def get_model() -> Optional[NaiveBayesModel]:
+    """LOCAL_MODEL_PATH dagi modelni bir marta yuklash (fayl yo'q bo'lsa None)"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        if LOCAL_MODEL_PATH and os.path.exists(LOCAL_MODEL_PATH):
+            try:
+                _model = NaiveBayesModel.load(LOCAL_MODEL_PATH)
+                print(f"✅ Lokal model yuklandi: {LOCAL_MODEL_PATH} ({len(_model.table)} ta katak)")
+            except Exception as e:
+                print(f"⚠️ Lokal model yuklanmadi ({LOCAL_MODEL_PATH}): {e}")
+    return _model
@@ -0,0 +1,101 @@
+"""
+Bir marta qayta ishlangan post (ProcessedPost)
+
+Kanal posti bir marta tozalanadi, tili va yozuvi aniqlanadi, kategoriyaga
+ajratiladi - keyingi bosqichlar (saqlash, foydalanuvchilarni topish,
+yuborish) shu obyektni ishlatadi va hech narsani qayta hisoblamaydi.
+"""
+import hashlib
+import re
+from types import MappingProxyType
+from processor.text_cleaner import clean_text, clean_many, extract_preview
+from processor.language_detector import detect_language_script
+from processor.classifier import analyze_news, analyze_batch, detect_breaking
+
+
+class ProcessedPost:
+    """
+    Qayta ishlangan post (o'zgarmas)
+
+    Atributlar:
+        raw_text: kanal postining asl matni
+        channel: kanal username
+        text: tozalangan matn
+        language: 'uzbek' / 'russian' / 'english' / 'unknown' (asl matn bo'yicha)
+        script: 'latin' / 'cyrillic'
+        category: kategoriya yoki None
+        scores: {category: score} - kalit so'z ballari (faqat o'qish uchun)
+        is_breaking: shoshilinch yangilik
+        content_hash: tozalangan matn hash'i (bo'sh joy va registrsiz)
+        preview: qisqa preview (loglar uchun)
+    """
+
+    __slots__ = (
+        'raw_text', 'channel', 'text', 'language', 'script', 'category',
+        'scores', 'is_breaking', 'content_hash', 'preview',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ProcessedPost o'zgarmas ({name})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"ProcessedPost o'zgarmas ({name})")
+
+    @property
+    def is_uzbek(self) -> bool:
+        return self.language == 'uzbek'
+
+    def __repr__(self):
+        return (
+            f"ProcessedPost(channel={self.channel!r}, category={self.category!r}, "
+            f"language={self.language!r}, script={self.script!r}, preview={self.preview!r})"
+        )
+
+
+def content_hash(text: str) -> str:
+    """Matn hash'i - bo'sh joylar va katta/kichik harf farqi hisobga olinmaydi"""
+    normalized = re.sub(r'\s+', ' ', text or '').strip().lower()
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _build(raw_text: str, channel: str, text: str, category, scores: dict) -> ProcessedPost:
+    language, script = detect_language_script(raw_text)
+    return ProcessedPost(
+        raw_text=raw_text,
+        channel=channel,
+        text=text,
+        language=language,
+        script=script,
+        category=category,
+        scores=MappingProxyType(dict(scores)),
+        is_breaking=detect_breaking(raw_text),
+        content_hash=content_hash(text),
+        preview=extract_preview(text, 100),
+    )
+
+
+def process_post(raw_text: str, channel: str = None) -> ProcessedPost:
+    """Kanal postini bir marta qayta ishlash"""
+    text = clean_text(raw_text)
+    category, scores = analyze_news(text, channel)
+    return _build(raw_text, channel, text, category, scores)
+
+
+def process_posts(raw_texts: list, channel: str = None) -> list:
+    """
+    Ko'p postni birdaniga qayta ishlash (backfill)
+
+    Tozalash clean_many, klassifikatsiya analyze_batch orqali.
+
+    Returns:
+        [ProcessedPost, ...] - raw_texts tartibida
+    """
+    texts = clean_many(raw_texts)
+    return [
+        _build(raw_text, channel, text, category, scores)
+        for raw_text, text, (category, scores) in zip(raw_texts, texts, analyze_batch(texts, channel))
+    ]
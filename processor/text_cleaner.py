@@ -1,171 +1,228 @@
+"""
+Post matnini tozalash
+
+Qoidalar (pattern, almashtirish) import paytida bir marta kompilyatsiya
+qilinadi va _RULES jadvalida ketma-ket qo'llanadi - tartib muhim, har bir
+qoida oldingilarining natijasida ishlaydi. Natija eski ketma-ket re.sub
+versiyasi bilan bir xil (bench_text_cleaner.py tekshiradi).
+
+Birlashtirilgan qoidalar faqat natija o'zgarmaydigan joylarda:
+- kategoriya sarlavhalari (17 ta) - bitta alternation
+- Kun.uz + qo'shimcha so'z - bitta pattern
+- **** va ** - bitta pattern
+
+Qimmat patternlar ([^\n]*? bilan boshlanadiganlar har bir pozitsiyadan
+qator oxirigacha qidiradi) oldin arzon literal tekshiruvdan o'tadi (guard):
+literal matnda bo'lmasa, pattern ham mos kelmaydi.
+"""
 import re
 
-def clean_text(text: str) -> str:
+# Kun.uz dan keyingi so'z -> almashtirish
+_KUNUZ_SUFFIXES = ('surishtiruv', 'jurnalistning')
+
+# Kategoriya sarlavhalari (emoji bilan) - KIRILL va LOTIN
+_CATEGORY_HEADERS = (
+    r'🌍\s*Дунё', r'🌍\s*Dunyo',
+    r'👥\s*Жамият', r'👥\s*Jamiyat',
+    r'⚽\s*Спорт', r'⚽\s*Sport',
+    r'💰\s*Иқтисод', r'💰\s*Iqtisod',
+    r'🏛\s*Сиёсат', r'🏛\s*Siyosat',
+    r'💻\s*Технология', r'💻\s*Texnologiya',
+    r'🏥\s*Саломатлик', r'🏥\s*Salomatlik',
+    r'🌤\s*Об-ҳаво', r'🌤\s*Ob-havo', r'🌤\s*OBHAVO',
+)
+
+
+def _kunuz_replace(match) -> str:
+    for index, suffix in enumerate(_KUNUZ_SUFFIXES, start=1):
+        if match.group(index):
+            return suffix
+    return ''
+
+
+def _rule(pattern: str, replacement, flags: int = 0, guard: str = None):
     """
-    Postni tozalash:
-    - Linklar (kun.uz va boshqalar)
-    - Hashtag
-    - Kanal nomlari
-    - Video-related matnlar
-    - Reklama matnlari
-    - Emoji spam
-    - Ortiqcha formatlar (**, ||, ~~)
+    Bitta qoida: (kompilyatsiya qilingan pattern, almashtirish, guard)
+
+    guard - patternda albatta uchraydigan literal. Xuddi shu flaglar bilan
+    qidiriladi; topilmasa qoida o'tkazib yuboriladi.
     """
-    if not text:
-        return ""
-    
+    compiled_guard = re.compile(re.escape(guard), flags).search if guard else None
+    return re.compile(pattern, flags), replacement, compiled_guard
+
+
+_M = re.MULTILINE
+_I = re.IGNORECASE
+
+_RULES = (
     # Markdown linklar ni olib tashlash: [text](url)
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    
+    _rule(r'\[([^\]]+)\]\([^\)]+\)', r'\1'),
+
     # Linklar ni olib tashlash
     # 1. Kun.uz linki
-    text = re.sub(r'https?://kun\.uz/\d+', '', text)
-    
+    _rule(r'https?://kun\.uz/\d+', ''),
     # 2. Boshqa linklar
-    text = re.sub(r'http[s]?://\S+', '', text)
-    text = re.sub(r'www\.\S+', '', text)
-    
+    _rule(r'http[s]?://\S+', ''),
+    _rule(r'www\.\S+', ''),
+
     # Hashtag ni olib tashlash
-    text = re.sub(r'#\w+', '', text)
-    
+    _rule(r'#\w+', ''),
+
     # Kanal nomlarini olib tashlash (oxirida va o'rtada)
-    text = re.sub(r'⚡️.*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'👉.*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'📢\s*@\w+.*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'🔗\s*Manba.*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'Manba:?\s*@\w+\s*\n?', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'Manba:\s*$', '', text, flags=re.MULTILINE | re.IGNORECASE)  # Oxirida "Manba:"
-    text = re.sub(r'@\w+\s*rasmiy\s*kanali.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'rasmiy\s*kanali.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    
+    _rule(r'⚡️.*\n', '', _M),
+    _rule(r'👉.*\n', '', _M),
+    _rule(r'📢\s*@\w+.*\n', '', _M),
+    _rule(r'🔗\s*Manba.*\n', '', _M),
+    _rule(r'Manba:?\s*@\w+\s*\n?', '', _M | _I),
+    _rule(r'Manba:\s*$', '', _M | _I),  # Oxirida "Manba:"
+    _rule(r'@\w+\s*rasmiy\s*kanali.*\n', '', _M | _I),
+    _rule(r'rasmiy\s*kanali.*\n', '', _M | _I),
+
     # "rasmiy kanali" har qanday joyda (oxirida ham)
-    text = re.sub(r'\s+rasmiy\s+kanali\s*', ' ', text, flags=re.IGNORECASE)
-    text = re.sub(r'rasmiy\s+kanali', '', text, flags=re.IGNORECASE)
-    
+    _rule(r'\s+rasmiy\s+kanali\s*', ' ', _I),
+    _rule(r'rasmiy\s+kanali', '', _I),
+
     # Kanal nomlari (Kun.uz, Daryo, Gazeta.uz) - har qanday joyda
-    text = re.sub(r'Kun\.uz\s*surishtiruvi', 'surishtiruv', text, flags=re.IGNORECASE)
-    text = re.sub(r'Kun\.uz\s*jurnalistining', 'jurnalistning', text, flags=re.IGNORECASE)
-    text = re.sub(r'Kun\.uz\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'Daryo\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'Gazeta\.uz\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'Yangiliklargruhi\s*', '', text, flags=re.IGNORECASE)
-    
+    # "Kun.uz surishtiruvi" -> "surishtiruv", "Kun.uz jurnalistining" -> "jurnalistning", "Kun.uz" -> ""
+    _rule(r'Kun\.uz\s*(?:(surishtiruvi)|(jurnalistining))?', _kunuz_replace, _I),
+    _rule(r'Daryo\s*', '', _I),
+    _rule(r'Gazeta\.uz\s*', '', _I),
+    _rule(r'Yangiliklargruhi\s*', '', _I),
+
     # @kanal nomlari (oxirida va o'rtada)
-    text = re.sub(r'\s+@kunuz\s*$', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s+@gazetauz\s*$', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s+@daryo\s*$', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\|\s*@\w+\s*', '', text, flags=re.IGNORECASE)  # | @kanal
-    text = re.sub(r'@\w+\s*\|', '', text, flags=re.IGNORECASE)  # @kanal |
-    text = re.sub(r'\s+@\w+\s*$', '', text, flags=re.MULTILINE)  # Har qanday @kanal oxirida
-    
+    _rule(r'\s+@kunuz\s*$', '', _I),
+    _rule(r'\s+@gazetauz\s*$', '', _I),
+    _rule(r'\s+@daryo\s*$', '', _I),
+    _rule(r'\|\s*@\w+\s*', '', _I),  # | @kanal
+    _rule(r'@\w+\s*\|', '', _I),  # @kanal |
+    _rule(r'\s+@\w+\s*$', '', _M),  # Har qanday @kanal oxirida
+
     # Telegram so'zi (har qanday joyda)
-    text = re.sub(r'\s+Telegram\s*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\s+Telegram\s+', ' ', text, flags=re.IGNORECASE)
-    
+    _rule(r'\s+Telegram\s*\n', '', _M),
+    _rule(r'\s+Telegram\s+', ' ', _I),
+
     # Emoji patterns (oxirida va boshida)
-    text = re.sub(r'[⚡️👉📢🔗❗️]+\s*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^[⚡️👉📢🔗❗️]+\s*', '', text, flags=re.MULTILINE)
-    
+    _rule(r'[⚡️👉📢🔗❗️]+\s*\n', '', _M),
+    _rule(r'^[⚡️👉📢🔗❗️]+\s*', '', _M),
+
     # Batafsil — linklar (har qanday joyda)
-    text = re.sub(r'Batafsil\s*—.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'Подробнее\s*—.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'Batafsil\s*—', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'Подробнее\s*—', '', text, flags=re.IGNORECASE)
-    
+    _rule(r'Batafsil\s*—.*\n', '', _M | _I),
+    _rule(r'Подробнее\s*—.*\n', '', _M | _I),
+    _rule(r'Batafsil\s*—', '', _I),
+    _rule(r'Подробнее\s*—', '', _I),
+
     # Video-related matnlar (agar video bo'lmasa olib tashlash)
-    text = re.sub(r'📹\s*VIDЕOSHARHNI\s*TOMOSHA\s*QILING.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'📹\s*VIDEONI\s*TOMOSHA\s*QILING.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'📹\s*VIDEO\s*SHARH.*\n', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'VIDЕOSHARHNI\s*TOMOSHA\s*QILING', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'VIDEONI\s*TOMOSHA\s*QILING', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'VIDEO\s*SHARH', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'📹\s*', '', text)  # Video emoji
-    
-    # YANGI: Reklama va kanal nomlari (KUCHAYTIRILGAN)
+    _rule(r'📹\s*VIDЕOSHARHNI\s*TOMOSHA\s*QILING.*\n', '', _M | _I),
+    _rule(r'📹\s*VIDEONI\s*TOMOSHA\s*QILING.*\n', '', _M | _I),
+    _rule(r'📹\s*VIDEO\s*SHARH.*\n', '', _M | _I),
+    _rule(r'VIDЕOSHARHNI\s*TOMOSHA\s*QILING', '', _I),
+    _rule(r'VIDEONI\s*TOMOSHA\s*QILING', '', _I),
+    _rule(r'VIDEO\s*SHARH', '', _I),
+    _rule(r'📹\s*', ''),  # Video emoji
+
+    # Reklama va kanal nomlari
     # "⚡️ Дунё🌐Уз - Тв да кўрсатмайдиган хабарлар канали!" kabi matnlar
-    
+
     # 1. ⚡️ bilan boshlanadigan butun qatorni olib tashlash
-    text = re.sub(r'⚡️[^\n]*\n?', '', text, flags=re.MULTILINE)
-    
-    # 2. Kategoriya nomlari (emoji bilan) - KIRILL va LOTIN
-    # Boshida turgan kategoriya nomlarini olib tashlash
-    text = re.sub(r'^🌍\s*Дунё[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🌍\s*Dunyo[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^👥\s*Жамият[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^👥\s*Jamiyat[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^⚽\s*Спорт[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^⚽\s*Sport[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^💰\s*Иқтисод[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^💰\s*Iqtisod[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🏛\s*Сиёсат[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🏛\s*Siyosat[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^💻\s*Технология[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^💻\s*Texnologiya[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🏥\s*Саломатлик[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🏥\s*Salomatlik[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🌤\s*Об-ҳаво[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🌤\s*Ob-havo[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'^🌤\s*OBHAVO[^\n]*\n?', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    
+    _rule(r'⚡️[^\n]*\n?', '', _M),
+
+    # 2. Boshida turgan kategoriya nomlarini olib tashlash
+    # Butun qator o'chiriladi - bir qatorga ikkita sarlavha mos kelmaydi,
+    # shuning uchun bitta alternation ketma-ket 17 ta o'tish bilan bir xil
+    _rule(r'^(?:' + '|'.join(_CATEGORY_HEADERS) + r')[^\n]*\n?', '', _I | _M),
+
     # 3. Kanal reklama matnlari - KIRILL va LOTIN
     # "Тв да кўрсатмайдиган хабарлар канали" va boshqalar
-    text = re.sub(r'[^\n]*?Тв\s*да\s*кўрсатмайдиган[^\n]*?канали[^\n]*?\n?', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'[^\n]*?Tv\s*da\s*ko\'?rsatmaydigan[^\n]*?kanali[^\n]*?\n?', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'[^\n]*?хабарлар\s*канали[^\n]*?\n?', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'[^\n]*?xabarlar\s*kanali[^\n]*?\n?', '', text, flags=re.IGNORECASE)
-    
-    # 4. Kanal nomlari (Дунё🌐Уз, Kun.uz va boshqalar)
-    text = re.sub(r'Дунё\s*🌐\s*Уз[^\n]*?\n?', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'Дунё[^\n]*?Уз[^\n]*?\n?', '', text, flags=re.IGNORECASE)
-    
+    _rule(r'[^\n]*?Тв\s*да\s*кўрсатмайдиган[^\n]*?канали[^\n]*?\n?', '', _I, guard='кўрсатмайдиган'),
+    _rule(r'[^\n]*?Tv\s*da\s*ko\'?rsatmaydigan[^\n]*?kanali[^\n]*?\n?', '', _I, guard='rsatmaydigan'),
+    _rule(r'[^\n]*?хабарлар\s*канали[^\n]*?\n?', '', _I, guard='хабарлар'),
+    _rule(r'[^\n]*?xabarlar\s*kanali[^\n]*?\n?', '', _I, guard='xabarlar'),
+
+    # 4. Kanal nomlari (Дунё🌐Уз va boshqalar)
+    _rule(r'Дунё\s*🌐\s*Уз[^\n]*?\n?', '', _I, guard='Дунё'),
+    _rule(r'Дунё[^\n]*?Уз[^\n]*?\n?', '', _I, guard='Дунё'),
+
     # 5. Yolg'iz qolgan belgilar (!, ?, .)
-    text = re.sub(r'^\s*[!?.]+\s*$', '', text, flags=re.MULTILINE)
-    
+    _rule(r'^\s*[!?.]+\s*$', '', _M),
+
     # 6. Eski patternlar (saqlab qolamiz)
-    text = re.sub(r'⚡️\s*\*\*.*?\*\*.*?канали.*?\*\*!?', '', text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r'⚡️\s*\*\*.*?\*\*.*?канал.*?\*\*!?', '', text, flags=re.IGNORECASE | re.DOTALL)
-    
+    _rule(r'⚡️\s*\*\*.*?\*\*.*?канали.*?\*\*!?', '', _I | re.DOTALL, guard='⚡️'),
+    _rule(r'⚡️\s*\*\*.*?\*\*.*?канал.*?\*\*!?', '', _I | re.DOTALL, guard='⚡️'),
+
     # 7. Umumiy reklama patternlar
-    text = re.sub(r'\*\*.*?канали\*\*!?', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'канали\s*\*\*!?', '', text, flags=re.IGNORECASE)
-    
-    # YANGI: Emoji spam va ortiqcha formatlarni tozalash
-    # Ko'p emoji ketma-ket (3 tadan ko'p)
-    text = re.sub(r'([\U0001F300-\U0001F9FF])\1{2,}', r'\1', text)  # Bir xil emoji 3+ marta
-    
-    # Yulduzcha (**) formatni olib tashlash
-    text = re.sub(r'\*\*\*\*', '', text)  # 4 ta yulduzcha
-    text = re.sub(r'\*\*', '', text)  # 2 ta yulduzcha (bold)
-    
+    _rule(r'\*\*.*?канали\*\*!?', '', _I),
+    _rule(r'канали\s*\*\*!?', '', _I),
+
+    # Emoji spam va ortiqcha formatlarni tozalash
+    _rule(r'([\U0001F300-\U0001F9FF])\1{2,}', r'\1'),  # Bir xil emoji 3+ marta
+
+    # Yulduzcha (**, ****) formatni olib tashlash - **** ikkita ** bilan bir xil
+    _rule(r'\*\*', ''),
+
     # Spoiler (||) formatni olib tashlash
-    text = re.sub(r'\|\|', '', text)
-    
+    _rule(r'\|\|', ''),
+
     # Strikethrough (~~) formatni olib tashlash
-    text = re.sub(r'~~', '', text)
-    
+    _rule(r'~~', ''),
+
     # Ortiqcha emoji (raqam emoji spam: 5️⃣5️⃣)
-    text = re.sub(r'([0-9]️⃣)\1+', r'\1', text)  # Bir xil raqam emoji 2+ marta
-    
+    _rule(r'([0-9]️⃣)\1+', r'\1'),  # Bir xil raqam emoji 2+ marta
+
     # Ortiqcha bo'sh joy va belgilar
-    text = re.sub(r'\s*\*\s*', ' ', text)  # * belgilar atrofidagi bo'sh joylar
-    text = re.sub(r'\s*\|\s*', ' ', text)  # | belgilar atrofidagi bo'sh joylar
-    
-    # Ko'p bo'sh joylarni bitta qilish
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\n\s*\n+', '\n\n', text)  # Ko'p qatorlarni ikki qatorga qisqartirish
-    
+    _rule(r'\s*\*\s*', ' '),  # * belgilar atrofidagi bo'sh joylar
+    _rule(r'\s*\|\s*', ' '),  # | belgilar atrofidagi bo'sh joylar
+
+    # Ko'p bo'sh joylarni (yangi qatorlarni ham) bitta qilish - bundan keyin
+    # matnda \n qolmaydi, shuning uchun qatorlarni alohida tozalash shart emas
+    _rule(r'\s+', ' '),
+)
+
+# OXIRGI: @kanal nomlarini olib tashlash (strip dan keyin)
+_TRAILING_CHANNEL = re.compile(r'\s+@\w+\s*$', re.MULTILINE)
+
+
+def clean_text(text: str) -> str:
+    """
+    Postni tozalash:
+    - Linklar (kun.uz va boshqalar)
+    - Hashtag
+    - Kanal nomlari
+    - Video-related matnlar
+    - Reklama matnlari
+    - Emoji spam
+    - Ortiqcha formatlar (**, ||, ~~)
+    """
+    if not text:
+        return ""
+
+    for pattern, replacement, guard in _RULES:
+        if guard is not None and guard(text) is None:
+            continue
+        text = pattern.sub(replacement, text)
+
     # Boshida va oxirida bo'sh joylar
     text = text.strip()
-    
-    # Har bir qatorning boshida va oxirida bo'sh joylar
-    lines = text.split('\n')
-    lines = [line.strip() for line in lines]
-    text = '\n'.join(lines)
-    
-    # OXIRGI: @kanal nomlarini olib tashlash (eng oxirida)
-    text = re.sub(r'\s+@\w+\s*$', '', text, flags=re.MULTILINE)
-    
-    return text
+
+    return _TRAILING_CHANNEL.sub('', text)
+
+
+def clean_many(texts) -> list:
+    """
+    Bir nechta postni tozalash (backfill, qayta ishlash skriptlari)
+
+    Bir xil matnlar (bir post bir nechta kanalda) bir marta tozalanadi.
+
+    Returns:
+        Tozalangan matnlar - kirish tartibida
+    """
+    cache = {}
+    result = []
+    for text in texts:
+        cleaned = cache.get(text)
+        if cleaned is None:
+            cleaned = cache[text] = clean_text(text)
+        result.append(cleaned)
+    return result
 
 def extract_preview(text: str, max_length: int = 150) -> str:
     """Qisqa preview yaratish"""
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Saqlangan yangiliklarni qayta klassifikatsiya qilish
+
+CATEGORIES kalit so'zlari o'zgargandan keyin eski yangiliklar kategoriyasini
+yangilash uchun. Yangiliklar paketlab (classify_batch) ko'rib chiqiladi.
+
+Ishlatish:
+    python reclassify_news.py            # faqat hisobot (o'zgartirmaydi)
+    python reclassify_news.py --apply    # kategoriyalarni yangilash
+"""
+import sys
+import asyncio
+from collections import Counter
+from sqlalchemy import select, update
+from db.database import async_session, init_db
+from db.models import News
+from processor.classifier import classify_batch
+
+# Bir martada o'qiladigan yangiliklar soni
+BATCH_SIZE = 500
+
+
+async def reclassify_news(apply: bool = False):
+    await init_db()
+
+    print("🔄 Yangiliklar qayta klassifikatsiya qilinmoqda...")
+
+    total = 0
+    changes = Counter()
+    last_id = 0
+
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(News.id, News.text, News.category, News.channel_username)
+                .where(News.id > last_id)
+                .order_by(News.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            total += len(rows)
+
+            categories = classify_batch([row.text or '' for row in rows])
+
+            for row, category in zip(rows, categories):
+                # Kategoriya topilmasa - eskisi qoladi
+                if not category or category == row.category:
+                    continue
+                changes[(row.category, category)] += 1
+                if apply:
+                    await session.execute(
+                        update(News).where(News.id == row.id).values(category=category)
+                    )
+
+            if apply:
+                await session.commit()
+            print(f"   📊 {total} ta ko'rib chiqildi...")
+
+    changed = sum(changes.values())
+    print(f"\n✅ Jami: {total} ta yangilik, {changed} tasining kategoriyasi o'zgaradi")
+    for (old, new), count in changes.most_common():
+        print(f"   {old or '-'} -> {new}: {count}")
+
+    if changed and not apply:
+        print(f"\nℹ️ O'zgartirish uchun: python reclassify_news.py --apply")
+
+
+if __name__ == "__main__":
+    asyncio.run(reclassify_news(apply='--apply' in sys.argv))
@@ -0,0 +1,221 @@
+"""
+Ko'p jarayonli yuborish (sharded delivery workers)
+
+DELIVERY_WORKER_PROCESSES > 0 bo'lsa, outbox asosiy jarayonda emas,
+N ta alohida jarayonda bo'shatiladi. Har bir jarayon:
+- telegram_id % N == shard bo'lgan yozuvlarni oladi (deliveries jadvali umumiy)
+- o'zining Bot API ulanishi va rate limiteriga ega (global limit / N)
+- tarjima, HTML formatlash va bo'laklarga ajratishni o'zi bajaradi
+
+Asosiy jarayon (listener + bot polling) faqat navbatga yozadi va
+notify() orqali workerlarni uyg'otadi.
+
+Eslatma: bir nechta jarayon bitta database'ga yozadi - SQLite WAL
+rejimida ochiladi (db/database.py), ko'p shard uchun PostgreSQL yaxshiroq.
+"""
+import asyncio
+import multiprocessing
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from db.database import async_session
+from db.models import Delivery
+from services.outbox import PRIORITY_NORMAL, LANE_NAMES
+from config import DELIVERY_WORKER_PROCESSES, DELIVERY_CONCURRENCY, DELIVERY_GLOBAL_RATE
+
+# Navbatda hech narsa kutmayapti
+NO_PRIORITY = 99
+
+# Worker jarayoni to'xtaganini tekshirish oralig'i (soniya)
+MONITOR_INTERVAL = 5.0
+
+# To'xtatishda jarayonlarni kutish (soniya)
+STOP_TIMEOUT = 15.0
+
+
+class ShardNotifier:
+    """Asosiy jarayondan bitta worker jarayoniga signal (uyg'otish / to'xtatish)"""
+
+    def __init__(self, ctx):
+        self.wakeup = ctx.Event()
+        self.stop = ctx.Event()
+        self.priority = ctx.Value('i', NO_PRIORITY)
+
+    def notify(self, priority: int):
+        with self.priority.get_lock():
+            if priority < self.priority.value:
+                self.priority.value = priority
+        self.wakeup.set()
+
+    def take(self):
+        """Kutayotgan eng yuqori prioritetni olish (yo'q bo'lsa None)"""
+        # Avval tozalash - o'qishdan keyin kelgan notify yo'qolmasligi uchun
+        self.wakeup.clear()
+        with self.priority.get_lock():
+            priority = self.priority.value
+            self.priority.value = NO_PRIORITY
+        return None if priority == NO_PRIORITY else priority
+
+
+def run_shard(shard: int, shards: int, notifier: ShardNotifier):
+    """Worker jarayonining kirish nuqtasi"""
+    try:
+        asyncio.run(_run_shard(shard, shards, notifier))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_shard(shard: int, shards: int, notifier: ShardNotifier):
+    from bot.bot import NewsBot
+    from services.dispatcher import NewsDispatcher
+    from services.outbox import OutboxWorker
+
+    # Polling yo'q - faqat Bot API orqali yuborish
+    bot = NewsBot(global_rate=DELIVERY_GLOBAL_RATE / shards)
+    await bot.app.initialize()
+
+    worker = OutboxWorker(
+        bot,
+        NewsDispatcher(concurrency=DELIVERY_CONCURRENCY),
+        shard=(shard, shards)
+    )
+    print(f"📮 Delivery worker {shard + 1}/{shards} ishga tushdi")
+
+    task = asyncio.create_task(worker.run())
+    loop = asyncio.get_running_loop()
+    try:
+        while not task.done():
+            await loop.run_in_executor(None, notifier.wakeup.wait, 1.0)
+            if notifier.stop.is_set():
+                break
+            priority = notifier.take()
+            if priority is not None:
+                worker.notify(priority)
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ Delivery worker {shard + 1}/{shards} xatosi: {e}")
+        await bot.app.shutdown()
+        print(f"⏹️ Delivery worker {shard + 1}/{shards} to'xtadi")
+
+
+class ShardedDelivery:
+    """
+    Worker jarayonlarini boshqarish
+
+    OutboxWorker bilan bir xil interfeys (run, stop, notify, prime,
+    lane_report, limiter_status) - main.py va admin buyruqlari farqini bilmaydi.
+    """
+
+    def __init__(self, processes: int = DELIVERY_WORKER_PROCESSES):
+        self.processes = processes
+        # fork emas - Telethon / PTB holati yangi jarayonga ko'chmasligi uchun
+        self._ctx = multiprocessing.get_context('spawn')
+        self._notifiers = [ShardNotifier(self._ctx) for _ in range(processes)]
+        self._workers = [None] * processes
+        self._stopping = False
+
+    def notify(self, priority: int = PRIORITY_NORMAL):
+        for notifier in self._notifiers:
+            notifier.notify(priority)
+
+    async def prime(self, news_id: int, languages: set):
+        # Tarjima worker jarayonlarida bajariladi
+        return None
+
+    def limiter_status(self):
+        # Har bir jarayonning o'z limiteri bor
+        return None
+
+    def _start(self, shard: int):
+        notifier = self._notifiers[shard]
+        notifier.stop.clear()
+        process = self._ctx.Process(
+            target=run_shard,
+            args=(shard, self.processes, notifier),
+            name=f"delivery-{shard}",
+            daemon=True
+        )
+        process.start()
+        self._workers[shard] = process
+
+    async def run(self):
+        """Jarayonlarni ishga tushirish va to'xtab qolganlarini qayta ishga tushirish"""
+        for shard in range(self.processes):
+            self._start(shard)
+        print(f"✅ {self.processes} ta delivery worker jarayoni ishga tushdi")
+
+        try:
+            while True:
+                await asyncio.sleep(MONITOR_INTERVAL)
+                for shard, process in enumerate(self._workers):
+                    if not self._stopping and not process.is_alive():
+                        print(f"⚠️ Delivery worker {shard + 1} to'xtab qoldi (exit {process.exitcode}) - qayta ishga tushirilmoqda")
+                        self._start(shard)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Workerlarni to'xtatish (olingan yozuvlar navbatga qaytariladi)"""
+        self._stopping = True  # To'xtagan jarayonlar qayta ishga tushirilmaydi
+        for notifier in self._notifiers:
+            notifier.stop.set()
+            notifier.wakeup.set()
+
+        loop = asyncio.get_running_loop()
+        for process in self._workers:
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+
+    async def lane_report(self) -> list:
+        """
+        Har bir yo'lak bo'yicha holat - database'dan (metrikalar worker jarayonlarida)
+
+        Kechikish: created_at -> sent_at, oxirgi 24 soatda navbatga qo'shilganlar
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                select(Delivery.priority, func.count())
+                .where(Delivery.status == 'pending')
+                .group_by(Delivery.priority)
+            )
+            pending = dict(result.all())
+
+            result = await session.execute(
+                select(Delivery.priority, Delivery.status, Delivery.created_at, Delivery.sent_at)
+                .where(Delivery.status.in_(['done', 'failed']))
+                .where(Delivery.created_at >= datetime.utcnow() - timedelta(days=1))
+            )
+            rows = result.all()
+
+        latencies = {priority: [] for priority in LANE_NAMES}
+        failed = {priority: 0 for priority in LANE_NAMES}
+        for row in rows:
+            if row.priority not in LANE_NAMES:
+                continue
+            if row.status == 'done' and row.sent_at:
+                latencies[row.priority].append((row.sent_at - row.created_at).total_seconds())
+            elif row.status == 'failed':
+                failed[row.priority] += 1
+
+        report = []
+        for priority, name in LANE_NAMES.items():
+            values = sorted(latencies[priority])
+            p95 = values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))] if values else 0.0
+            report.append({
+                'lane': name,
+                'pending': pending.get(priority, 0),
+                'sent': len(values),
+                'failed': failed[priority],
+                'preempted': 0,
+                'avg': sum(values) / len(values) if values else 0.0,
+                'p95': p95,
+                'max': values[-1] if values else 0.0,
+            })
+        return report
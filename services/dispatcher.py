@@ -0,0 +1,167 @@
+"""
+Yangiliklarni ko'p userga parallel yuborish (fan-out dispatcher)
+
+Telegram limitlari:
+- Global: ~30 xabar/soniya (bitta bot uchun)
+- Bitta chat: ~1 xabar/soniya
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+
+class RateLimiter:
+    """
+    Global token bucket + har bir chat uchun minimal interval
+
+    Har bir Bot API chaqiruvidan oldin acquire(chat_id) chaqiriladi.
+    Flood wait (RetryAfter) bo'lsa on_flood() - barcha yuborishlar
+    retry_after davomida to'xtaydi va tezlik ikki baravar kamayadi,
+    keyin asta-sekin asl qiymatiga qaytadi.
+    """
+
+    # Flooddan keyin tezlikni tiklash: har RECOVERY_INTERVAL soniyada +RECOVERY_STEP xabar/s
+    RECOVERY_INTERVAL = 5.0
+    RECOVERY_STEP = 1.0
+
+    def __init__(self, rate: float, per_chat_interval: float = 1.0, burst: Optional[float] = None):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.per_chat_interval = per_chat_interval
+        self.flood_count = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_adjust = 0.0
+        self._lock = asyncio.Lock()
+        self._chat_next = {}  # chat_id -> keyingi ruxsat etilgan vaqt
+
+    def on_flood(self, retry_after: float):
+        """Telegram flood control (RetryAfter) - global pauza va tezlikni kamaytirish"""
+        now = time.monotonic()
+        self.flood_count += 1
+        self._paused_until = max(self._paused_until, now + retry_after)
+        self.rate = max(1.0, self.rate / 2)
+        self.tokens = 0
+        self._last_adjust = self._paused_until
+
+    def _recover(self, now: float):
+        """Flood bo'lmasa tezlikni asta-sekin asl qiymatiga qaytarish"""
+        if self.rate < self.base_rate and now - self._last_adjust >= self.RECOVERY_INTERVAL:
+            self.rate = min(self.base_rate, self.rate + self.RECOVERY_STEP)
+            self._last_adjust = now
+
+    async def acquire(self, chat_id: Optional[int] = None):
+        """Yuborishga ruxsat kutish (avval chat limiti, keyin global limit)"""
+        if chat_id is not None and self.per_chat_interval > 0:
+            now = time.monotonic()
+            next_at = max(self._chat_next.get(chat_id, now), now)
+            self._chat_next[chat_id] = next_at + self.per_chat_interval
+            if len(self._chat_next) > 10000:
+                self._prune(now)
+            if next_at > now:
+                await asyncio.sleep(next_at - now)
+
+        # Lock FIFO tartibda ishlaydi - kutayotganlar navbat bilan token oladi
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._recover(now)
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def _prune(self, now: float):
+        """Eskirgan chat yozuvlarini tozalash"""
+        self._chat_next = {
+            chat_id: next_at for chat_id, next_at in self._chat_next.items() if next_at > now
+        }
+
+
+class DeliveryStats:
+    """Bitta yangilik uchun yuborish statistikasi"""
+
+    def __init__(self, news_id: int, total: int):
+        self.news_id = news_id
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0  # Keyinroq qayta yuboriladi
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at or time.monotonic()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Xabar/soniya (muvaffaqiyatli va xato birga)"""
+        elapsed = self.elapsed
+        return (self.sent + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"news #{self.news_id}: {self.sent}/{self.total} yuborildi "
+            f"(xato: {self.failed}, qayta: {self.retried}), "
+            f"{self.elapsed:.1f} s, {self.throughput:.1f} xabar/s"
+        )
+
+
+class NewsDispatcher:
+    """
+    Cheklangan parallellik bilan fan-out
+
+    send(recipient) -> True (yuborildi) | False (yuborilmadi) | None (keyinroq qayta)
+    Rate limit send ichida (RateLimiter orqali) qo'llaniladi.
+    """
+
+    def __init__(self, concurrency: int = 20):
+        self.concurrency = concurrency
+
+    async def dispatch(
+        self,
+        news_id: int,
+        recipients: Iterable[Any],
+        send: Callable[[Any], Awaitable[bool]],
+        stats: Optional[DeliveryStats] = None
+    ) -> DeliveryStats:
+        """
+        Barcha recipientlarga yuborish va statistikani qaytarish
+        
+        stats berilsa - natijalar unga qo'shiladi (bir yangilik bir nechta
+        bo'lakda yuborilganda umumiy statistika uchun)
+        """
+        recipients = list(recipients)
+        if stats is None:
+            stats = DeliveryStats(news_id, len(recipients))
+        queue = iter(recipients)
+
+        async def worker():
+            # Umumiy iterator - har bir worker keyingi recipientni oladi
+            for recipient in queue:
+                try:
+                    ok = await send(recipient)
+                except Exception as e:
+                    print(f"❌ Yuborishda xato ({recipient}): {e}")
+                    ok = False
+                if ok is None:
+                    stats.retried += 1
+                elif ok:
+                    stats.sent += 1
+                else:
+                    stats.failed += 1
+
+        workers = min(self.concurrency, len(recipients))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        stats.finished_at = time.monotonic()
+        return stats
@@ -0,0 +1,283 @@
+"""
+Kanal postlaridagi media ni Bot API file_id ga aylantirish
+
+Media kanal (Telethon) dan yuklab olinadi, saqlash chatiga (MEDIA_STORAGE_CHAT_ID,
+faqat shu maqsad uchun yopiq kanal) yuboriladi va qaytgan file_id keyin
+barcha userlarga ishlatiladi. Saqlash chati sozlanmagan bo'lsa - eski usul:
+admin ga jim (silent) yuborib, keyin o'chirish.
+
+Yuklash alohida workerda (MEDIA_UPLOAD_CONCURRENCY tadan ko'p emas) -
+pipeline MEDIA_HARVEST_WAIT soniyadan ortiq kutmaydi: ulgurmasa yangilik
+forward orqali yuboriladi, file_id esa keshga keyingi safar uchun tushadi.
+
+Hajmga qarab:
+- <= MEDIA_MEMORY_MAX_BYTES: xotirada (BytesIO)
+- <= MEDIA_DOWNLOAD_MAX_BYTES: vaqtinchalik faylga bo'laklab yoziladi va
+  fayldan oqim (stream) bilan yuklanadi - butun video RAM ga olinmaydi
+- kattaroq: umuman yuklab olinmaydi, userlarga forward qilinadi
+
+Kesh: bir xil rasm/video bir nechta kanalda qayta joylanadi. Telethon
+media identifikatori (id + access_hash) -> file_id media_cache jadvalida
+saqlanadi, takroriy media yuklanmaydi ham, yuborilmaydi ham.
+"""
+import os
+import asyncio
+import logging
+import tempfile
+import traceback
+from datetime import datetime
+from io import BytesIO
+from typing import Optional
+from sqlalchemy import select, update, func
+from telegram import InputFile
+from db.database import async_session
+from db.models import User, MediaCache
+from config import (
+    ADMIN_USERNAME, MEDIA_MEMORY_MAX_BYTES, MEDIA_DOWNLOAD_MAX_BYTES,
+    MEDIA_TEMP_DIR, MEDIA_UPLOAD_TIMEOUT, MEDIA_STORAGE_CHAT_ID,
+    MEDIA_UPLOAD_CONCURRENCY, MEDIA_HARVEST_WAIT
+)
+
+logger = logging.getLogger(__name__)
+
+TECH_CAPTION = "🔧 [TEXNIK] File ID olish uchun"
+
+# Ishga tushgandan beri kesh statistikasi (admin /delivery)
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def get_media_key(message) -> Optional[str]:
+    """Telethon media identifikatori: 'photo:<id>:<access_hash>' yoki 'document:<id>:<access_hash>'"""
+    media = message.photo or message.document
+    if media is None:
+        return None
+    kind = 'photo' if message.photo else 'document'
+    return f"{kind}:{media.id}:{media.access_hash}"
+
+
+async def get_cached_file_id(media_key: str) -> Optional[str]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(MediaCache.id, MediaCache.file_id).where(MediaCache.media_key == media_key)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        await session.execute(
+            update(MediaCache)
+            .where(MediaCache.id == row.id)
+            .values(hits=MediaCache.hits + 1, last_used_at=datetime.utcnow())
+        )
+        await session.commit()
+        return row.file_id
+
+
+async def store_file_id(media_key: str, media_type: str, file_id: str, size: Optional[int]):
+    async with async_session() as session:
+        existing = await session.scalar(
+            select(MediaCache).where(MediaCache.media_key == media_key)
+        )
+        if existing:
+            # Parallel yuklangan bo'lsa - oxirgisi qoladi
+            existing.file_id = file_id
+        else:
+            session.add(MediaCache(
+                media_key=media_key, media_type=media_type, file_id=file_id, size=size
+            ))
+        await session.commit()
+
+
+async def get_cache_report() -> dict:
+    """Kesh holati: {'hits', 'misses', 'entries'}"""
+    async with async_session() as session:
+        entries = await session.scalar(select(func.count()).select_from(MediaCache))
+    return {**cache_stats, 'entries': entries or 0}
+
+
+def get_media_size(message) -> Optional[int]:
+    """Telethon message dagi media hajmi (noma'lum bo'lsa None)"""
+    try:
+        return message.file.size if message.file else None
+    except Exception:
+        return None
+
+
+class MediaHarvester:
+    """Media -> file_id (kesh, saqlash chati, cheklangan parallel yuklash)"""
+
+    def __init__(self, bot, concurrency: int = MEDIA_UPLOAD_CONCURRENCY, wait: float = MEDIA_HARVEST_WAIT):
+        self.bot = bot
+        self.wait = wait
+        self.chat_id = None
+        self.dedicated = False  # True - saqlash chati (xabarlar o'chirilmaydi)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._inflight = {}  # media_key -> asyncio.Task (bir xil media ikki marta yuklanmaydi)
+        self._background = set()  # Kutish tugagan, lekin hali yuklanayotgan tasklar
+
+    async def start(self):
+        """Saqlash chatini bir marta aniqlash (ishga tushganda)"""
+        if MEDIA_STORAGE_CHAT_ID:
+            try:
+                chat = await self.bot.app.bot.get_chat(MEDIA_STORAGE_CHAT_ID)
+                self.chat_id = chat.id
+                self.dedicated = True
+                print(f"✅ Media saqlash chati: {chat.title or chat.id}")
+                return
+            except Exception as e:
+                print(f"⚠️ Media saqlash chati ({MEDIA_STORAGE_CHAT_ID}) topilmadi: {e}")
+
+        async with async_session() as session:
+            result = await session.execute(
+                select(User.telegram_id).where(User.username == ADMIN_USERNAME)
+            )
+            self.chat_id = result.scalar_one_or_none()
+        if self.chat_id:
+            print(f"ℹ️ Media admin orqali olinadi (MEDIA_STORAGE_CHAT_ID sozlanmagan)")
+        else:
+            print(f"❌ Media uchun chat yo'q - admin user topilmadi (username: {ADMIN_USERNAME})")
+
+    async def acquire(self, media: dict) -> Optional[str]:
+        """
+        Media uchun Bot API file_id olish
+
+        Args:
+            media: {'type': 'photo'/'video', 'message': telethon message}
+
+        Returns:
+            file_id yoki None (juda katta, xato yoki MEDIA_HARVEST_WAIT dan uzoq -
+            forward orqali yuboriladi)
+        """
+        media_type = media['type']
+        message = media['message']
+        size = get_media_size(message)
+
+        media_key = get_media_key(message)
+        if media_key:
+            file_id = await get_cached_file_id(media_key)
+            if file_id:
+                cache_stats['hits'] += 1
+                print(f"   ♻️ {media_type} keshdan olindi (yuklab olinmadi)")
+                return file_id
+            cache_stats['misses'] += 1
+
+        if size and size > MEDIA_DOWNLOAD_MAX_BYTES:
+            print(f"   📹 {media_type} juda katta ({size / (1024*1024):.1f} MB) - yuklab olinmaydi, forward qilinadi")
+            return None
+
+        if not self.chat_id:
+            return None
+
+        task = self._inflight.get(media_key) if media_key else None
+        if task is None:
+            task = asyncio.create_task(self._harvest(media_key, media_type, message, size))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            if media_key:
+                self._inflight[media_key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(media_key, None))
+
+        try:
+            # shield - kutish tugasa ham yuklash fonda davom etadi (keshga tushadi)
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self.wait)
+        except asyncio.TimeoutError:
+            print(f"   ⏱️ {media_type} {self.wait:.0f} s da tayyor bo'lmadi - forward qilinadi, yuklash fonda davom etadi")
+            return None
+
+    async def _harvest(self, media_key: Optional[str], media_type: str, message, size: Optional[int]) -> Optional[str]:
+        async with self._slots:
+            if size is not None and size <= MEDIA_MEMORY_MAX_BYTES:
+                file_id = await self._acquire_in_memory(media_type, message)
+            else:
+                file_id = await self._acquire_spooled(media_type, message, size)
+        if file_id and media_key:
+            await store_file_id(media_key, media_type, file_id, size)
+        return file_id
+
+    async def _acquire_in_memory(self, media_type: str, message) -> Optional[str]:
+        """Kichik media - xotirada"""
+        try:
+            media_bytes = BytesIO()
+            await message.download_media(media_bytes)
+            media_bytes.seek(0)
+        except Exception as e:
+            print(f"   ❌ Media download xato: {e}")
+            traceback.print_exc()
+            return None
+
+        size = len(media_bytes.getbuffer())
+        print(f"   📥 {media_type} download qilindi: {size / 1024:.0f} KB (xotirada)")
+        logger.info(f"{media_type} download qilindi: {size} bytes")
+        return await self._upload(media_type, media_bytes)
+
+    async def _acquire_spooled(self, media_type: str, message, size: Optional[int]) -> Optional[str]:
+        """Katta media - vaqtinchalik faylga yozish va fayldan yuklash"""
+        suffix = '.jpg' if media_type == 'photo' else '.mp4'
+        fd, path = tempfile.mkstemp(prefix='news_media_', suffix=suffix, dir=MEDIA_TEMP_DIR)
+        os.close(fd)
+        try:
+            if size:
+                print(f"   📥 {media_type} yuklab olinmoqda ({size / (1024*1024):.1f} MB, faylga)...")
+            # Telethon fayl yo'liga bo'laklab yozadi
+            await message.download_media(file=path)
+            size = os.path.getsize(path)
+            logger.info(f"{media_type} download qilindi: {size} bytes (faylga)")
+
+            if size > MEDIA_DOWNLOAD_MAX_BYTES:
+                # Hajm oldindan noma'lum bo'lgan - Bot API baribir qabul qilmaydi
+                print(f"   📹 {media_type} juda katta ({size / (1024*1024):.1f} MB) - forward qilinadi")
+                return None
+
+            with open(path, 'rb') as f:
+                # read_file_handle=False - fayl so'rov paytida oqim bilan o'qiladi
+                upload = InputFile(f, filename=os.path.basename(path), read_file_handle=False)
+                return await self._upload(media_type, upload)
+        except Exception as e:
+            print(f"   ❌ Media download xato: {e}")
+            traceback.print_exc()
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def _upload(self, media_type: str, upload) -> Optional[str]:
+        """Saqlash chatiga (yoki admin ga) jim yuborish va file_id olish"""
+        bot = self.bot.app.bot
+        try:
+            if media_type == 'photo':
+                sent = await bot.send_photo(
+                    chat_id=self.chat_id,
+                    photo=upload,
+                    caption=TECH_CAPTION,
+                    disable_notification=True,
+                    write_timeout=MEDIA_UPLOAD_TIMEOUT
+                )
+                file_id = sent.photo[-1].file_id if sent.photo else None
+            else:
+                sent = await bot.send_video(
+                    chat_id=self.chat_id,
+                    video=upload,
+                    caption=TECH_CAPTION,
+                    disable_notification=True,
+                    write_timeout=MEDIA_UPLOAD_TIMEOUT
+                )
+                file_id = sent.video.file_id if sent.video else None
+        except Exception as e:
+            print(f"   ❌ Media yuklashda xato: {e}")
+            traceback.print_exc()
+            return None
+
+        if not file_id:
+            print(f"   ❌ sent.{media_type} bo'sh!")
+            return None
+        print(f"   ✅ {media_type} file_id olindi: {file_id[:30]}...")
+
+        if not self.dedicated:
+            # Admin ga yuborilgan xabarni o'chirish (tozalash)
+            try:
+                await bot.delete_message(chat_id=self.chat_id, message_id=sent.message_id)
+            except Exception:
+                pass
+
+        return file_id
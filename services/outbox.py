@@ -0,0 +1,526 @@
+"""
+Yuborish navbati (outbox) - database'da saqlanadi
+
+on_new_news yangilik uchun deliveries jadvaliga yozuvlar qo'shadi,
+OutboxWorker ularni navbat bilan yuboradi. Jarayon qayta ishga tushsa,
+yuborilmagan yozuvlar davom ettiriladi.
+
+Holatlar:
+- pending: yuborilishi kerak (next_at dan keyin)
+- sending: worker oldi (yuborilmoqda)
+- done: yuborildi
+- failed: yuborib bo'lmadi (yoki urinishlar tugadi)
+- unknown: jarayon yuborish paytida to'xtagan - dublikat bo'lmasligi
+  uchun qayta yuborilmaydi
+
+Qayta urinish:
+- RetryAfter (flood control): retry_after dan keyin, urinish hisoblanmaydi
+- TimedOut / NetworkError: exponential backoff, OUTBOX_MAX_ATTEMPTS gacha
+
+Navbat yo'laklari (priority lanes):
+- 0 breaking: shoshilinch yangiliklar - boshqalardan oldin
+- 1 normal: oddiy yangiliklar
+- 2 backfill: ishga tushgandagi eski yangiliklar
+Yuqori prioritetli yozuv qo'shilsa, past prioritetli batch to'xtatiladi
+va qolgan yozuvlari navbatga qaytariladi.
+
+Sharding (DELIVERY_WORKER_PROCESSES > 0): har bir worker jarayoni faqat
+telegram_id % shards == shard bo'lgan yozuvlarni oladi - bitta chat
+doim bitta jarayonda, shuning uchun chat limiti buzilmaydi.
+
+Bot bloklangan / chat topilmadi: yozuv 'failed', user reachable=False
+(keyingi fan-outlarga kirmaydi) va uning navbatdagi boshqa yozuvlari ham
+bekor qilinadi.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import async_session
+from db.models import Delivery, News
+from telegram.error import RetryAfter
+from services.dispatcher import NewsDispatcher, DeliveryStats
+from services.retry import is_transient_error, is_unreachable_error, retry_after_seconds, backoff_delay
+from services.user_matcher import mark_unreachable
+from config import OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL, OUTBOX_RETENTION_DAYS, OUTBOX_MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+# Navbat yo'laklari (kichik raqam - yuqori prioritet)
+PRIORITY_BREAKING = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKFILL = 2
+
+LANE_NAMES = {
+    PRIORITY_BREAKING: 'breaking',
+    PRIORITY_NORMAL: 'normal',
+    PRIORITY_BACKFILL: 'backfill',
+}
+
+
+class LaneMetrics:
+    """Bitta yo'lak uchun kechikish (navbatga qo'shilgandan yuborilgungacha) statistikasi"""
+
+    def __init__(self, window: int = 1000):
+        self.sent = 0
+        self.failed = 0
+        self.preempted = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._recent = deque(maxlen=window)  # Oxirgi kechikishlar (percentile uchun)
+
+    def record(self, latency: float):
+        self.sent += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self._recent.append(latency)
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.sent if self.sent else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self._recent:
+            return 0.0
+        values = sorted(self._recent)
+        index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+        return values[index]
+
+
+async def enqueue_deliveries(session: AsyncSession, news_id: int, recipients, priority: int = PRIORITY_NORMAL) -> int:
+    """
+    Yangilik uchun yuborish navbatiga yozuvlar qo'shish
+
+    Args:
+        session: Database session
+        news_id: News.id
+        recipients: [Recipient(telegram_id, language), ...]
+        priority: PRIORITY_BREAKING | PRIORITY_NORMAL | PRIORITY_BACKFILL
+
+    Returns:
+        Qo'shilgan yozuvlar soni
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for recipient in recipients:
+        rows[recipient.telegram_id] = {
+            'news_id': news_id,
+            'telegram_id': recipient.telegram_id,
+            'lang': recipient.language,
+            'priority': priority,
+            'status': 'pending',
+            'attempt': 0,
+            'next_at': now,
+            'created_at': now,
+        }
+
+    if rows:
+        await session.execute(insert(Delivery), list(rows.values()))
+        await session.commit()
+    return len(rows)
+
+
+def get_news_media(news: News):
+    """
+    News yozuvidan yuborish uchun media ma'lumotlarini olish
+
+    Returns:
+        (media, forward_info)
+        - media_group bo'lsa - album (send_media_group)
+        - media_file_id bo'lsa - file_id orqali yuborish
+        - media_file_id yo'q lekin media_type bor - forward qilish (katta videolar)
+    """
+    if news.media_group:
+        items = json.loads(news.media_group)
+        if len(items) > 1:
+            return {'type': 'album', 'items': items}, None
+        return items[0], None
+    if news.media_file_id:
+        return {'type': news.media_type, 'file_id': news.media_file_id}, None
+    if news.media_type:
+        return None, {'channel': news.channel_username, 'message_id': news.channel_message_id}
+    return None, None
+
+
+class OutboxWorker:
+    """Navbatdagi yozuvlarni yuboradigan worker"""
+
+    def __init__(self, bot, dispatcher: NewsDispatcher, batch_size: int = OUTBOX_BATCH_SIZE, shard=None):
+        self.bot = bot
+        self.dispatcher = dispatcher
+        # Bir martada parallel yuboriladiganidan ko'p olinmaydi - jarayon to'satdan
+        # to'xtasa (crash, os.execv) 'sending' da qolib ketadigan yozuvlar shu bilan cheklanadi
+        self.batch_size = min(batch_size, dispatcher.concurrency)
+        self.shard = shard  # (index, count) yoki None - barcha yozuvlar
+        self._wakeup = asyncio.Event()
+        self._renders = {}  # news_id -> {'renders', 'media', 'forward_info'}
+        self._stats = {}  # news_id -> DeliveryStats
+        self._claimed = set()  # Olingan, lekin hali yuborilmagan delivery id lar
+        self._waiting_priority = None  # Navbatda kutayotgan eng yuqori prioritet
+        self.lanes = {priority: LaneMetrics() for priority in LANE_NAMES}
+
+    def notify(self, priority: int = PRIORITY_NORMAL):
+        """Yangi yozuvlar qo'shildi - workerni uyg'otish (va kerak bo'lsa batchni to'xtatish)"""
+        if self._waiting_priority is None or priority < self._waiting_priority:
+            self._waiting_priority = priority
+        self._wakeup.set()
+
+    def _own(self, query):
+        """So'rovni shu worker shardi bilan cheklash"""
+        if self.shard is None:
+            return query
+        index, count = self.shard
+        return query.where(Delivery.telegram_id % count == index)
+
+    async def prime(self, news_id: int, languages: set):
+        """Yangilikni yuborishdan oldin tayyorlab qo'yish (pipeline render bosqichi)"""
+        await self._prepare(news_id, languages)
+
+    def limiter_status(self) -> dict:
+        """Rate limiter holati (admin uchun)"""
+        limiter = self.bot.rate_limiter
+        return {
+            'rate': limiter.rate,
+            'base_rate': limiter.base_rate,
+            'flood_count': limiter.flood_count,
+        }
+
+    async def stop(self):
+        # Shu jarayonning o'zida ishlaydi - qayta ishga tushganda recover()
+        # 'sending' da qolgan yozuvlarni navbatga qaytaradi
+        return None
+
+    def _should_yield(self, priority: int) -> bool:
+        """Yuqoriroq prioritetli yozuvlar navbatda kutmoqda"""
+        return self._waiting_priority is not None and self._waiting_priority < priority
+
+    async def lane_report(self) -> list:
+        """
+        Har bir yo'lak bo'yicha holat
+
+        Returns:
+            [{'lane', 'pending', 'sent', 'failed', 'preempted', 'avg', 'p95', 'max'}, ...]
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                select(Delivery.priority, func.count())
+                .where(Delivery.status == 'pending')
+                .group_by(Delivery.priority)
+            )
+            pending = dict(result.all())
+
+        report = []
+        for priority, name in LANE_NAMES.items():
+            metrics = self.lanes[priority]
+            report.append({
+                'lane': name,
+                'pending': pending.get(priority, 0),
+                'sent': metrics.sent,
+                'failed': metrics.failed,
+                'preempted': metrics.preempted,
+                'avg': metrics.avg_latency,
+                'p95': metrics.percentile(95),
+                'max': metrics.max_latency,
+            })
+        return report
+
+    async def run(self):
+        """Navbatni doimiy ravishda bo'shatish"""
+        await self.recover()
+
+        try:
+            while True:
+                processed = await self.process_batch()
+                if not processed:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            # To'xtatilganda - hali yuborilmagan yozuvlarni navbatga qaytarish
+            await self._release_claimed()
+
+    async def recover(self):
+        """Ishga tushganda: to'xtab qolgan yozuvlarni tartibga solish va eskilarini tozalash"""
+        async with async_session() as session:
+            result = await session.execute(
+                self._own(update(Delivery))
+                .where(Delivery.status == 'sending')
+                .values(status='unknown')
+            )
+            if result.rowcount:
+                print(f"⚠️ Outbox: {result.rowcount} ta yozuv holati noma'lum (qayta yuborilmaydi)")
+
+            cutoff = datetime.utcnow() - timedelta(days=OUTBOX_RETENTION_DAYS)
+            await session.execute(
+                self._own(delete(Delivery))
+                .where(Delivery.status.in_(['done', 'failed', 'unknown']))
+                .where(Delivery.created_at < cutoff)
+            )
+            await session.commit()
+
+            pending = await session.scalar(
+                self._own(select(func.count()).select_from(Delivery))
+                .where(Delivery.status == 'pending')
+            )
+        if pending:
+            print(f"🔄 Outbox: {pending} ta yuborilmagan yozuv davom ettiriladi")
+
+    async def _claim_batch(self) -> list:
+        """
+        Navbatdan yozuvlarni olish (avval yuqori prioritet) va 'sending' deb belgilash
+
+        Bitta UPDATE ... RETURNING - faqat shu so'rov o'zgartirgan yozuvlar
+        qaytadi, ikkita worker (masalan, execv dan keyin qolib ketgan eski
+        jarayon) bir yozuvni ikki marta ololmaydi.
+        """
+        # So'rovdan OLDIN - so'rov paytida kelgan notify yo'qolmasligi uchun
+        self._waiting_priority = None
+        candidates = (
+            self._own(select(Delivery.id))
+            .where(Delivery.status == 'pending')
+            .where(Delivery.next_at <= datetime.utcnow())
+            .order_by(Delivery.priority, Delivery.id)
+            .limit(self.batch_size)
+        )
+        async with async_session() as session:
+            result = await session.execute(
+                update(Delivery)
+                .where(Delivery.id.in_(candidates.scalar_subquery()))
+                .where(Delivery.status == 'pending')
+                .values(status='sending', attempt=Delivery.attempt + 1)
+                .returning(
+                    Delivery.id, Delivery.news_id, Delivery.telegram_id,
+                    Delivery.lang, Delivery.attempt, Delivery.priority,
+                    Delivery.created_at
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = sorted(result.all(), key=lambda row: (row.priority, row.id))
+            await session.commit()
+
+        self._claimed.update(row.id for row in rows)
+        return rows
+
+    async def process_batch(self) -> int:
+        """Bitta batch ni yuborish. Yuborilgan yozuvlar sonini qaytaradi"""
+        rows = await self._claim_batch()
+        if not rows:
+            return 0
+
+        by_news = {}
+        for row in rows:
+            by_news.setdefault(row.news_id, []).append(row)
+
+        for news_id, news_rows in by_news.items():
+            await self._deliver_news(news_id, news_rows)
+
+        return len(rows)
+
+    async def _deliver_news(self, news_id: int, rows: list):
+        """Bitta yangilikning yozuvlarini yuborish"""
+        if all(self._should_yield(row.priority) for row in rows):
+            # Tarjima qilmasdan navbatga qaytarish - breaking yangilik kutmoqda
+            for row in rows:
+                self._claimed.discard(row.id)
+                self.lanes.get(row.priority, self.lanes[PRIORITY_NORMAL]).preempted += 1
+            await self._reschedule([(row.id, datetime.utcnow(), False) for row in rows])
+            return
+
+        prepared = await self._prepare(news_id, {row.lang for row in rows})
+        if prepared is None:
+            # Yangilik o'chirilgan - yuborib bo'lmaydi
+            await self._mark([row.id for row in rows], 'failed')
+            await self._finalize(news_id)
+            return
+
+        renders = prepared['renders']
+
+        # Har bir yozuvning natijasi yuborish tugashi bilan yoziladi - jarayon
+        # to'xtasa, faqat ayni paytda yuborilayotganlar (DELIVERY_CONCURRENCY
+        # tagacha) 'sending' holatida qoladi
+        async def send(row):
+            self._claimed.discard(row.id)
+            lane = self.lanes.get(row.priority, self.lanes[PRIORITY_NORMAL])
+            if self._should_yield(row.priority):
+                # Breaking yangilik kutmoqda - bu yozuv navbatga qaytadi
+                lane.preempted += 1
+                await self._reschedule([(row.id, datetime.utcnow(), False)])
+                return None
+            rendered = renders[row.lang]
+            attempt = row.attempt  # _claim_batch oshirgan qiymat (RETURNING)
+            try:
+                sent = await self.bot.send_rendered_news(
+                    telegram_id=row.telegram_id,
+                    rendered=rendered,
+                    media=prepared['media'],
+                    forward_info=prepared['forward_info']
+                )
+            except Exception as e:
+                if isinstance(e, RetryAfter):
+                    # Flood control - rate_limiter allaqachon pauza qilgan
+                    delay = retry_after_seconds(e)
+                    await self._reschedule([(row.id, datetime.utcnow() + timedelta(seconds=delay), False)])
+                    return None
+                if is_transient_error(e) and attempt < OUTBOX_MAX_ATTEMPTS:
+                    delay = backoff_delay(attempt)
+                    print(f"   🔁 {row.telegram_id}: {e} - {delay:.0f} s dan keyin qayta ({attempt}/{OUTBOX_MAX_ATTEMPTS})")
+                    await self._reschedule([(row.id, datetime.utcnow() + timedelta(seconds=delay), True)])
+                    return None
+                if is_unreachable_error(e):
+                    print(f"🚫 User {row.telegram_id} yetib bo'lmaydi ({e}) - fan-out dan chiqarildi")
+                    await self._mark([row.id], 'failed')
+                    await self._drop_unreachable([row.telegram_id])
+                    lane.failed += 1
+                    return False
+                print(f"❌ Xatolik ({row.telegram_id}): {e}")
+                sent = None
+            if sent is not None:
+                await self._mark([row.id], 'done')
+                lane.record((datetime.utcnow() - row.created_at).total_seconds())
+            else:
+                await self._mark([row.id], 'failed')
+                lane.failed += 1
+            return sent is not None
+
+        stats = self._stats.get(news_id)
+        if stats is None:
+            stats = self._stats[news_id] = DeliveryStats(news_id, await self._count_total(news_id))
+
+        await self.dispatcher.dispatch(news_id, rows, send, stats=stats)
+        await self._finalize(news_id)
+
+    async def _prepare(self, news_id: int, languages: set):
+        """Yangilikni kerakli tillarda tayyorlash (keshlanadi)"""
+        prepared = self._renders.get(news_id)
+        if prepared is None:
+            async with async_session() as session:
+                news = await session.get(News, news_id)
+            if news is None:
+                return None
+            media, forward_info = get_news_media(news)
+            prepared = self._renders[news_id] = {
+                'news': news,
+                'renders': {},
+                'media': media,
+                'forward_info': forward_info,
+            }
+
+        missing = languages - prepared['renders'].keys()
+        if missing:
+            news = prepared['news']
+            prepared['renders'].update(
+                await self.bot.render_news(news.text, news.category, missing)
+            )
+        return prepared
+
+    async def _mark(self, ids: list, status: str):
+        if not ids:
+            return
+        values = {'status': status}
+        if status == 'done':
+            values['sent_at'] = datetime.utcnow()
+        async with async_session() as session:
+            await session.execute(update(Delivery).where(Delivery.id.in_(ids)).values(**values))
+            await session.commit()
+
+    async def _drop_unreachable(self, telegram_ids: list):
+        """Yetib bo'lmaydigan userlarni belgilash va ularning navbatini bekor qilish"""
+        if not telegram_ids:
+            return
+        async with async_session() as session:
+            await mark_unreachable(session, telegram_ids)
+            result = await session.execute(
+                select(Delivery.news_id).distinct()
+                .where(Delivery.telegram_id.in_(telegram_ids))
+                .where(Delivery.status == 'pending')
+            )
+            other_news_ids = result.scalars().all()
+            await session.execute(
+                update(Delivery)
+                .where(Delivery.telegram_id.in_(telegram_ids))
+                .where(Delivery.status == 'pending')
+                .values(status='failed')
+            )
+            await session.commit()
+
+        # Boshqa yangiliklarning oxirgi yozuvlari bekor qilingan bo'lishi mumkin
+        for news_id in other_news_ids:
+            await self._finalize(news_id)
+
+    async def _reschedule(self, retries: list):
+        """Yozuvlarni keyinroq qayta yuborish uchun navbatga qaytarish"""
+        if not retries:
+            return
+        async with async_session() as session:
+            for delivery_id, next_at, counts_as_attempt in retries:
+                values = {'status': 'pending', 'next_at': next_at}
+                if not counts_as_attempt:
+                    values['attempt'] = Delivery.attempt - 1
+                await session.execute(
+                    update(Delivery).where(Delivery.id == delivery_id).values(**values)
+                )
+            await session.commit()
+
+    async def _count_total(self, news_id: int) -> int:
+        """Yangilikning shu shardga tegishli yozuvlari soni (DeliveryStats.total)"""
+        async with async_session() as session:
+            return await session.scalar(
+                self._own(select(func.count()).select_from(Delivery)).where(Delivery.news_id == news_id)
+            )
+
+    async def _finalize(self, news_id: int):
+        """
+        Shu shardning yozuvlari tugagan bo'lsa - kesh va statistikani tozalash
+
+        Barcha shardlar tugagan bo'lsa (oxirgi shard) - sent_count ham yangilanadi.
+        """
+        def remaining_query():
+            return (
+                select(func.count()).select_from(Delivery)
+                .where(Delivery.news_id == news_id)
+                .where(Delivery.status.in_(['pending', 'sending']))
+            )
+
+        async with async_session() as session:
+            if await session.scalar(self._own(remaining_query())):
+                return
+
+            if self.shard is None or not await session.scalar(remaining_query()):
+                sent = await session.scalar(
+                    select(func.count()).select_from(Delivery)
+                    .where(Delivery.news_id == news_id)
+                    .where(Delivery.status == 'done')
+                )
+                await session.execute(
+                    update(News).where(News.id == news_id).values(sent_count=sent)
+                )
+                await session.commit()
+
+        self._renders.pop(news_id, None)
+        stats = self._stats.pop(news_id, None)
+        if stats:
+            print(f"   ✅ Yuborildi: {stats.summary()}")
+            logger.info(f"Fan-out tugadi: {stats.summary()}")
+
+    async def _release_claimed(self):
+        """Olingan, lekin yuborilmagan yozuvlarni 'pending' holatiga qaytarish"""
+        if not self._claimed:
+            return
+        ids = list(self._claimed)
+        self._claimed.clear()
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    update(Delivery)
+                    .where(Delivery.id.in_(ids))
+                    .where(Delivery.status == 'sending')
+                    .values(status='pending', attempt=Delivery.attempt - 1)
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"⚠️ Outbox: yozuvlarni qaytarishda xato: {e}")
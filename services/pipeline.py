@@ -0,0 +1,152 @@
+"""
+Yangiliklarni qayta ishlash pipeline'i (bosqichma-bosqich)
+
+ingest -> classify -> persist -> media -> render -> deliver
+
+Har bir bosqich oldida cheklangan (bounded) asyncio.Queue bor va uni
+o'zining workerlari bo'shatadi. Listener faqat navbatga qo'yadi - kanal
+bir vaqtda ko'p post tashlasa ham darhol qabul qilinadi. Keyingi bosqich
+navbati to'lsa, oldingi bosqich kutadi (back-pressure) va bu navbat
+chuqurligida ko'rinadi (admin /delivery).
+
+Bosqich handleri:
+- item qaytarsa - keyingi bosqichga o'tadi
+- None qaytarsa - item tashlab yuboriladi (masalan, o'zbekcha emas yoki duplicate)
+- xato bersa - on_error hal qiladi: kechikish qaytarsa item shu bosqichga
+  qayta qo'yiladi, None qaytarsa tashlab yuboriladi
+"""
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Optional
+
+
+class Stage:
+    """Bitta bosqich: handler + workerlar soni + kirish navbati"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Optional[Any]]],
+        workers: int = 1,
+        queue_size: int = 100
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.busy = 0
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retried = 0
+
+
+class NewsPipeline:
+    """
+    Bosqichlarni navbatlar orqali ulash
+
+    Args:
+        stages: [Stage, ...]
+        on_error: async (stage_name, item, error) -> qayta urinishgacha sekund
+            yoki None (item tashlab yuboriladi)
+    """
+
+    def __init__(
+        self,
+        stages: list,
+        on_error: Optional[Callable[[str, Any, Exception], Awaitable[Optional[float]]]] = None
+    ):
+        self.stages = stages
+        self.on_error = on_error
+        self._tasks = []
+        self._retries = set()  # Kechiktirilgan qayta urinishlar
+
+    async def submit(self, item):
+        """Yangi itemni birinchi bosqich navbatiga qo'yish (navbat to'lsa kutadi)"""
+        await self.stages[0].queue.put(item)
+
+    async def run(self):
+        """Barcha bosqich workerlarini ishga tushirish"""
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for _ in range(stage.workers):
+                self._tasks.append(asyncio.create_task(self._worker(stage, next_stage)))
+
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            for task in self._tasks + list(self._retries):
+                task.cancel()
+            self._tasks.clear()
+
+    async def _worker(self, stage: Stage, next_stage: Optional[Stage]):
+        while True:
+            item = await stage.queue.get()
+            stage.busy += 1
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                print(f"❌ Pipeline [{stage.name}] xato: {e}")
+                traceback.print_exc()
+                result = None
+                delay = await self._handle_error(stage, item, e)
+                if delay is None:
+                    stage.failed += 1
+                else:
+                    stage.retried += 1
+                    self._schedule_retry(stage, item, delay)
+            else:
+                if result is None:
+                    stage.dropped += 1
+                else:
+                    stage.processed += 1
+            finally:
+                stage.busy -= 1
+                stage.queue.task_done()
+
+            if result is not None and next_stage is not None:
+                # Keyingi navbat to'la bo'lsa - shu yerda kutiladi (back-pressure)
+                await next_stage.queue.put(result)
+
+    async def _handle_error(self, stage: Stage, item, error: Exception) -> Optional[float]:
+        """on_error natijasi (hook o'zi xato bersa - item tashlab yuboriladi)"""
+        if self.on_error is None:
+            return None
+        try:
+            return await self.on_error(stage.name, item, error)
+        except Exception as e:
+            print(f"❌ Pipeline [{stage.name}] on_error xato: {e}")
+            traceback.print_exc()
+            return None
+
+    def _schedule_retry(self, stage: Stage, item, delay: float):
+        """Itemni kechikish bilan shu bosqich navbatiga qaytarish (worker kutib qolmaydi)"""
+        async def requeue():
+            await asyncio.sleep(delay)
+            await stage.queue.put(item)
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    def depths(self) -> list:
+        """
+        Har bir bosqich holati
+
+        Returns:
+            [{'stage', 'queued', 'capacity', 'busy', 'workers', 'processed', 'dropped', 'failed', 'retried'}, ...]
+        """
+        return [
+            {
+                'stage': stage.name,
+                'queued': stage.queue.qsize(),
+                'capacity': stage.queue.maxsize,
+                'busy': stage.busy,
+                'workers': stage.workers,
+                'processed': stage.processed,
+                'dropped': stage.dropped,
+                'failed': stage.failed,
+                'retried': stage.retried,
+            }
+            for stage in self.stages
+        ]
@@ -0,0 +1,49 @@
+"""
+Telegram yuborish xatolarini tasniflash va qayta urinish vaqtini hisoblash
+"""
+from telegram.error import RetryAfter, NetworkError, BadRequest, Forbidden
+from config import OUTBOX_RETRY_BASE_DELAY, OUTBOX_RETRY_MAX_DELAY
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Vaqtinchalik xato (keyinroq qayta urinish mumkin)
+    
+    - RetryAfter: flood control
+    - TimedOut / NetworkError: tarmoq muammosi
+    BadRequest ham NetworkError dan meros oladi, lekin u qayta urinishda
+    ham xato bo'ladi.
+    """
+    if isinstance(error, RetryAfter):
+        return True
+    return isinstance(error, NetworkError) and not isinstance(error, BadRequest)
+
+
+def is_unreachable_error(error: Exception) -> bool:
+    """
+    Userga umuman yuborib bo'lmaydi (qayta urinish foydasiz)
+    
+    - Forbidden: bot bloklangan, akkaunt o'chirilgan
+    - BadRequest "Chat not found"
+    """
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and 'chat not found' in str(error).lower()
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter dan kutish vaqtini soniyalarda olish (int yoki timedelta)"""
+    retry_after = error.retry_after
+    if hasattr(retry_after, 'total_seconds'):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff: 1-urinish - BASE, 2 - BASE*2, 3 - BASE*4, ...
+    
+    Args:
+        attempt: Nechanchi urinish muvaffaqiyatsiz bo'ldi (1 dan boshlanadi)
+    """
+    return min(OUTBOX_RETRY_BASE_DELAY * 2 ** max(attempt - 1, 0), OUTBOX_RETRY_MAX_DELAY)
@@ -1,12 +1,16 @@
 """
 Yangilik matnlarini tarjima qilish xizmati
 Google Translate API (bepul) dan foydalanadi
+
+O'zbek lotin <-> o'zbek kirill tarmoqsiz (transliteratsiya) - tarmoqqa faqat
+haqiqiy tillararo tarjima (ru, en) uchun murojaat qilinadi.
 """
 import asyncio
 import urllib.parse
 import urllib.request
 import json
 from functools import lru_cache
+from processor.language_detector import detect_language_script
 
 # Til kodlarini mapping (bizning kodlar -> Google Translate kodlari)
 LANG_MAP = {
@@ -16,6 +20,28 @@ LANG_MAP = {
     'en': 'en'            # Ingliz
 }
 
+# Bitta til, ikki yozuv - bir-biriga transliteratsiya qilinadi
+UZBEK_SCRIPTS = ('uz', 'uz_cyrl')
+
+def source_language(text: str) -> str:
+    """
+    Matn tilini tarmoqsiz aniqlash (processor.language_detector)
+    
+    Returns:
+        'uz' (lotin), 'uz_cyrl' (kirill), 'ru', 'en' yoki 'auto' (aniqlanmadi)
+    """
+    language, script = detect_language_script(text)
+    if language == 'uzbek':
+        return 'uz_cyrl' if script == 'cyrillic' else 'uz'
+    return {'russian': 'ru', 'english': 'en'}.get(language, 'auto')
+
+def transliterate(text: str, dest_lang: str) -> str:
+    """O'zbek matnini dest_lang yozuviga o'girish (uz - lotin, uz_cyrl - kirill)"""
+    from utils.cyrillic_converter import latin_to_cyrillic, cyrillic_to_latin
+    if dest_lang == 'uz_cyrl':
+        return latin_to_cyrillic(text)
+    return cyrillic_to_latin(text)
+
 @lru_cache(maxsize=1000)
 def _translate_sync(text: str, dest_lang: str) -> str:
     """
@@ -63,7 +89,7 @@ async def translate_text(text: str, dest_lang: str, source_lang: str = 'auto') -
     Args:
         text: Tarjima qilinadigan matn
         dest_lang: Maqsad til kodi (uz, uz_cyrl, ru, en)
-        source_lang: Manba til kodi (auto - avtomatik aniqlash)
+        source_lang: Manba til kodi (auto - source_language() bilan aniqlanadi)
     
     Returns:
         Tarjima qilingan matn
@@ -72,10 +98,17 @@ async def translate_text(text: str, dest_lang: str, source_lang: str = 'auto') -
     if not text or len(text.strip()) < 3:
         return text
     
+    if source_lang == 'auto':
+        source_lang = source_language(text)
+    
     # Agar til bir xil bo'lsa, tarjima qilmaslik
     if dest_lang == source_lang:
         return text
     
+    # O'zbek lotin <-> kirill - tarmoqsiz
+    if source_lang in UZBEK_SCRIPTS and dest_lang in UZBEK_SCRIPTS:
+        return transliterate(text, dest_lang)
+    
     try:
         # Sinxron funksiyani asinxron bajarish
         loop = asyncio.get_event_loop()
@@ -88,9 +121,9 @@ async def translate_text(text: str, dest_lang: str, source_lang: str = 'auto') -
         
         # Agar uz_cyrl bo'lsa va matn lotin da bo'lsa, kirill ga o'girish
         if dest_lang == 'uz_cyrl':
-            from utils.cyrillic_converter import latin_to_cyrillic, is_cyrillic
+            from utils.cyrillic_converter import is_cyrillic
             if not is_cyrillic(translated):
-                translated = latin_to_cyrillic(translated)
+                translated = transliterate(translated, dest_lang)
         
         return translated
     except Exception as e:
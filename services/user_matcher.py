@@ -1,39 +1,84 @@
-from sqlalchemy import select
+from collections import namedtuple
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.models import User, UserInterest
 from datetime import datetime
 
+# Fan-out uchun yengil yozuv (to'liq User obyekti o'rniga)
+Recipient = namedtuple('Recipient', ['telegram_id', 'language'])
+
+def _is_active(now: datetime):
+    """Trial yoki subscription aktiv va bot bloklanmagan userlar sharti"""
+    return ((User.trial_end > now) | (User.subscription_end > now)) & User.reachable.is_(True)
+
+def _to_recipients(rows) -> list:
+    return [Recipient(telegram_id, language or 'uz') for telegram_id, language in rows]
+
 async def get_matching_users(session: AsyncSession, category: str, news_text: str = "", is_breaking: bool = False) -> list:
     """
-    Berilgan kategoriyaga qiziqadigan va aktiv userlarni topish
+    Berilgan kategoriyaga qiziqadigan va aktiv userlarni topish (bitta so'rov)
     
     Args:
         session: Database session
         category: Yangilik kategoriyasi
         news_text: Yangilik matni (ishlatilmaydi)
         is_breaking: Breaking news yoki yo'q (ishlatilmaydi)
+    
+    Returns:
+        [Recipient(telegram_id, language), ...]
     """
-    # Trial yoki subscription aktiv bo'lgan userlar
-    query = select(User).join(UserInterest).where(
+    # Trial yoki subscription aktiv bo'lgan userlar (24/7)
+    query = select(User.telegram_id, User.language).join(UserInterest).where(
         UserInterest.category == category,
-        (User.trial_end > datetime.utcnow()) | (User.subscription_end > datetime.utcnow())
-    )
+        _is_active(datetime.utcnow())
+    ).distinct()
     
     result = await session.execute(query)
-    users = result.scalars().all()
-    
-    matching_user_ids = []
+    return _to_recipients(result.all())
+
+async def mark_unreachable(session: AsyncSession, telegram_ids) -> int:
+    """
+    Botni bloklagan / o'chirilgan userlarni fan-out dan chiqarish
     
-    for user in users:
-        # Trial yoki subscription tekshiruvi
-        has_trial = user.trial_end and user.trial_end > datetime.utcnow()
-        has_subscription = user.subscription_end and user.subscription_end > datetime.utcnow()
-        
-        if not has_trial and not has_subscription:
-            # Trial ham, subscription ham tugagan
-            continue
-        
-        # Barcha aktiv userlar uchun yangilik yuborish (24/7)
-        matching_user_ids.append(user.telegram_id)
+    User botga qayta yozsa mark_reachable bilan qaytariladi.
+    """
+    telegram_ids = list(telegram_ids)
+    if not telegram_ids:
+        return 0
+    result = await session.execute(
+        update(User)
+        .where(User.telegram_id.in_(telegram_ids))
+        .where(User.reachable.is_(True))
+        .values(reachable=False, unreachable_since=datetime.utcnow())
+    )
+    await session.commit()
+    return result.rowcount
+
+async def mark_reachable(session: AsyncSession, telegram_id: int) -> bool:
+    """User botga qayta murojaat qildi - yana yangiliklar yuboriladi"""
+    result = await session.execute(
+        update(User)
+        .where(User.telegram_id == telegram_id)
+        .where(User.reachable.is_(False))
+        .values(reachable=True, unreachable_since=None)
+    )
+    await session.commit()
+    return result.rowcount > 0
+
+async def is_reachable(session: AsyncSession, telegram_id: int):
+    """User.reachable qiymati (None - bunday user yo'q)"""
+    return await session.scalar(
+        select(User.reachable).where(User.telegram_id == telegram_id)
+    )
+
+async def get_active_recipients(session: AsyncSession) -> list:
+    """
+    Barcha aktiv userlar (umumiy yangiliklar uchun)
     
-    return matching_user_ids
+    Returns:
+        [Recipient(telegram_id, language), ...]
+    """
+    result = await session.execute(
+        select(User.telegram_id, User.language).where(_is_active(datetime.utcnow()))
+    )
+    return _to_recipients(result.all())
@@ -0,0 +1,62 @@
+"""
+🧪 TEST SUITE FOR BATCH CLASSIFICATION
+classify_batch / analyze_batch must give the same result as
+analyze_news for every post, with NumPy and with the pure Python fallback
+"""
+
+import pytest
+
+import config
+from processor import classifier
+
+
+TEXTS = [
+    "O'zbekiston terma jamoasi futbol bo'yicha Osiyo chempionatida g'alaba qozondi",
+    "Prezident farmon imzoladi, parlament yangi qonunni qabul qildi",
+    "Markaziy bank dollar kursini e'lon qildi, inflyatsiya va narx oshdi",
+    "Ertaga Toshkentda havo harorati 30 gradusgacha ko'tariladi, yomg'ir kutilmoqda",
+    "Yangi smartfon taqdim etildi: sun'iy intellekt va internet tezligi oshdi",
+    "Shifokorlar gripp virusi va kasallik haqida ogohlantirdi, vaksina shifoxonada",
+    "AQSh va Xitoy o'rtasidagi muzokaralar Yevropa davlatlari e'tiborida",
+    "Toshkent metrosida yangi bekat ochildi, avtobus yo'nalishlari o'zgardi",
+    "Пул ва доллар курси ҳақида янгилик: нарх ошди",
+    "Futbol klubi prezidenti saylov va parlament haqida gapirdi",  # tie - priority order
+    "Sport musobaqasi kuchli shamol va qor tufayli ertaga ko'chirildi",  # weather mixed with sport
+    "Prognoz: havo ochiq, qor yog'maydi",
+    "2024 2025 12.5 100 200 300 natijalar e'lon qilindi",  # mostly digits
+    "Bugun shahar markazida " + "odamlar ko'p yig'ildi va suhbatlashdi. " * 15,  # long text
+    "salom",  # too short
+    "",
+    None,
+]
+
+
+@pytest.fixture(autouse=True)
+def keyword_only(monkeypatch):
+    """No AI analyzer and no local model - keyword rules only"""
+    monkeypatch.setattr(config, 'OPENAI_API_KEY', None)
+    monkeypatch.setattr(classifier, 'get_model', lambda: None)
+
+
+def expected_results() -> list:
+    return [classifier.analyze_news(text, verbose=False) for text in TEXTS]
+
+
+def test_analyze_batch_with_numpy():
+    pytest.importorskip('numpy')
+    assert classifier._load_numpy() is not None
+    assert classifier.analyze_batch(TEXTS) == expected_results()
+
+
+def test_analyze_batch_without_numpy(monkeypatch):
+    monkeypatch.setattr(classifier, '_load_numpy', lambda: None)
+    assert classifier.analyze_batch(TEXTS) == expected_results()
+
+
+def test_classify_batch_matches_classify_news():
+    assert classifier.classify_batch(TEXTS) == [classifier.classify_news(text) for text in TEXTS]
+
+
+def test_classify_batch_empty():
+    assert classifier.classify_batch([]) == []
+    assert classifier.classify_batch(['', 'qisqa']) == [None, None]
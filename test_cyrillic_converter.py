@@ -0,0 +1,121 @@
+"""
+🧪 TEST SUITE FOR LATIN <-> CYRILLIC TRANSLITERATION
+Checks Transliterator (longest match, context rules, uppercase words, word
+cache) against expected conversions and the previous str.replace version
+"""
+
+import re
+
+from utils.cyrillic_converter import (
+    LATIN_TO_CYRILLIC,
+    Transliterator,
+    cyrillic_to_latin,
+    latin_to_cyrillic,
+    normalize_uz,
+)
+
+
+LATIN_CASES = [
+    # (input, expected_output)
+    ("Toshkent shahrida", 'Тошкент шаҳрида'),
+    ("O'zbekiston", 'Ўзбекистон'),
+    ("Oʻzbekiston gʻalaba", 'Ўзбекистон ғалаба'),
+    ("o‘zbek g’alaba o`rta", 'ўзбек ғалаба ўрта'),
+    ("yo'l yoʻlovchi Yo'l YO'L", 'йўл йўловчи Йўл ЙЎЛ'),
+    ("yangilik yozuv yuk", 'янгилик ёзув юк'),
+    ("SHAHAR CHEMPIONATI O'ZBEKISTON G'ALABA", 'ШАҲАР ЧЕМПИОНАТИ ЎЗБЕКИСТОН ҒАЛАБА'),
+    ("Shahar Choy Sh", 'Шаҳар Чой Ш'),
+    ("@kunuz 2025-yil", '@кунуз 2025-йил'),
+    ("  ikki  bo'sh  joy ", '  икки  бўш  жой '),
+]
+
+CYRILLIC_CASES = [
+    ('Ўзбекистон ғалаба', "O'zbekiston g'alaba"),
+    ('Тошкент шаҳрида', 'Toshkent shahrida'),
+    ('Европа поезд объект подъезд', "Yevropa poyezd ob'yekt pod'yezd"),
+    ('етти ер 2ер', 'yetti yer 2yer'),
+    ('ЎЗБЕКИСТОН ШАҲАР ЕР', "O'ZBEKISTON SHAHAR YER"),
+    ('Ёшлар янги ёзув юк', 'Yoshlar yangi yozuv yuk'),
+    ('Цех Щука', 'Tsex Shuka'),
+]
+
+# Words the previous version got wrong and that were fixed since
+# ("yo'l", apostrophe variants; uppercase words are skipped separately)
+_KNOWN_FIX = re.compile(r"[yY][oO][ʻ'ʼ‘’`]|[oOgG][ʼ‘’`]")
+
+LEGACY_TEXTS = [
+    "Prezident Shavkat Mirziyoyev Toshkent viloyatida yangi korxonalar ochilishida ishtirok etdi.",
+    "Markaziy bank qayta moliyalash stavkasini o'zgarishsiz qoldirdi, inflyatsiya pasaymoqda.",
+    "Futbol bo'yicha O'zbekiston terma jamoasi chempionatda g'alaba qozondi.",
+    "Ertaga Samarqand va Buxoroda yomg'ir yog'ishi kutilmoqda, harorat 18 gradusgacha.",
+    "Yoshlar uchun yangi dasturlash kurslari, yuzlab o'quvchilar ro'yxatdan o'tdi. NATO SHAHAR",
+]
+
+
+def legacy_latin_to_cyrillic(text: str) -> str:
+    """Previous version: sort on every call + ~60 sequential str.replace"""
+    result = text
+    for latin, cyrillic in sorted(LATIN_TO_CYRILLIC.items(), key=lambda x: len(x[0]), reverse=True):
+        if len(latin) > 1:
+            result = result.replace(latin, cyrillic)
+    for latin, cyrillic in LATIN_TO_CYRILLIC.items():
+        if len(latin) == 1:
+            result = result.replace(latin, cyrillic)
+    return result
+
+
+def test_latin_to_cyrillic():
+    for source, expected in LATIN_CASES:
+        assert latin_to_cyrillic(source) == expected, source
+
+
+def test_cyrillic_to_latin():
+    for source, expected in CYRILLIC_CASES:
+        assert cyrillic_to_latin(source) == expected, source
+
+
+def test_empty_input():
+    for converter in (latin_to_cyrillic, cyrillic_to_latin):
+        assert converter('') == ''
+        assert converter(None) is None
+    assert normalize_uz(None) == ''
+
+
+def test_matches_legacy_except_known_fixes():
+    for text in LEGACY_TEXTS:
+        for word in text.split(' '):
+            if (word.isupper() and len(word) > 1) or _KNOWN_FIX.search(word):
+                continue
+            assert latin_to_cyrillic(word) == legacy_latin_to_cyrillic(word), word
+        # Word-by-word (cached) result == whole text result
+        assert latin_to_cyrillic(text) == ' '.join(latin_to_cyrillic(word) for word in text.split(' '))
+
+
+def test_longest_match_and_context():
+    converter = Transliterator(
+        {'a': '1', 'ab': '2', 'abc': '3', 'b': '4', 'c': '5'},
+        context=(r'(?<![^\W\d_])c', {'c': '6'}),
+    )
+    assert converter('abc') == '3'
+    assert converter('abab') == '22'
+    assert converter('aab') == '12'
+    assert converter('cc bc') == '65 45'
+    assert converter('xyz') == 'xyz'  # not in mapping - unchanged
+    # Uppercase words: converted in lowercase, then uppercased
+    assert Transliterator({'sh': 'ш'})('SHSH Sh') == 'ШШ Sh'
+
+
+def test_word_cache_is_bounded(monkeypatch):
+    converter = Transliterator({'a': 'b'})
+    monkeypatch.setattr(Transliterator, 'CACHE_SIZE', 3)
+    assert converter('a aa aaa aaaa') == 'b bb bbb bbbb'
+    assert converter('x') == 'x'
+    assert len(converter._cache) <= 4
+    assert converter('aa') == 'bb'
+
+
+def test_normalize_uz():
+    assert normalize_uz("Ўзбекистон Oʻzbekiston o‘zbekiston O`ZBEKISTON") == (
+        "o'zbekiston o'zbekiston o'zbekiston o'zbekiston"
+    )
+    assert normalize_uz('SHAHAR') == 'shahar'
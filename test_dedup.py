@@ -0,0 +1,98 @@
+"""
+🧪 TEST SUITE FOR NEAR-DUPLICATE DETECTION (MinHash LSH)
+Checks shingling, signature stability, the Jaccard estimate and DedupIndex
+lookups / expiry
+"""
+
+import struct
+from datetime import datetime, timedelta
+
+from config import DEDUP_NUM_PERM
+from processor.dedup import DedupIndex, minhash, shingles, similarity
+
+
+METRO = (
+    "Toshkentda yangi metro bekati ochildi, prezident marosimda ishtirok etdi va nutq so'zladi. "
+    "Bekat kuniga 20 ming yo'lovchiga xizmat qiladi, qurilish ikki yil davom etdi."
+)
+METRO_REWORDED = (
+    "Toshkentda yangi metro bekati ochildi, prezident marosimda ishtirok etdi va nutq so'zladi. "
+    "Bekat kuniga 20 ming yo'lovchiga xizmat qiladi, qurilish uch yil davom etdi."
+)
+FOOTBALL = (
+    "Futbol bo'yicha O'zbekiston terma jamoasi Osiyo kubogida Yaponiya bilan durang o'ynadi "
+    "va keyingi bosqichga chiqdi."
+)
+
+
+def jaccard(first: str, second: str) -> float:
+    a, b = shingles(first), shingles(second)
+    return len(a & b) / len(a | b)
+
+
+def test_shingles():
+    assert shingles("Salom, dunyo! Bugun bayram") == {'salom dunyo bugun', 'dunyo bugun bayram'}
+    # Words with apostrophes stay whole, '_' separates words
+    assert shingles("O'zbekiston yangi so'z_test") == {"o'zbekiston yangi so'z", "yangi so'z test"}
+    # Fewer than 3 words - a single shingle
+    assert shingles('Salom dunyo') == {'salom dunyo'}
+    assert shingles('') == set()
+    assert shingles(None) == set()
+
+
+def test_minhash_signature():
+    signature = minhash(METRO)
+    assert len(signature) == DEDUP_NUM_PERM * 8
+    assert minhash(METRO) == signature
+    assert minhash('... !!! 🚨') is None
+    # Hashes (blake2b) must not change between restarts - signatures are
+    # stored in the database (News.minhash)
+    assert struct.unpack('<2Q', minhash('salom dunyo bugun')[:16]) == (
+        2194621211204381139, 1901388582394440353
+    )
+
+
+def test_similarity_estimates_jaccard():
+    for first, second in ((METRO, METRO_REWORDED), (METRO, FOOTBALL), (METRO, METRO)):
+        estimate = similarity(minhash(first), minhash(second))
+        assert abs(estimate - jaccard(first, second)) <= 0.2
+    assert similarity(minhash(METRO), minhash(METRO)) == 1.0
+    assert similarity(minhash(METRO), b'') == 0.0
+
+
+def test_index_finds_near_duplicate():
+    index = DedupIndex(threshold=0.6)
+    index.add(1, minhash(METRO))
+    index.add(2, minhash(FOOTBALL))
+
+    found = index.find(minhash(METRO_REWORDED))
+    assert found is not None and found[0] == 1
+    assert found[1] >= 0.6
+
+    assert index.find(minhash("Ertaga havo bulutli bo'ladi, yomg'ir yog'ishi kutilmoqda")) is None
+    assert index.find(None) is None
+
+
+def test_index_add_and_remove():
+    index = DedupIndex()
+    index.add(1, minhash(METRO))
+    index.add(1, minhash(FOOTBALL))  # same id - ignored
+    index.add(2, None)  # no signature - not added
+    assert len(index) == 1
+
+    index.remove(1)
+    index.remove(1)
+    assert len(index) == 0
+    assert index.find(minhash(METRO)) is None
+    assert all(not bucket for bucket in index._buckets)
+
+
+def test_index_expires_old_news():
+    index = DedupIndex(window_hours=48)
+    now = datetime.utcnow()
+    index.add(1, minhash(METRO), now - timedelta(hours=49))
+    index.add(2, minhash(FOOTBALL), now - timedelta(hours=1))
+
+    assert len(index) == 1
+    assert index.find(minhash(METRO)) is None
+    assert index.find(minhash(FOOTBALL))[0] == 2
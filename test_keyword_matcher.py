@@ -0,0 +1,159 @@
+"""
+🧪 TEST SUITE FOR KEYWORD MATCHING (Aho-Corasick automaton + classifier)
+Checks the automaton against re.search(r'\b...\b') and the keyword
+classifier against a plain substring/regex reference
+"""
+
+import random
+import re
+
+import config
+from processor import classifier
+from processor.keyword_matcher import KeywordAutomaton
+from utils.cyrillic_converter import normalize_uz
+
+
+PATTERNS = [
+    'he', 'she', 'his', 'hers', 'h',  # overlapping (classic Aho-Corasick case)
+    'pul', 'ai', 'qor', 'nam',  # short keywords (whole word in classifier)
+    'ish haqi', 'ish haq',  # one is a prefix of the other
+    "so'm", 'ob-havo', "'a", 'a-',  # non-word characters inside and at the edges
+    'пул', 'нарх',  # Cyrillic
+    '_x', '2025',  # underscore and digits are word characters
+]
+
+# Old classifier (before the automaton) results on the same texts
+LEGACY_CASES = [
+    ("O'zbekiston terma jamoasi futbol bo'yicha Osiyo chempionatida g'alaba qozondi", 'sport'),
+    ("Prezident farmon imzoladi, parlament yangi qonunni qabul qildi", 'siyosat'),
+    ("Markaziy bank dollar kursini e'lon qildi, inflyatsiya va narx oshdi", 'iqtisod'),
+    ("Ertaga Toshkentda havo harorati 30 gradusgacha ko'tariladi, yomg'ir kutilmoqda", 'obhavo'),
+    ("Yangi smartfon taqdim etildi: sun'iy intellekt va internet tezligi oshdi", 'texnologiya'),
+    ("Shifokorlar gripp virusi va kasallik haqida ogohlantirdi, vaksina shifoxonada", 'salomatlik'),
+    ("AQSh va Xitoy o'rtasidagi muzokaralar Yevropa davlatlari e'tiborida", 'dunyo'),
+    ("Toshkent metrosida yangi bekat ochildi, avtobus yo'nalishlari o'zgardi", 'jamiyat'),
+    ("Sport: pul mukofoti va kontrakt imzolandi, futbolchi klubga o'tdi", 'sport'),
+]
+
+
+def generated_texts(count: int = 2000, seed: int = 17) -> list:
+    """Deterministic texts built from pattern pieces, letters and separators"""
+    rng = random.Random(seed)
+    pieces = PATTERNS + ['a', 'e', 'r', 's', 'x', '_', '-', "'", ' ', ' ', '.', 'ы', '2']
+    return [
+        ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        for _ in range(count)
+    ]
+
+
+def reference_scan(patterns, text: str):
+    """(present, whole) with str.__contains__ and re's \\b"""
+    present = {pattern for pattern in patterns if pattern in text}
+    whole = {
+        pattern for pattern in present
+        if re.search(r'\b' + re.escape(pattern) + r'\b', text)
+    }
+    return present, whole
+
+
+def reference_scores(text: str) -> dict:
+    """Category scores with substring / regex checks per keyword (the pre-automaton way)"""
+    normalized = normalize_uz(text)
+    short_context = any(word in normalized for word in classifier.SHORT_WEATHER_CONTEXT)
+    havo_context = any(word in normalized for word in classifier.HAVO_CONTEXT)
+
+    scores = {}
+    for category, keywords in config.CATEGORIES.items():
+        score = 0
+        for keyword in dict.fromkeys(normalize_uz(keyword) for keyword in keywords):
+            if len(keyword) <= classifier.SHORT_KEYWORD_LENGTH or keyword in classifier.WHOLE_WORD_KEYWORDS:
+                if not re.search(r'\b' + re.escape(keyword) + r'\b', normalized):
+                    continue
+                if keyword in classifier.SHORT_WEATHER_KEYWORDS and not short_context:
+                    continue
+            elif keyword in classifier.HAVO_KEYWORDS:
+                if not havo_context:
+                    continue
+            elif keyword not in normalized:
+                continue
+            score += 1
+        if score:
+            scores[category] = score
+    return scores
+
+
+def test_automaton_matches_regex():
+    """present == substring search, whole == re.search(r'\\b...\\b')"""
+    automaton = KeywordAutomaton(PATTERNS, whole_words=PATTERNS)
+    texts = generated_texts() + [
+        'ushers', 'his hers', 'pul, pulsiz pul', "100 so'm", "so'mga", 'ob-havo:',
+        "x'a 'a", 'a-b a-', 'пул нархи', 'нарх', '_x x_x', '2025-yil', '',
+    ]
+    for text in texts:
+        assert automaton.scan(text) == reference_scan(PATTERNS, text), text
+
+
+def test_overlapping_and_repeated_matches():
+    automaton = KeywordAutomaton(PATTERNS, whole_words=['he', 'hers'])
+
+    present, whole = automaton.scan('ushers')
+    assert present == {'she', 'he', 'hers', 'h'}
+    assert whole == set()
+
+    # Repeated pattern: whole if ANY occurrence is a whole word
+    present, whole = automaton.scan('shehe he')
+    assert {'she', 'he'} <= present
+    assert whole == {'he'}
+
+    # Duplicates in the pattern list are ignored
+    assert KeywordAutomaton(['pul', 'pul', '']).patterns == ['pul']
+
+
+def test_only_requested_patterns_are_whole_word_checked():
+    automaton = KeywordAutomaton(['pul', 'ai'], whole_words=['ai'])
+    present, whole = automaton.scan('pulsiz aipod')
+    assert present == {'pul', 'ai'}
+    assert whole == set()
+
+    present, whole = automaton.scan('pulsiz ai')
+    assert whole == {'ai'}
+
+
+def test_category_scores_match_reference():
+    """score_categories (automaton) == per-keyword substring/regex scoring"""
+    texts = [text for text, _ in LEGACY_CASES] + [
+        "Пул ва доллар курси ҳақида янгилик: нарх ошди",
+        "Havo ochiq bo'ladi, prognoz bo'yicha qor yog'maydi",
+        "Havo yo'llari kompaniyasi yangi reys ochdi",
+        "Nam tuproq va qor: harorat pasayadi",
+        "Jarayon rostdan ham dengiz bo'yida boshlandi",
+        "Жара и рост цен: деньги дешевеют",
+    ]
+    automaton = classifier.get_keyword_automaton()
+    for text in texts:
+        present, whole = automaton.scan(normalize_uz(text))
+        assert classifier.score_categories(present, whole, verbose=False) == reference_scores(text), text
+
+
+def test_classifier_matches_legacy(monkeypatch):
+    monkeypatch.setattr(classifier, 'get_model', lambda: None)
+    monkeypatch.setattr(config, 'OPENAI_API_KEY', None)
+    for text, expected in LEGACY_CASES:
+        category, _ = classifier.analyze_news(text, verbose=False)
+        assert category == expected, text
+
+
+def test_automaton_rebuilt_when_categories_change(monkeypatch):
+    before = classifier.get_keyword_automaton()
+    assert classifier.get_keyword_automaton() is before
+
+    monkeypatch.setitem(config.CATEGORIES, 'sport', config.CATEGORIES['sport'] + ['zqxw-keyword'])
+    changed = classifier.get_keyword_automaton()
+    assert changed is not before
+    present, whole = changed.scan('bugun zqxw-keyword haqida')
+    assert 'zqxw-keyword' in present
+    assert classifier.score_categories(present, whole, verbose=False)['sport'] >= 1
+
+    monkeypatch.undo()
+    restored = classifier.get_keyword_automaton()
+    assert 'zqxw-keyword' not in restored.patterns
@@ -13,7 +13,8 @@ from utils.telegram_formatter import (
     format_bold,
     format_italic,
     format_link,
-    strip_html_tags
+    strip_html_tags,
+    split_message
 )
 
 
@@ -251,10 +252,53 @@ def test_strip_html_tags():
     return failed == 0
 
 
+def test_split_message():
+    """Test splitting long messages by paragraphs (4096 limit)"""
+    print("\n" + "="*60)
+    print("TEST 6: Message Splitting")
+    print("="*60)
+    
+    long_text = "\n".join(["A" * 100] * 100)  # ~10100 belgi
+    
+    test_cases = [
+        # (input, max_length, expected_parts, description)
+        ("Short text", 4096, ["Short text"], "Short message - one part"),
+        ("line1\nline2\nline3", 12, ["line1\nline2", "line3"], "Split by paragraphs"),
+        (long_text, 4096, None, "Long message - every part within limit"),
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for text, max_length, expected, description in test_cases:
+        result = split_message(text, max_length=max_length)
+        if expected is None:
+            ok = (
+                len(result) > 1
+                and all(len(part) <= max_length for part in result)
+                and "\n".join(result) == text
+            )
+        else:
+            ok = result == expected
+        
+        if ok:
+            print(f"✅ {description}")
+            print(f"   Parts: {len(result)}")
+            passed += 1
+        else:
+            print(f"❌ {description}")
+            print(f"   Expected: {expected}")
+            print(f"   Got:      {[p[:30] for p in result]}")
+            failed += 1
+    
+    print(f"\nResults: {passed} passed, {failed} failed")
+    return failed == 0
+
+
 def test_real_world_scenarios():
     """Test real-world scenarios from production"""
     print("\n" + "="*60)
-    print("TEST 6: Real-World Scenarios")
+    print("TEST 7: Real-World Scenarios")
     print("="*60)
     
     # Scenario 1: News from Telegram channel with HTML-like content
@@ -344,6 +388,7 @@ def run_all_tests():
     results.append(("HTML Validation", test_html_validation()))
     results.append(("Formatting Functions", test_formatting_functions()))
     results.append(("HTML Tag Stripping", test_strip_html_tags()))
+    results.append(("Message Splitting", test_split_message()))
     results.append(("Real-World Scenarios", test_real_world_scenarios()))
     
     print("\n" + "="*60)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lokal kategoriya modelini o'qitish (processor/local_model.py)
+
+Database'dagi yangiliklar (News.text, News.category) bo'yicha naive Bayes
+o'qitiladi va LOCAL_MODEL_PATH ga saqlanadi. Bot keyingi ishga tushganda
+modelni yuklaydi.
+
+Har 5-yangilik tekshiruv uchun ajratiladi (aniqlik hisoboti), keyin model
+barcha yangiliklarda qayta o'qitiladi.
+
+Ishlatish:
+    python train_local_model.py                  # LOCAL_MODEL_PATH ga
+    python train_local_model.py my_model.model   # boshqa faylga
+"""
+import os
+import sys
+import asyncio
+from collections import Counter
+from sqlalchemy import select
+from db.database import async_session, init_db
+from db.models import News
+from processor.local_model import NaiveBayesModel
+from config import CATEGORIES, LOCAL_MODEL_PATH
+
+# Bundan kam yangilik bo'lsa - o'qitilmaydi
+MIN_SAMPLES = 50
+
+# Har N-yangilik tekshiruv to'plamiga
+HOLDOUT_EVERY = 5
+
+
+async def load_samples() -> list:
+    async with async_session() as session:
+        result = await session.execute(
+            select(News.id, News.text, News.category)
+            .where(News.category.in_(list(CATEGORIES.keys())))
+            .where(News.duplicate_of.is_(None))
+            .where(News.text.isnot(None))
+            .order_by(News.id)
+        )
+        return [(row.id, row.text, row.category) for row in result.all()]
+
+
+async def train(path: str):
+    await init_db()
+
+    print("🧠 Lokal model o'qitilmoqda...")
+    samples = await load_samples()
+    print(f"📊 {len(samples)} ta yangilik:")
+    for category, count in Counter(category for _, _, category in samples).most_common():
+        print(f"   {category}: {count}")
+
+    if len(samples) < MIN_SAMPLES:
+        print(f"\n❌ Kamida {MIN_SAMPLES} ta yangilik kerak")
+        return
+
+    # 1. Tekshiruv: har HOLDOUT_EVERY-yangilik o'qitishda ishlatilmaydi
+    train_set = [(text, category) for news_id, text, category in samples if news_id % HOLDOUT_EVERY]
+    test_set = [(text, category) for news_id, text, category in samples if not news_id % HOLDOUT_EVERY]
+    if train_set and test_set:
+        model = NaiveBayesModel.train(train_set)
+        correct = Counter()
+        total = Counter()
+        for text, category in test_set:
+            ranking = model.predict(text)
+            total[category] += 1
+            if ranking and ranking[0][0] == category:
+                correct[category] += 1
+        accuracy = sum(correct.values()) / len(test_set) * 100
+        print(f"\n🎯 Tekshiruv ({len(test_set)} ta): aniqlik {accuracy:.1f}%")
+        for category in sorted(total):
+            print(f"   {category}: {correct[category]}/{total[category]}")
+
+    # 2. Yakuniy model - barcha yangiliklarda
+    model = NaiveBayesModel.train([(text, category) for _, text, category in samples])
+    model.save(path)
+    print(f"\n✅ Model saqlandi: {path} ({os.path.getsize(path) / 1024:.0f} KB, {len(model.table)} ta katak)")
+
+
+if __name__ == "__main__":
+    asyncio.run(train(sys.argv[1] if len(sys.argv) > 1 else LOCAL_MODEL_PATH))
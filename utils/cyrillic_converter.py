@@ -1,6 +1,7 @@
 """
-O'zbek lotin alifbosini kirill alifbosiga o'girish
+O'zbek lotin alifbosini kirill alifbosiga o'girish (va aksincha)
 """
+import re
 
 # Lotin → Kirill mapping
 LATIN_TO_CYRILLIC = {
@@ -19,32 +20,157 @@ LATIN_TO_CYRILLIC = {
     "O'": 'Ў', "G'": 'Ғ',
 }
 
+# Kirill → Lotin mapping (kichik harflar; katta harflar quyida hosil qilinadi)
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+    'ж': 'j', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'ъ': "'", 'ь': '',
+    'э': 'e', 'ю': 'yu', 'я': 'ya',
+    # O'zbek harflari
+    'ў': "o'", 'қ': 'q', 'ғ': "g'", 'ҳ': 'h',
+    # Rus harflari (ruscha matnlar uchun)
+    'щ': 'sh', 'ы': 'i',
+}
+
+# Apostrof variantlari (oʻ, oʼ, o‘, o’, o`) → '
+_APOSTROPHES = ('ʻ', 'ʼ', '‘', '’', '`')
+
+
+class Transliterator:
+    """
+    Oldindan tuzilgan longest-match transliterator
+
+    mapping dagi bir harfli kalitlar str.translate jadvaliga, ko'p harflilar
+    (sh, o', yo' ...) bitta regex'ga yig'iladi (uzunlari oldin) - matn bir
+    marta o'qiladi, har chaqiruvda saralash yoki 60 ta replace yo'q.
+
+    Matn bo'sh joy bo'yicha so'zlarga bo'linadi va har bir so'z bir marta
+    o'giriladi: yangiliklarda so'zlar ko'p takrorlanadi, keyingi safar natija
+    keshdan olinadi. Butunlay katta harfli so'zlar (SHAHAR, ЎЗБЕКИСТОН)
+    kichik harflarda o'girilib, keyin katta harfga qaytariladi.
+
+    Args:
+        mapping: {manba: natija}
+        context: (regex, {kalit: natija}) - faqat regex mos kelgan joyda
+            qo'llanadigan qoidalar (masalan so'z boshidagi "е" → "ye")
+    """
+
+    CACHE_SIZE = 50000
+
+    def __init__(self, mapping: dict, context: tuple = None):
+        self._table = str.maketrans({key: value for key, value in mapping.items() if len(key) == 1})
+        self._multi = {key: value for key, value in mapping.items() if len(key) > 1}
+        alternatives = [re.escape(key) for key in sorted(self._multi, key=len, reverse=True)]
+        if context:
+            pattern, replacements = context
+            alternatives.insert(0, f'(?:{pattern})')
+            self._multi.update(replacements)
+        self._pattern = re.compile('|'.join(alternatives)) if alternatives else None
+        self._cache = {}
+
+    def _replace(self, match) -> str:
+        return self._multi[match.group()]
+
+    def _convert(self, word: str) -> str:
+        if word.isupper() and len(word) > 1:
+            return self._convert(word.lower()).upper()
+        if self._pattern is not None:
+            word = self._pattern.sub(self._replace, word)
+        return word.translate(self._table)
+
+    def __call__(self, text: str) -> str:
+        if not text:
+            return text
+        cache = self._cache
+        if len(cache) > self.CACHE_SIZE:
+            cache.clear()
+
+        words = text.split(' ')
+        for index, word in enumerate(words):
+            converted = cache.get(word)
+            if converted is None:
+                converted = cache[word] = self._convert(word)
+            words[index] = converted
+        return ' '.join(words)
+
+
+def _with_apostrophes(mapping: dict) -> dict:
+    """o' / g' kalitlarini barcha apostrof variantlari bilan to'ldirish"""
+    result = dict(mapping)
+    for key, value in mapping.items():
+        if "'" in key:
+            for apostrophe in _APOSTROPHES:
+                result[key.replace("'", apostrophe)] = value
+    return result
+
+
+_LATIN_CONVERTER = Transliterator(_with_apostrophes({
+    **LATIN_TO_CYRILLIC,
+    # "yo'l" - "yo" emas, "y" + "o'" (йўл)
+    "yo'": 'йў', "Yo'": 'Йў',
+}))
+
+_CYRILLIC_MAPPING = {}
+for _cyrillic, _latin in CYRILLIC_TO_LATIN.items():
+    _CYRILLIC_MAPPING[_cyrillic] = _latin
+    _CYRILLIC_MAPPING[_cyrillic.upper()] = _latin[:1].upper() + _latin[1:]
+del _cyrillic, _latin
+
+# "е" so'z boshida va unlidan (yoki ъ/ь dan) keyin - "ye" (европа → yevropa)
+_CYRILLIC_CONVERTER = Transliterator(_CYRILLIC_MAPPING, context=(
+    r"(?:(?<![^\W\d_])|(?<=[аеёиоуэюяўъьАЕЁИОУЭЮЯЎЪЬ]))[еЕ]",
+    {'е': 'ye', 'Е': 'Ye'},
+))
+
+_CYRILLIC_CHAR = re.compile('[\u0400-\u04FF]')
+
+
+def cyrillic_to_latin(text: str) -> str:
+    """
+    O'zbek kirill matnini lotinga o'girish
+
+    Args:
+        text: Kirill alifbosidagi matn
+
+    Returns:
+        Lotin alifbosidagi matn
+    """
+    return _CYRILLIC_CONVERTER(text)
+
+
+def normalize_uz(text: str) -> str:
+    """
+    Kalit so'z qidiruvi uchun yagona shakl: kichik harfli o'zbek lotin
+
+    Kirill harflar lotinga o'giriladi, apostrof variantlari bitta "'" ga
+    keltiriladi - "Ўзбекистон", "Oʻzbekiston" va "o'zbekiston" bir xil
+    bo'ladi, shuning uchun kalit so'zlarni ikki yozuvda saqlash shart emas.
+    """
+    if not text:
+        return ''
+    text = text.lower()
+    if _CYRILLIC_CHAR.search(text):
+        text = cyrillic_to_latin(text)
+    # Lotin postlar (ko'pchilik) uchun - faqat bir nechta replace
+    for apostrophe in _APOSTROPHES:
+        if apostrophe in text:
+            text = text.replace(apostrophe, "'")
+    return text
+
+
 def latin_to_cyrillic(text: str) -> str:
     """
     O'zbek lotin matnini kirill ga o'girish
-    
+
     Args:
         text: Lotin alifbosidagi matn
-    
+
     Returns:
         Kirill alifbosidagi matn
     """
-    if not text:
-        return text
-    
-    result = text
-    
-    # Avval ikki harfli kombinatsiyalarni almashtirish
-    for latin, cyrillic in sorted(LATIN_TO_CYRILLIC.items(), key=lambda x: len(x[0]), reverse=True):
-        if len(latin) > 1:
-            result = result.replace(latin, cyrillic)
-    
-    # Keyin bir harfli almashtirishlar
-    for latin, cyrillic in LATIN_TO_CYRILLIC.items():
-        if len(latin) == 1:
-            result = result.replace(latin, cyrillic)
-    
-    return result
+    return _LATIN_CONVERTER(text)
+
 
 def is_cyrillic(text: str) -> bool:
     """
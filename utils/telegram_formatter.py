@@ -342,6 +342,37 @@ async def send_safe_message(
             raise
 
 
+def split_message(text: str, max_length: int = 4096) -> list:
+    """
+    Split long message into parts by paragraphs (Telegram limit: 4096)
+    
+    Args:
+        text: Message text
+        max_length: Maximum length of one part
+        
+    Returns:
+        List of message parts (at least one)
+    """
+    if len(text) <= max_length:
+        return [text]
+    
+    parts = []
+    current_part = ""
+    
+    for para in text.split('\n'):
+        if len(current_part) + len(para) + 1 <= max_length:
+            current_part += para + '\n'
+        else:
+            if current_part:
+                parts.append(current_part.strip())
+            current_part = para + '\n'
+    
+    if current_part:
+        parts.append(current_part.strip())
+    
+    return parts
+
+
 def strip_html_tags(text: str) -> str:
     """
     Remove HTML tags from text (for plain text fallback)